@@ -16,6 +16,7 @@ import paynt.quotient.pomdp
 import paynt.quotient.storm_pomdp_control
 
 import paynt.synthesizer.synthesizer
+import paynt.synthesizer.frontier
 import paynt.synthesizer.synthesizer_cegis
 
 import click
@@ -78,8 +79,31 @@ def setup_logger(log_path = None):
 
 @click.option("--incomplete-search", is_flag=True, default=False,
     help="use incomplete search during synthesis")
+@click.option("--exploration-order",
+    type=click.Choice(paynt.synthesizer.frontier.exploration_orders),
+    default="dfs", show_default=True,
+    help="order in which pending families are explored; hybrid synthesis supports dfs only")
+@click.option("--compact-frontier", default=None, type=int,
+    help="keep pending families packed as option bitmasks, spilling them to disk beyond the given memory budget (MB)")
 @click.option("--disable-expected-visits", is_flag=True, default=False,
     help="do not compute expected visits for the splitting heuristic")
+@click.option("--sample-expected-visits", default=None, type=click.IntRange(min=1),
+    help="estimate expected visits for the splitting heuristic from the given number of simulated paths")
+@click.option("--masked-model-checking", is_flag=True, default=False,
+    help="model check sub-MDPs directly on the quotient without constructing them")
+@click.option("--bounded-model-checking", is_flag=True, default=False,
+    help="terminate model checking of sub-MDPs as soon as the threshold or the optimum is crossed")
+@click.option("--adaptive-precision", is_flag=True, default=False,
+    help="model check sub-MDPs with a coarse sound precision first and refine only results close to the threshold; "
+        "model checking runs terminated by --bounded-model-checking skip the coarse pass")
+@click.option("--select-solver", is_flag=True, default=False,
+    help="select the solution method for each model based on its structure")
+@click.option("--fused-model-checking", is_flag=True, default=False,
+    help="share qualitative analysis of each sub-MDP between all properties and optimization directions")
+@click.option("--result-cache", is_flag=True, default=False,
+    help="cache model checking results of identical sub-models")
+@click.option("--lean-submodels", is_flag=True, default=False,
+    help="construct sub-MDPs without state valuations, choice origins and other metadata of the quotient")
 
 @click.option("--fsc-synthesis", is_flag=True, default=False,
     help="enable incremental synthesis of FSCs for a POMDP")
@@ -132,7 +156,8 @@ def paynt_run(
     project, sketch, props, relative_error, discount_factor, optimum_threshold,
     export,
     method,
-    incomplete_search, disable_expected_visits,
+    incomplete_search, exploration_order, compact_frontier, disable_expected_visits, sample_expected_visits, masked_model_checking, bounded_model_checking, adaptive_precision, select_solver,
+    fused_model_checking, result_cache, lean_submodels,
     fsc_synthesis, pomdp_memory_size, posterior_aware,
     storm_pomdp, iterative_storm, get_storm_result, storm_options, prune_storm,
     use_storm_cutoffs, unfold_strategy_storm,
@@ -149,7 +174,26 @@ def paynt_run(
 
     # set CLI parameters
     paynt.synthesizer.synthesizer.Synthesizer.incomplete_search = incomplete_search
+    if method == "hybrid" and exploration_order != "dfs":
+        # the SMT solver of hybrid synthesis keeps conflicts of ancestor families in scopes pushed in the DFS order
+        raise click.BadParameter("hybrid synthesis supports only the dfs order", param_hint="--exploration-order")
+    paynt.synthesizer.synthesizer.Synthesizer.exploration_order = exploration_order
+    if compact_frontier is not None:
+        paynt.synthesizer.synthesizer.Synthesizer.compact_frontier = True
+        paynt.synthesizer.synthesizer.Synthesizer.compact_frontier_budget = compact_frontier
     paynt.quotient.quotient.Quotient.compute_expected_visits = not disable_expected_visits
+    if sample_expected_visits is not None:
+        paynt.quotient.quotient.Quotient.sample_expected_visits = True
+        paynt.quotient.quotient.Quotient.expected_visits_samples = sample_expected_visits
+    paynt.quotient.quotient.Quotient.masked_model_checking = masked_model_checking
+    paynt.quotient.quotient.Quotient.lean_submodels = lean_submodels
+    paynt.quotient.models.MDP.bounded_model_checking = bounded_model_checking
+    paynt.verification.property.Property.adaptive_precision = adaptive_precision
+    if select_solver:
+        paynt.verification.property.Property.enable_solver_selection()
+    paynt.quotient.models.MDP.fused_model_checking = fused_model_checking
+    if result_cache:
+        paynt.verification.property.Property.enable_result_cache()
     paynt.synthesizer.synthesizer_cegis.SynthesizerCEGIS.conflict_generator_type = ce_generator
     paynt.quotient.pomdp.PomdpQuotient.initial_memory_size = pomdp_memory_size
     paynt.quotient.pomdp.PomdpQuotient.posterior_aware = posterior_aware
@@ -1,10 +1,12 @@
 import payntbind.synthesis
 
 import paynt.family.smt
+import paynt.quotient.models
 
 import math
 import random
 import itertools
+import numpy
 
 import logging
 logger = logging.getLogger(__name__)
@@ -103,6 +105,18 @@ class Family:
         assignment = self.assume_options_copy(suboptions)
         return assignment
 
+    @property
+    def packed_num_words(self):
+        return self.family.packedNumWords()
+
+    def pack_options(self, words):
+        ''' Store options of all holes to a uint64 NumPy array of packed_num_words words. '''
+        self.family.packOptions(words)
+
+    def unpack_options(self, words):
+        ''' Restore options of all holes from an array produced by pack_options of a family with the same holes. '''
+        self.family.unpackOptions(words)
+
     def subholes(self, hole_index, options):
         '''
         Construct a semi-shallow copy of self with only one modified hole
@@ -116,13 +130,45 @@ class Family:
 
 
 
+class AnalysisHints:
+    '''
+    Lower bounds on the values of quotient states for a number of properties, stored as a single NumPy matrix with
+    one row per property. One store is collected per parent family and shared by all its subfamilies, which gather
+    the values of their states on demand.
+    '''
+    def __init__(self, prop_to_values):
+        self.prop_to_row = {prop:row for row,prop in enumerate(prop_to_values.keys())}
+        self.values = numpy.stack(list(prop_to_values.values())) if prop_to_values else None
+
+    def translate(self, prop, state_map=None):
+        '''
+        :param state_map for each state of a sub-MDP, the corresponding quotient state; if None, values for all
+            quotient states are returned
+        :return a list of state values or None if no hint is stored for this property
+        '''
+        row = self.prop_to_row.get(prop)
+        if row is None:
+            return None
+        values = self.values[row]
+        if state_map is not None:
+            values = values[numpy.asarray(state_map, dtype=numpy.int64)]
+        return values.tolist()
+
+    @property
+    def nbytes(self):
+        return 0 if self.values is None else self.values.nbytes
+
+
+
 class ParentInfo():
     '''
     Container for stuff to be remembered when splitting an undecided family
     into subfamilies. Generally used to speed-up work with the subfamilies.
     :note it is better to store these things in a separate container instead
       of having a reference to the parent family (that will never be considered
-      again) for the purposes of memory efficiency.
+      again) for the purposes of memory efficiency. In particular, the MDP of
+      the parent family is not stored: the container is shared by all pending
+      subfamilies and would keep the whole sparse model alive.
     '''
     def __init__(self):
         # list of constraint indices still undecided in this family
@@ -136,6 +182,27 @@ class ParentInfo():
         # index of a hole used to split the family
         self.splitter = None
 
+        # choices of the quotient selected in the parent family
+        self.selected_choices = None
+        # for each property, hole options selected by the primary scheduler (a list of hole-option pairs) and the
+        # corresponding primary value
+        self.primary_results = None
+
+    def strip(self):
+        ''' Drop the analysis hints and the selected choices: these only speed up the analysis of subfamilies. '''
+        self.analysis_hints = None
+        self.selected_choices = None
+
+    @property
+    def nbytes(self):
+        ''' :return an estimate of the number of bytes held by this container '''
+        nbytes = 0
+        if self.selected_choices is not None:
+            nbytes += math.ceil(len(self.selected_choices) / 64) * 8
+        if self.analysis_hints is not None:
+            nbytes += self.analysis_hints.nbytes
+        return nbytes
+
 
 class DesignSpace(Family):
     '''
@@ -152,6 +219,8 @@ class DesignSpace(Family):
         super().__init__(family)
 
         self.mdp = None
+        # choices of the quotient compatible with this family
+        self.selected_choices = None
         
         # SMT encoding
         self.encoding = None
@@ -171,17 +240,24 @@ class DesignSpace(Family):
 
     
     def generalize_hint(self, hint):
-        hint_global = dict()
-        hint = list(hint.get_values())
-        for state in range(self.mdp.states):
-            hint_global[self.mdp.quotient_state_map[state]] = hint[state]
+        if isinstance(self.mdp, paynt.quotient.models.MaskedMDP):
+            # the result is already indexed by the states of the quotient
+            return numpy.asarray(hint.get_values(), dtype=float)
+        hint_global = numpy.zeros(self.mdp.quotient_container.quotient_mdp.nr_states)
+        hint_global[numpy.asarray(self.mdp.quotient_state_map, dtype=numpy.int64)] = list(hint.get_values())
         return hint_global
 
     
-    def generalize_hints(self, result):
-        hint_prim = self.generalize_hint(result.primary.result)
-        hint_seco = self.generalize_hint(result.secondary.result) if result.secondary is not None else None
-        return (hint_prim, hint_seco)
+    def generalize_hints(self, prop, result):
+        '''
+        Values in the minimizing direction are lower bounds on the values of subfamilies in both directions and are
+        therefore used as hints for both. Coarse values (see MDP.evaluate_property) are not lower bounds and are not
+        used.
+        '''
+        minimizing_result = result.primary if prop.minimizing else result.secondary
+        if minimizing_result is None or minimizing_result.coarse:
+            return None
+        return self.generalize_hint(minimizing_result.result)
 
     
     def collect_analysis_hints(self, specification):
@@ -189,46 +265,70 @@ class DesignSpace(Family):
         analysis_hints = dict()
         for index in res.constraints_result.undecided_constraints:
             prop = specification.constraints[index]
-            hints = self.generalize_hints(res.constraints_result.results[index])
-            analysis_hints[prop] = hints
+            hint = self.generalize_hints(prop, res.constraints_result.results[index])
+            if hint is not None:
+                analysis_hints[prop] = hint
         if res.optimality_result is not None:
             prop = specification.optimality
-            hints = self.generalize_hints(res.optimality_result)
-            analysis_hints[prop] = hints
-        return analysis_hints
+            hint = self.generalize_hints(prop, res.optimality_result)
+            if hint is not None:
+                analysis_hints[prop] = hint
+        return AnalysisHints(analysis_hints)
 
     
-    def translate_analysis_hint(self, hint):
-        if hint is None:
+    def collect_primary_results(self, specification):
+        res = self.analysis_result
+        prop_results = []
+        if res.constraints_result is not None:
+            for index,result in enumerate(res.constraints_result.results):
+                if result is not None:
+                    prop_results.append((specification.constraints[index],result))
+        if res.optimality_result is not None:
+            prop_results.append((specification.optimality,res.optimality_result))
+
+        primary_results = dict()
+        for prop,result in prop_results:
+            if result.primary is None or result.primary_selection is None:
+                continue
+            if result.primary.coarse:
+                # the coarse value is reliable only with respect to the threshold at the time of its computation
+                continue
+            selection = [(hole,option) for hole,options in enumerate(result.primary_selection) for option in options]
+            primary_results[prop] = (selection, result.primary.value)
+        return primary_results
+
+    def inherited_primary_value(self, prop):
+        '''
+        If this family contains all hole options selected by the primary scheduler of the parent family, then
+        this scheduler is also optimal for this family and the primary values coincide.
+        :return the primary value of the parent family or None if it cannot be inherited
+        '''
+        if self.parent_info is None or self.parent_info.primary_results is None:
+            return None
+        primary_result = self.parent_info.primary_results.get(prop)
+        if primary_result is None:
             return None
-        translated_hint = [0] * self.mdp.states
-        for state in range(self.mdp.states):
-            global_state = self.mdp.quotient_state_map[state]
-            translated_hint[state] = hint[global_state]
-        return translated_hint
+        selection,value = primary_result
+        if not self.family.includesAssignment(selection):
+            return None
+        return value
 
     
     def translate_analysis_hints(self):
+        ''' :return hints of the parent family; these are translated to the MDP of this family on demand '''
         if not DesignSpace.store_hints or self.parent_info is None:
             return None
-
-        analysis_hints = dict()
-        for prop,hints in self.parent_info.analysis_hints.items():
-            hint_prim,hint_seco = hints
-            translated_hint_prim = self.translate_analysis_hint(hint_prim)
-            translated_hint_seco = self.translate_analysis_hint(hint_seco)
-            analysis_hints[prop] = (translated_hint_prim,translated_hint_seco)
-
-        return analysis_hints
+        return self.parent_info.analysis_hints
 
     def collect_parent_info(self, specification):
         pi = ParentInfo()
         pi.refinement_depth = self.refinement_depth
-        pi.analysis_hints = self.collect_analysis_hints(specification)
+        pi.analysis_hints = self.collect_analysis_hints(specification) if DesignSpace.store_hints else None
         cr = self.analysis_result.constraints_result
         pi.constraint_indices = cr.undecided_constraints if cr is not None else []
         pi.splitter = self.splitter
-        pi.mdp = self.mdp
+        pi.selected_choices = self.selected_choices
+        pi.primary_results = self.collect_primary_results(specification)
         return pi
 
     def encode(self, smt_solver):
@@ -7,6 +7,8 @@
 import stormpy
 import payntbind
 
+import numpy
+
 from paynt.parser.prism_parser import PrismParser
 from paynt.parser.pomdp_parser import PomdpParser
 
@@ -18,6 +20,7 @@ import paynt.quotient.decpomdp
 import paynt.quotient.mdp_family
 import paynt.quotient.pomdp_family
 import paynt.verification.property
+import paynt.utils.sparse
 
 import logging
 logger = logging.getLogger(__name__)
@@ -33,7 +36,7 @@ def substitute_suffix(string, delimiter, replacer):
     return output_string
 
 def make_rewards_action_based(model):
-    tm = model.transition_matrix
+    row_to_state = None
     for name,reward_model in model.reward_models.items():
         assert not reward_model.has_transition_rewards, "Paynt does not support transition rewards"
         if not reward_model.has_state_rewards:
@@ -41,14 +44,14 @@ def make_rewards_action_based(model):
         logger.info("converting state rewards '{}' to state-action rewards".format(name))
         if reward_model.has_state_action_rewards:
             logger.info("state rewards will be added to existing state-action rewards".format(name))
-            action_reward = reward_model.state_action_rewards.copy()
+            action_reward = numpy.array(reward_model.state_action_rewards, dtype=float)
         else:
-            action_reward = [0] * model.nr_choices
+            action_reward = numpy.zeros(model.nr_choices)
 
-        for state in range(model.nr_states):
-            state_reward = reward_model.get_state_reward(state)
-            for action in range(tm.get_row_group_start(state),tm.get_row_group_end(state)):
-                action_reward[action] += state_reward
+        if row_to_state is None:
+            row_to_state = paynt.utils.sparse.SparseArrays(model).row_to_group
+        state_reward = numpy.array(reward_model.state_rewards, dtype=float)
+        action_reward = (action_reward + state_reward[row_to_state]).tolist()
 
         model.remove_reward_model(name)
         new_reward_model = stormpy.storage.SparseRewardModel(optional_state_action_reward_vector=action_reward)
@@ -359,10 +359,10 @@ class DecPomdpQuotient(paynt.quotient.quotient.Quotient):
 
         return hole_selection
 
-    def estimate_scheduler_difference(self, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits=None):
+    def estimate_scheduler_difference(self, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits=None, choice_mask=None):
 
-        if paynt.quotient.pomdp.PomdpQuotient.use_new_split_method == False :
-            return super().estimate_scheduler_difference(mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
+        if paynt.quotient.pomdp.PomdpQuotient.use_new_split_method == False or choice_mask is not None:
+            return super().estimate_scheduler_difference(mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits, choice_mask)
 
         # print("nr_memory_joint_observations",self.nr_memory_joint_observations)
 
@@ -14,6 +14,9 @@ logger = logging.getLogger(__name__)
 
 class MdpFamilyQuotient(paynt.quotient.quotient.Quotient):
 
+    # policies are extracted from schedulers of explicitly constructed sub-MDPs
+    masked_model_checking = False
+
     @staticmethod
     def extract_choice_labels(mdp):
         '''
@@ -1,5 +1,10 @@
 import stormpy
+import payntbind
+import numpy
 
+import math
+
+import paynt.utils.sparse
 from paynt.verification.property import *
 from paynt.verification.property_result import *
 
@@ -48,19 +53,22 @@ class MarkovChain:
         self.quotient_choice_map = quotient_choice_map
         self.quotient_state_map = quotient_state_map
         self.hole_is_simple = None
+        self.acyclic = None
+        self.fingerprint = None
+
 
+    def compute_hole_simple(self, quotient_states):
+        ''' A hole is simple if it is associated with at most one of the given states. '''
+        num_holes = self.quotient_container.design_space.num_holes
+        indptr,indices = self.quotient_container.state_to_holes_arrays()
+        holes = paynt.utils.sparse.csr_gather(indptr, indices, quotient_states)
+        hole_to_states = numpy.bincount(holes.astype(numpy.int64), minlength=num_holes)
+        return (hole_to_states <= 1).tolist()
 
     @property
     def hole_simple(self):
-        if self.hole_is_simple is not None:
-            return self.hole_is_simple
-        num_holes = self.quotient_container.design_space.num_holes
-        hole_to_states = [0 for _ in range(num_holes)]
-        for state in range(self.states):
-            quotient_state = self.quotient_state_map[state]
-            for hole in self.quotient_container.state_to_holes[quotient_state]:
-                hole_to_states[hole] += 1
-        self.hole_is_simple = [hole_to_states[hole] <= 1 for hole in range(num_holes)]
+        if self.hole_is_simple is None:
+            self.hole_is_simple = self.compute_hole_simple(self.quotient_state_map)
         return self.hole_is_simple
 
 
@@ -80,14 +88,73 @@ class MarkovChain:
     def initial_state(self):
         return self.model.initial_states[0]
 
-    def model_check_formula(self, formula):
-        return stormpy.model_checking(
-            self.model, formula, extract_scheduler=True, environment=Property.environment
-        )
+    @property
+    def is_acyclic(self):
+        if self.acyclic is None:
+            self.acyclic = payntbind.synthesis.is_acyclic(self.model)
+        return self.acyclic
+
+    def model_check_formula_in(self, environment, formula, hint=None, extract_scheduler=True):
+        if hint is None:
+            return stormpy.model_checking(
+                self.model, formula, extract_scheduler=extract_scheduler, environment=environment
+            )
+        return payntbind.synthesis.verify_with_hint(environment, self.model, formula, extract_scheduler, hint)
+
+    def model_check_formula(self, formula, hint=None, bound=None, extract_scheduler=True):
+        '''
+        :param hint (optional) for each state, a lower bound on its value used as a starting point for the solver
+        :param bound (optional) a pair (comparison type, threshold): the solver terminates as soon as it establishes
+            that the value in the initial state satisfies the bound; otherwise, the values are fully approximated
+        :param extract_scheduler if False, the optimal scheduler is not constructed, use if only values are needed
+        '''
+        if bound is not None:
+            comparison_type,threshold = bound
+            return payntbind.synthesis.verify_with_bound(
+                Property.bound_environment(comparison_type), self.model, formula, extract_scheduler,
+                hint if hint is not None else [], comparison_type, threshold
+            )
+        if Property.solver_selector is not None:
+            check = lambda environment,formula,hint: self.model_check_formula_in(environment, formula, hint, extract_scheduler)
+            return Property.solver_selector.model_check(self, formula, hint, check)
+        return self.model_check_formula_in(Property.environment, formula, hint, extract_scheduler)
+
+    def value_hint(self, prop):
+        ''' to be overridden '''
+        return None
+
+    def choices_fingerprint(self):
+        ''' :return a fingerprint identifying the choices of the quotient this Markov chain consists of '''
+        if self.fingerprint is None:
+            self.fingerprint = paynt.verification.result_cache.ResultCache.fingerprint(self.quotient_choice_map)
+        return self.fingerprint
+
+    def result_cache_key(self, formula, bound):
+        return (type(self).__name__, self.choices_fingerprint(), str(formula), bound, Property.solver_configuration())
 
-    def model_check_property(self, prop, alt=False):
+    def model_check_property(self, prop, alt=False, bound=None, extract_scheduler=True):
+        '''
+        :param extract_scheduler if False, the result will not contain a scheduler
+        '''
+        cache = Property.result_cache
+        if cache is None:
+            return self.evaluate_property(prop, alt, bound, extract_scheduler)
+        cache.validate(self.quotient_container.quotient_mdp)
         formula = prop.formula if not alt else prop.formula_alt
-        result = self.model_check_formula(formula)
+        key = self.result_cache_key(formula, bound)
+        cached = cache.lookup(key, extract_scheduler)
+        if cached is not None:
+            result,value = cached
+            return PropertyResult(prop, result, value)
+        property_result = self.evaluate_property(prop, alt, bound, extract_scheduler)
+        # a coarse result is sufficient only with respect to the current threshold, which may change
+        if not property_result.coarse:
+            cache.store(key, property_result.result, property_result.value, extract_scheduler)
+        return property_result
+
+    def evaluate_property(self, prop, alt=False, bound=None, extract_scheduler=True):
+        formula = prop.formula if not alt else prop.formula_alt
+        result = self.model_check_formula(formula, self.value_hint(prop), bound, extract_scheduler)
         value = result.at(self.initial_state)
         return PropertyResult(prop, result, value)
 
@@ -135,11 +202,13 @@ class MarkovChain:
 
 class DTMC(MarkovChain):
 
+    # schedulers of DTMCs are trivial and not needed when checking specifications
+
     def check_constraint(self, constraint):
-        return self.model_check_property(constraint)
+        return self.model_check_property(constraint, extract_scheduler=False)
 
     def check_optimality(self, optimality):
-        return self.model_check_property(optimality)
+        return self.model_check_property(optimality, extract_scheduler=False)
 
     def check_specification(self, specification, constraint_indices=None, short_evaluation=False):
         constraints_result, optimality_result = super().check_specification(specification,constraint_indices,short_evaluation)
@@ -150,13 +219,89 @@ class MDP(MarkovChain):
 
     # if True, the secondary direction will be explored when primary is not enough
     compute_secondary_direction = False
+    # if True, primary values of families containing the primary scheduler of their parent will be inherited
+    inherit_primary_values = True
+    # if True, model checking in the primary direction terminates as soon as the property is known to be violated
+    bounded_model_checking = False
+    # if True, qualitative analysis (states with probability 0/1) is computed once per sub-MDP and shared between
+    # all properties and both optimization directions
+    fused_model_checking = False
+    # if True, states whose qualitative value is the same in the whole quotient are skipped in the qualitative
+    # analysis of its sub-MDPs
+    quotient_qualitative_analysis = True
 
     def __init__(self, model, quotient_container, quotient_state_map, quotient_choice_map, design_space):
         super().__init__(model, quotient_container, quotient_state_map, quotient_choice_map)
 
         self.design_space = design_space
+        # lower bounds on the state values obtained from the parent family (AnalysisHints)
         self.analysis_hints = None
         self.quotient_to_restricted_action_map = None
+        self.qualitative_analysis = None
+
+    def create_qualitative_analysis(self):
+        quotient_mdp = self.quotient_container.quotient_mdp
+        if not MDP.quotient_qualitative_analysis or quotient_mdp is None or self.model is quotient_mdp:
+            return payntbind.synthesis.QualitativeAnalysis(self.model)
+        return payntbind.synthesis.QualitativeAnalysis(
+            self.model, self.quotient_container.qualitative_analysis(), self.quotient_state_map
+        )
+
+    def model_check_formula_in(self, environment, formula, hint=None, extract_scheduler=True):
+        if not MDP.fused_model_checking or not payntbind.synthesis.QualitativeAnalysis.supports(formula):
+            return super().model_check_formula_in(environment, formula, hint, extract_scheduler)
+        if self.qualitative_analysis is None:
+            self.qualitative_analysis = self.create_qualitative_analysis()
+        return self.qualitative_analysis.check(environment, formula, extract_scheduler, hint if hint is not None else [])
+
+    def value_hint(self, prop):
+        if self.analysis_hints is None:
+            return None
+        return self.analysis_hints.translate(prop, self.quotient_state_map)
+
+
+    def inherited_primary_result(self, prop):
+        ''' :return the primary result inherited from the parent family (without the check result) or None '''
+        if not MDP.inherit_primary_values or self.design_space is None:
+            return None
+        value = self.design_space.inherited_primary_value(prop)
+        if value is None:
+            return None
+        return PropertyResult(prop, None, value)
+
+
+    def evaluate_property(self, prop, alt=False, bound=None, extract_scheduler=True):
+        '''
+        With adaptive precision, the MDP is first model checked with a coarse precision; the result is refined only
+        if the value is close to the threshold (or to the optimum) since otherwise the comparison would not change.
+        The coarse pass uses a sound method: value iteration does not bound the error of its result.
+        With bounded model checking, the coarse pass is skipped: the solver would terminate right after crossing
+        the bound and the value would almost always be close to the threshold.
+        '''
+        threshold = prop.decision_threshold()
+        if not Property.adaptive_precision or threshold is None or bound is not None:
+            return super().evaluate_property(prop, alt, bound, extract_scheduler)
+
+        formula = prop.formula if not alt else prop.formula_alt
+        Property.set_solver_precision(Property.coarse_precision)
+        coarse_result = self.model_check_formula_in(Property.environment_sound, formula, None, extract_scheduler)
+        Property.set_solver_precision(Property.model_checking_precision)
+        result = PropertyResult(prop, coarse_result, coarse_result.at(self.initial_state))
+        if not Property.close_to_threshold(result.value, threshold):
+            Property.num_coarse_sufficient += 1
+            result.coarse = True
+            return result
+
+        # refine the result; the coarse values are not lower bounds and cannot be used as a starting point
+        Property.num_coarse_refined += 1
+        return super().evaluate_property(prop, alt, bound, extract_scheduler)
+
+
+    def primary_bound(self, prop):
+        ''' :return a bound on the primary value terminating model checking, or None '''
+        if not MDP.bounded_model_checking:
+            return None
+        return prop.violation_bound()
 
 
     def check_constraint(self, prop):
@@ -164,7 +309,7 @@ class MDP(MarkovChain):
         result = MdpPropertyResult(prop)
 
         # check primary direction
-        result.primary = self.model_check_property(prop, alt = False)
+        result.primary = self.model_check_property(prop, alt = False, bound = self.primary_bound(prop))
         
         # no need to check secondary direction if primary direction yields UNSAT
         if not result.primary.sat:
@@ -177,7 +322,7 @@ class MDP(MarkovChain):
             self.quotient_container.scheduler_consistent(self, prop, result.primary.result)
 
         # regardless of whether it is consistent or not, we compute secondary direction to show that all SAT
-        result.secondary = self.model_check_property(prop, alt = True)
+        result.secondary = self.model_check_property(prop, alt = True, extract_scheduler = False)
         if self.is_deterministic and result.primary.value != result.secondary.value:
             logger.warning("WARNING: model is deterministic but min<max")
 
@@ -190,8 +335,15 @@ class MDP(MarkovChain):
     def check_optimality(self, prop):
         result = MdpOptimalityResult(prop)
 
+        # the optimum might have improved since the parent was analyzed: its primary value might be enough to prune
+        inherited = self.inherited_primary_result(prop)
+        if inherited is not None and not inherited.improves_optimum:
+            result.primary = inherited
+            result.can_improve = False
+            return result
+
         # check primary direction
-        result.primary = self.model_check_property(prop, alt = False)
+        result.primary = self.model_check_property(prop, alt = False, bound = self.primary_bound(prop))
         if not result.primary.improves_optimum:
             # OPT <= LB
             result.can_improve = False
@@ -211,7 +363,7 @@ class MDP(MarkovChain):
             return result
 
         # UB might improve the optimum
-        result.secondary = self.model_check_property(prop, alt = True)
+        result.secondary = self.model_check_property(prop, alt = True, extract_scheduler = False)
 
         if not result.secondary.improves_optimum:
             # LB < OPT < UB :  T < LB < OPT < UB (can improve) or LB < T < OPT < UB (cannot improve)
@@ -233,3 +385,109 @@ class MDP(MarkovChain):
             optimality_result.improving_assignment, optimality_result.improving_value = self.quotient_container.double_check_assignment(optimality_result.improving_assignment)
             # print(optimality_result.improving_assignment, optimality_result.improving_value)
         return MdpSpecificationResult(constraints_result, optimality_result)
+
+
+
+class QuotientCheckResult:
+    '''
+    Result of model checking a sub-MDP directly on the quotient. State values and the scheduler are indexed by
+    states and choices of the quotient, i.e. no translation via state/choice maps is necessary.
+    '''
+    def __init__(self, checker):
+        self.state_values = checker.solution_state_values
+        # for each state of the quotient, a choice selected by the scheduler (quotient_nr_choices if unreachable)
+        self.scheduler = checker.solution_state_to_choice
+
+    def at(self, state):
+        return self.state_values[state]
+
+    def get_values(self):
+        return self.state_values
+
+
+class MaskedMDP(MDP):
+    '''
+    Sub-MDP of the quotient given by a mask of selected choices. Model checking is performed directly on the
+    quotient and the restricted model is constructed only upon request.
+    '''
+
+    def __init__(self, quotient_container, choices, design_space):
+        self.quotient_container = quotient_container
+        self.selected_choices = choices
+        self.design_space = design_space
+        self.hole_is_simple = None
+        self.analysis_hints = None
+        self.quotient_to_restricted_action_map = None
+        self.fingerprint = None
+
+        checker = quotient_container.mdp_model_checker()
+        self.reachable_states,self.reachable_choices = checker.explore_reachable(choices)
+        self.restricted = None
+
+    def restrict(self):
+        ''' Construct the restricted model when some client needs an explicit sub-MDP. '''
+        if self.restricted is None:
+            self.restricted = self.quotient_container.restrict_quotient(self.selected_choices)
+        return self.restricted
+
+    @property
+    def model(self):
+        return self.restrict()[0]
+
+    @property
+    def quotient_state_map(self):
+        return self.restrict()[1]
+
+    @property
+    def quotient_choice_map(self):
+        return self.restrict()[2]
+
+    def choices_fingerprint(self):
+        # avoid constructing the restricted model
+        if self.fingerprint is None:
+            self.fingerprint = paynt.verification.result_cache.ResultCache.fingerprint(self.reachable_choices)
+        return self.fingerprint
+
+    @property
+    def hole_simple(self):
+        if self.hole_is_simple is None:
+            self.hole_is_simple = self.compute_hole_simple(list(self.reachable_states))
+        return self.hole_is_simple
+
+    @property
+    def states(self):
+        return self.reachable_states.number_of_set_bits()
+
+    @property
+    def choices(self):
+        return self.reachable_choices.number_of_set_bits()
+
+    @property
+    def is_deterministic(self):
+        return self.choices == self.states
+
+    @property
+    def initial_state(self):
+        return self.quotient_container.quotient_mdp.initial_states[0]
+
+    def value_hint(self, prop):
+        if self.analysis_hints is None:
+            return None
+        return self.analysis_hints.translate(prop)
+
+    def evaluate_property(self, prop, alt=False, bound=None, extract_scheduler=True):
+        # the masked checker uses value iteration, which does not bound the error needed by the coarse pass of
+        # adaptive precision: always model check with the model checking precision
+        return MarkovChain.evaluate_property(self, prop, alt, bound, extract_scheduler)
+
+    def model_check_formula(self, formula, hint=None, bound=None, extract_scheduler=True):
+        # the scheduler is a by-product of the value iteration of the checker
+        checker = self.quotient_container.mdp_model_checker()
+        # value iteration approximates values from below and can thus only establish lower bounds
+        threshold,strict = math.inf,True
+        if bound is not None and bound[0] in [stormpy.ComparisonType.GREATER, stormpy.ComparisonType.GEQ]:
+            comparison_type,threshold = bound
+            strict = comparison_type == stormpy.ComparisonType.GREATER
+        hint = hint if hint is not None else []
+        checker.check(Property.environment, formula, self.selected_choices, hint, threshold, strict)
+        return QuotientCheckResult(checker)
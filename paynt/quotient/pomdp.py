@@ -4,10 +4,11 @@ import payntbind
 
 import paynt.family.family
 import paynt.quotient.quotient
+import paynt.utils.sparse
 
 from .models import MarkovChain,MDP,DTMC
 
-import math
+import numpy
 import re
 
 import logging
@@ -29,8 +30,6 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         self.quotient_mdp = None
         self.design_space = None
         self.coloring = None
-        # to each hole-option pair a list of actions colored by this combination (reverse coloring)
-        self.hole_option_to_actions = None
 
         # attributes associated with a (folded) POMDP
 
@@ -341,7 +340,6 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         self.quotient_mdp = None
         self.coloring = None
         self.state_to_holes = None
-        self.hole_option_to_actions = None
         
         self.observation_action_holes = None
         self.observation_memory_holes = None
@@ -362,84 +360,24 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         self.coloring = payntbind.synthesis.Coloring(family.family, self.quotient_mdp.nondeterministic_choice_indices, choice_to_hole_options)
         self.state_to_holes = self.coloring.getStateToHoles().copy()
 
-        # to each hole-option pair a list of actions colored by this combination
-        self.hole_option_to_actions = [[] for hole in range(family.num_holes)]
-        for hole in range(family.num_holes):
-            self.hole_option_to_actions[hole] = [[] for option in family.hole_options(hole)]
-        for choice in range(self.quotient_mdp.nr_choices):
-            for hole,option in choice_to_hole_options[choice]:
-                self.hole_option_to_actions[hole][option].append(choice)
-
         self.design_space = paynt.family.family.DesignSpace(family)
 
     
 
     
-    def estimate_scheduler_difference(self, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits=None):
+    def estimate_scheduler_difference(self, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits=None, choice_mask=None):
 
         if PomdpQuotient.posterior_aware:
-            return super().estimate_scheduler_difference(mdp,quotient_choice_map,inconsistent_assignments,choice_values,expected_visits)
-
-        # note: the code below is optimized for posterior-unaware unfolding
-
-        # create inverse quotient-choice-to-mdp-choice map
-        # TODO optimize this for multiple properties
-        quotient_to_restricted_action_map = [None] * self.quotient_mdp.nr_choices
-        for choice in range(mdp.nr_choices):
-            quotient_to_restricted_action_map[quotient_choice_map[choice]] = choice
-
-        # map choices to their origin states
-        choice_to_state = []
-        tm = mdp.transition_matrix
-        for state in range(mdp.nr_states):
-            for choice in tm.get_rows_for_group(state):
-                choice_to_state.append(state)
-
-        # for each hole, compute its difference sum and a number of affected states
-        inconsistent_differences = {}
-        for hole_index,options in inconsistent_assignments.items():
-            difference_sum = 0
-            states_affected = 0
-            edges_0 = self.hole_option_to_actions[hole_index][options[0]]
-            for choice_index,_ in enumerate(edges_0):
-
-                choice_0_global = edges_0[choice_index]
-                choice_0 = quotient_to_restricted_action_map[choice_0_global]
-                if choice_0 is None:
-                    continue
-                
-                source_state = choice_to_state[choice_0]
-                source_state_visits = 1
-                if expected_visits is not None:
-                    source_state_visits = expected_visits[source_state]
-
-                # assert source_state_visits != 0
-                if source_state_visits == 0:
-                    continue
-
-                state_values = []
-                for option in options:
-
-                    assert len(self.hole_option_to_actions[hole_index][option]) > choice_index
-                    choice_global = self.hole_option_to_actions[hole_index][option][choice_index]
-                    choice = quotient_to_restricted_action_map[choice_global]
-                    choice_value = choice_values[choice]
-                    state_values.append(choice_value)
-
-                min_value = min(state_values)
-                max_value = max(state_values)
-                difference = (max_value - min_value) * source_state_visits
-                assert not math.isnan(difference)
-                difference_sum += difference
-                states_affected += 1
-            
-            if states_affected == 0:
-                hole_score = 0
-            else:
-                hole_score = difference_sum / states_affected
-            inconsistent_differences[hole_index] = hole_score
+            return super().estimate_scheduler_difference(mdp,quotient_choice_map,inconsistent_assignments,choice_values,expected_visits,choice_mask)
 
-        return inconsistent_differences
+        # note: the native kernel is optimized for posterior-unaware unfolding
+        if expected_visits is None:
+            expected_visits = []
+        if choice_mask is None:
+            choice_mask = stormpy.BitVector(mdp.nr_choices, True)
+        return payntbind.synthesis.estimateSchedulerDifference(
+            self.coloring, mdp.nondeterministic_choice_indices, quotient_choice_map, choice_values,
+            inconsistent_assignments, expected_visits, choice_mask)
 
 
     
@@ -643,32 +581,23 @@ class PomdpQuotient(paynt.quotient.quotient.Quotient):
         
         # posterior-aware update selection
         # for each memory node and for each prior, collect a set of possible posteriors
-        max_mem = max(self.observation_memory_size)
-        memory_prior_posteriors = [[set() for _ in range(self.observations)] for _ in range(max_mem)]
-        for state in range(dtmc.states):
-            mdp_state = dtmc.quotient_state_map[state]
-
-            # get prior
-            pomdp_state = self.pomdp_manager.state_prototype[mdp_state]
-            memory_node = self.pomdp_manager.state_memory[mdp_state]
-            prior = self.pomdp.get_observation(pomdp_state)
-            # prior_observations[memory_node].add(prior)
-
-            # get posterior observations
-            for entry in dtmc.model.transition_matrix.get_row(state):
-                successor = entry.column
-                mdp_successor = dtmc.quotient_state_map[successor]
-                pomdp_successor = self.pomdp_manager.state_prototype[mdp_successor]
-                posterior = self.pomdp.get_observation(pomdp_successor)
-                memory_prior_posteriors[memory_node][prior].add(posterior)
+        state_map = numpy.asarray(dtmc.quotient_state_map, dtype=numpy.int64)
+        state_prototype = numpy.asarray(self.pomdp_manager.state_prototype, dtype=numpy.int64)
+        state_memory = numpy.asarray(self.pomdp_manager.state_memory, dtype=numpy.int64)
+        observations = numpy.asarray(self.pomdp.observations, dtype=numpy.int64)
+        state_observation = observations[state_prototype[state_map]]
+
+        # for each transition of the DTMC, collect memory node and prior of its source and posterior of its target
+        arrays = paynt.utils.sparse.SparseArrays(dtmc.model)
+        source = arrays.row_to_group[arrays.entry_to_row()].astype(numpy.int64)
+        target = arrays.columns.astype(numpy.int64)
+        memory_prior_posterior = numpy.stack(
+            [state_memory[state_map[source]], state_observation[source], state_observation[target]], axis=1)
 
         # size of update function delta of a posterior-aware FSC:
         #   for each memory node and for each possible prior, a list of posterior-action pairs
         #   assuming sparse representation (not including delimeters)
-        size_delta = 0
-        for n_prior_posteriors in memory_prior_posteriors:
-            for n_z_posteriors in n_prior_posteriors:
-                size_delta += 2 * len(n_z_posteriors)
+        size_delta = 2 * len(numpy.unique(memory_prior_posterior, axis=0))
 
         return size_gamma + size_delta
 
@@ -3,6 +3,7 @@ import payntbind
 
 import paynt.family.family
 import paynt.quotient.models
+import paynt.utils.sparse
 
 import math
 import itertools
@@ -15,6 +16,27 @@ class Quotient:
 
     # if True, hole scores in the state will be multiplied with the number of expected visits of this state
     compute_expected_visits = True
+    # if True, compatible choices of subfamilies will be selected only among the choices selected in their parent family
+    incremental_build = True
+    # if True, sub-MDPs will be model checked directly on the quotient, without constructing the restricted model
+    masked_model_checking = False
+    # if True, sub-MDPs will be constructed without state valuations, choice origins and other metadata of the quotient
+    lean_submodels = False
+
+    # maximum number of iterations of the exact computation of expected visits within a strongly connected component
+    expected_visits_max_iterations = 100000
+    # if True, expected visits will be estimated from simulated paths; the exact computation is used as a fallback
+    # if the estimate is not reliable
+    sample_expected_visits = False
+    # number of simulated paths
+    expected_visits_samples = 1000
+    # maximum length of a simulated path
+    expected_visits_path_length = 10000
+    # maximum relative standard error of the expected path length
+    expected_visits_max_error = 0.1
+    # number of sampled and exact computations of expected visits
+    num_visits_sampled = 0
+    num_visits_exact = 0
 
     @staticmethod
     def make_vector_defined(vector):
@@ -49,6 +71,18 @@ class Quotient:
         # (optional) counter of discarded assignments
         self.discarded = 0
 
+        # model checker of sub-MDPs of the quotient, constructed on demand
+        self.masked_checker = None
+        self.masked_checker_quotient = None
+        # qualitative analysis of the quotient shared by all its sub-MDPs, constructed on demand
+        self.quotient_qualitative_analysis = None
+        self.quotient_qualitative_analysis_mdp = None
+
+        # NumPy arrays of the quotient matrix and of the state-to-holes map, constructed on demand
+        self.quotient_arrays = None
+        self.state_to_holes_csr = None
+        self.state_to_holes_csr_coloring = None
+
 
     def export_result(self, dtmc):
         ''' to be overridden '''
@@ -75,9 +109,17 @@ class Quotient:
 
         return model,state_map,choice_map
 
- 
+
     def restrict_quotient(self, choices):
-        return self.restrict_mdp(self.quotient_mdp, choices)        
+        '''
+        Restrict the (current) quotient to the selected actions. With lean sub-models, the restricted model is
+        constructed without state valuations, choice origins and other metadata; these remain available in the
+        quotient and can be accessed via the state/choice maps of the sub-MDP.
+        '''
+        mdp = self.quotient_mdp
+        if Quotient.lean_submodels and mdp.model_type == stormpy.storage.ModelType.MDP:
+            return payntbind.synthesis.restrict_mdp_lean(mdp, choices)
+        return self.restrict_mdp(mdp, choices)
 
     
     def build_from_choice_mask(self, choice_mask):
@@ -86,13 +128,58 @@ class Quotient:
         return mdp
 
     
+    def matrix_arrays(self):
+        ''' Get NumPy arrays of the transition matrix of the (current) quotient. '''
+        if self.quotient_arrays is None or self.quotient_arrays.model is not self.quotient_mdp:
+            self.quotient_arrays = paynt.utils.sparse.SparseArrays(self.quotient_mdp)
+        return self.quotient_arrays
+
+    def state_to_holes_arrays(self):
+        ''' Get a CSR representation (indptr,indices) of the map from quotient states to their holes. '''
+        if self.state_to_holes_csr_coloring is not self.coloring:
+            self.state_to_holes_csr = self.coloring.getStateToHolesArrays()
+            self.state_to_holes_csr_coloring = self.coloring
+        return self.state_to_holes_csr
+
+    def mdp_model_checker(self):
+        ''' Get the model checker of sub-MDPs of the (current) quotient. '''
+        if self.masked_checker_quotient is not self.quotient_mdp:
+            self.masked_checker = payntbind.synthesis.MdpModelChecker(self.quotient_mdp)
+            self.masked_checker_quotient = self.quotient_mdp
+        return self.masked_checker
+
+    def qualitative_analysis(self):
+        ''' Get the qualitative analysis of the (current) quotient, see payntbind.synthesis.QualitativeAnalysis. '''
+        if self.quotient_qualitative_analysis_mdp is not self.quotient_mdp:
+            self.quotient_qualitative_analysis = payntbind.synthesis.QualitativeAnalysis(self.quotient_mdp)
+            self.quotient_qualitative_analysis_mdp = self.quotient_mdp
+        return self.quotient_qualitative_analysis
+
+    def supports_masked_model_checking(self):
+        ''' Masked model checking is available for reachability properties only. '''
+        return self.masked_model_checking and all(
+            prop.formula.subformula.is_eventually_formula for prop in self.specification.all_properties()
+        )
+
+    
     def build(self, family):
         ''' Construct the quotient MDP for the family. '''
-        # select actions compatible with the family and restrict the quotient
-        choices = self.coloring.selectCompatibleChoices(family.family)
+        # select actions compatible with the family: the subfamily differs from its parent only in the splitter, so
+        # only choices of the splitter need to be removed from the choices selected in the parent family
+        parent_info = family.parent_info
+        if Quotient.incremental_build and parent_info is not None and parent_info.selected_choices is not None:
+            choices = self.coloring.selectCompatibleChoices(
+                family.family, parent_info.selected_choices, parent_info.splitter)
+        else:
+            choices = self.coloring.selectCompatibleChoices(family.family)
+        if self.supports_masked_model_checking():
+            mdp = paynt.quotient.models.MaskedMDP(self, choices, family)
+        else:
+            mdp = self.build_from_choice_mask(choices)
         family.selected_choices = choices
-        family.mdp = self.build_from_choice_mask(choices)
+        family.mdp = mdp
         family.mdp.design_space = family
+        family.mdp.analysis_hints = family.translate_analysis_hints()
 
 
     def build_with_second_coloring(self, family, main_coloring, main_family):
@@ -129,8 +216,7 @@ class Quotient:
     def build_assignment(self, family):
         assert family.size == 1, "expecting family of size 1"
         choices = self.coloring.selectCompatibleChoices(family.family)
-        mdp,state_map,choice_map = self.restrict_quotient(choices)
-        dtmc = Quotient.mdp_to_dtmc(mdp)
+        dtmc,state_map,choice_map = payntbind.synthesis.constructInducedDtmc(self.quotient_mdp, choices)
         return paynt.quotient.models.DTMC(dtmc,self,state_map,choice_map)
     
     def empty_scheduler(self):
@@ -153,6 +239,10 @@ class Quotient:
         return state_to_choice_reachable
 
     def scheduler_to_state_to_choice(self, mdp, scheduler, keep_reachable_choices=True):
+        if isinstance(mdp, paynt.quotient.models.MaskedMDP):
+            # the scheduler is already given over the quotient and defined only in the reachable states
+            num_choices = self.quotient_mdp.nr_choices
+            return [choice if choice < num_choices else None for choice in scheduler]
         state_to_quotient_choice = payntbind.synthesis.schedulerToStateToGlobalChoice(scheduler, mdp.model, mdp.quotient_choice_map)
         state_to_choice = self.empty_scheduler()
         for state in range(mdp.model.nr_states):
@@ -173,7 +263,7 @@ class Quotient:
     
     def scheduler_selection(self, mdp, scheduler, coloring=None):
         ''' Get hole options involved in the scheduler selection. '''
-        assert scheduler.memoryless and scheduler.deterministic
+        assert isinstance(mdp, paynt.quotient.models.MaskedMDP) or (scheduler.memoryless and scheduler.deterministic)
         
         state_to_choice = self.scheduler_to_state_to_choice(mdp, scheduler)
         
@@ -186,7 +276,7 @@ class Quotient:
 
     
     
-    def choice_values(self, mdp, prop, state_values):
+    def choice_values_and_expected_visits(self, mdp, prop, state_values, choices):
         '''
         Get choice values after model checking MDP against a property.
         Value of choice c: s -> s' is computed as
@@ -194,62 +284,37 @@ class Quotient:
         - rew(c) is the reward associated with choice (c)
         - P(s,c,s') is the probability of transitioning from s to s' under action c
         - mc(s') is the model checking result in state s'
+        Additionally, compute expected number of visits in the states of DTMC induced by the choices (unless disabled),
+        without constructing the DTMC, or estimate them from simulated paths.
+        :return (1) a NumPy array of choice values, (2) a NumPy array of expected visits of the states of the MDP or None
         '''
-
-        # multiply probability with model checking results
-        choice_values = payntbind.synthesis.multiply_with_vector(mdp.transition_matrix, state_values)
-        choice_values = Quotient.make_vector_defined(choice_values)
-
-        # if the associated reward model has state-action rewards, then these must be added to choice values
-        if prop.reward:
-            reward_name = prop.formula.reward_name
-            rm = mdp.reward_models.get(reward_name)
-            assert rm.has_state_action_rewards
-            choice_rewards = list(rm.state_action_rewards)
-            assert mdp.nr_choices == len(choice_rewards)
-            for choice in range(mdp.nr_choices):
-                choice_values[choice] += choice_rewards[choice]
-
-        return choice_values
+        reward_name = prop.formula.reward_name if prop.reward else ""
+        num_samples = Quotient.expected_visits_samples if Quotient.sample_expected_visits else 0
+        seed = Quotient.num_visits_sampled + Quotient.num_visits_exact
+        choice_values,expected_visits,sampled = payntbind.synthesis.choiceValuesAndExpectedVisits(
+            mdp, state_values, reward_name, choices, Quotient.compute_expected_visits, prop.minimizing,
+            paynt.verification.property.Property.model_checking_precision, Quotient.expected_visits_max_iterations,
+            num_samples, Quotient.expected_visits_path_length, Quotient.expected_visits_max_error, seed
+        )
+        if expected_visits is not None:
+            if sampled:
+                Quotient.num_visits_sampled += 1
+            else:
+                Quotient.num_visits_exact += 1
+        return choice_values,expected_visits
 
 
-    def expected_visits(self, mdp, prop, choices):
+    def estimate_scheduler_difference(self, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits=None, choice_mask=None):
         '''
-        Compute expected number of visits in the states of DTMC induced by the shoices.
+        :param choice_mask if set, only these choices of the mdp will be considered
         '''
-        if not Quotient.compute_expected_visits:
-            return None
-
-        # extract DTMC induced by this MDP-scheduler
-        sub_mdp,state_map,_ = self.restrict_mdp(mdp, choices)
-        dtmc = Quotient.mdp_to_dtmc(sub_mdp)
-
-        # compute visits
-        dtmc_visits = stormpy.compute_expected_number_of_visits(paynt.verification.property.Property.environment, dtmc).get_values()
-        dtmc_visits = list(dtmc_visits)
-
-        # handle infinity- and zero-visits
-        if prop.minimizing:
-            dtmc_visits = Quotient.make_vector_defined(dtmc_visits)
-        else:
-            dtmc_visits = [ value if value != math.inf else 0 for value in dtmc_visits]
-
-        # map vector of expected visits onto the state space of the quotient MDP
-        expected_visits = [0] * mdp.nr_states
-        for state in range(dtmc.nr_states):
-            mdp_state = state_map[state]
-            visits = dtmc_visits[state]
-            expected_visits[mdp_state] = visits
-
-        return expected_visits
-
-
-    def estimate_scheduler_difference(self, mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits=None):
         if expected_visits is None:
             expected_visits = [1] * mdp.nr_states
+        if choice_mask is None:
+            choice_mask = stormpy.BitVector(mdp.nr_choices, True)
         hole_variance = payntbind.synthesis.computeInconsistentHoleVariance(
             self.design_space.family, mdp.nondeterministic_choice_indices, quotient_choice_map, choice_values,
-            self.coloring, inconsistent_assignments, expected_visits)
+            self.coloring, inconsistent_assignments, expected_visits, choice_mask)
         return hole_variance
 
     
@@ -274,11 +339,21 @@ class Quotient:
         expected_visits = None
         inconsistent_differences = None
         
-        if not scheduler_is_consistent:
+        if not scheduler_is_consistent and isinstance(mdp, paynt.quotient.models.MaskedMDP):
+            # the result is given over the quotient: analyze the quotient restricted to the reachable choices; the
+            # expected visits (including the average replacing infinite visits) depend on the reachable states only
+            choices = self.state_to_choice_to_choices(result.scheduler)
+            choice_values,expected_visits = self.choice_values_and_expected_visits(
+                self.quotient_mdp, prop, result.get_values(), choices)
+            quotient_choice_map = list(range(self.quotient_mdp.nr_choices))
+            inconsistent_differences = self.estimate_scheduler_difference(
+                self.quotient_mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits,
+                mdp.reachable_choices)
+        elif not scheduler_is_consistent:
             # extract choice values, compute expected visits and estimate scheduler difference
-            choice_values = self.choice_values(mdp.model, prop, result.get_values())
             choices = result.scheduler.compute_action_support(mdp.model.nondeterministic_choice_indices)
-            expected_visits = self.expected_visits(mdp.model, prop, choices)
+            choice_values,expected_visits = self.choice_values_and_expected_visits(
+                mdp.model, prop, result.get_values(), choices)
             inconsistent_differences = self.estimate_scheduler_difference(mdp.model, mdp.quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
         # print("mdp.model",mdp.model)
         # print("mdp.quotient_choice_map",mdp.quotient_choice_map)
@@ -391,6 +466,10 @@ class Quotient:
         
         family.splitter = splitter
         parent_info = family.collect_parent_info(self.specification)
+        if new_design_space.size != mdp.design_space.size:
+            # holes other than the splitter were restricted as well: choices of subfamilies cannot be selected by
+            # refining the choices of this family wrt. the splitter only
+            parent_info.selected_choices = None
         for suboption in suboptions:
             subholes = new_design_space.subholes(splitter, suboption)
             design_subspace = paynt.family.family.DesignSpace(subholes, parent_info)
@@ -405,7 +484,15 @@ class Quotient:
         Double-check whether this assignment truly improves optimum.
         '''
         dtmc = self.build_assignment(assignment)
+        # with adaptive precision, the assignment is double-checked with a finer precision
+        prop_class = paynt.verification.property.Property
+        if prop_class.adaptive_precision:
+            prop_class.set_solver_precision(prop_class.double_check_precision)
+        prop_class.set_double_checking(True)
         res = dtmc.check_specification(self.specification)
+        prop_class.set_double_checking(False)
+        if prop_class.adaptive_precision:
+            prop_class.set_solver_precision(prop_class.model_checking_precision)
         # opt_result = dtmc.model_check_property(opt_prop)
         if res.constraints_result.sat and self.specification.optimality.improves_optimum(res.optimality_result.value):
             return assignment, res.optimality_result.value
@@ -454,17 +541,11 @@ class Quotient:
 
 
     def identify_absorbing_states(self, model):
-        state_is_absorbing = [True] * model.nr_states
-        tm = model.transition_matrix
-        for state in range(model.nr_states):
-            for choice in tm.get_rows_for_group(state):
-                for entry in tm.get_row(choice):
-                    if entry.column != state:
-                        state_is_absorbing[state] = False
-                        break
-                if not state_is_absorbing[state]:
-                    break
-        return state_is_absorbing
+        if model is self.quotient_mdp:
+            arrays = self.matrix_arrays()
+        else:
+            arrays = paynt.utils.sparse.SparseArrays(model)
+        return arrays.absorbing_states().tolist()
 
     def get_property(self):
         assert self.specification.num_properties == 1, "expecting a single property"
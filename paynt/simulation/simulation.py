@@ -1,3 +1,5 @@
+import paynt.utils.sparse
+
 import random
 import numpy
 import json
@@ -19,33 +21,26 @@ class SimulatedModel:
         # current state for the simulation
         self.current_state = self.initial_state
 
+        arrays = paynt.utils.sparse.SparseArrays(model)
+
         # [simulation cash] for each state, a number of actions
-        self.state_num_actions = [model.get_nr_available_actions(s) for s in range(model.nr_states)]
+        self.state_num_actions = numpy.diff(arrays.row_groups).tolist()
 
         # [simulation cash] transition matrix
+        columns = arrays.columns.tolist()
+        values = arrays.values.tolist()
+        row_starts = arrays.row_starts.tolist()
+        row_groups = arrays.row_groups.tolist()
         self.state_row_group = []
-        tm = self.model.transition_matrix
         for state in range(self.model.nr_states):
             row_group = []
-            num_actions = self.model.get_nr_available_actions(state)
-            for row_index in range(tm.get_row_group_start(state),tm.get_row_group_end(state)):
-                columns = [entry.column for entry in tm.get_row(row_index)]
-                values = [entry.value() for entry in tm.get_row(row_index)]
-                row_group.append( (columns,values) )
+            for row_index in range(row_groups[state],row_groups[state+1]):
+                start,end = row_starts[row_index],row_starts[row_index+1]
+                row_group.append( (columns[start:end],values[start:end]) )
             self.state_row_group.append(row_group)
 
         # identify which states are absorbing
-        self.state_is_absorbing = []
-        for state in range(self.model.nr_states):
-            absorbing = True
-            for row_index in range(tm.get_row_group_start(state),tm.get_row_group_end(state)):
-                for entry in tm.get_row(row_index):
-                    if entry.column != state:
-                        absorbing = False
-                        break
-                if not absorbing:
-                    break
-            self.state_is_absorbing.append(absorbing)
+        self.state_is_absorbing = arrays.absorbing_states().tolist()
 
 
     @property
@@ -0,0 +1,368 @@
+import paynt.family.family
+
+import collections
+import heapq
+import math
+import numpy
+import tempfile
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Frontier:
+    '''
+    Families waiting to be explored. Subclasses define the order in which families are popped. The frontier keeps
+    track of the memory held by the parent info of pending families, where parent info shared by siblings is
+    counted once.
+    '''
+
+    def __init__(self):
+        # for each parent info (by id), the number of pending families referencing it and its size upon the first push
+        self.parent_info_references = {}
+        self.parent_info_bytes = 0
+
+    def __len__(self):
+        ''' to be overridden '''
+        pass
+
+    def __bool__(self):
+        return len(self) > 0
+
+    @property
+    def nbytes(self):
+        ''' :return an estimate of the number of bytes held by the pending families '''
+        return self.parent_info_bytes
+
+    def insert(self, family):
+        ''' to be overridden '''
+        pass
+
+    def remove(self):
+        ''' to be overridden '''
+        pass
+
+    def remove_all(self):
+        ''' to be overridden '''
+        pass
+
+    def reference(self, family, count):
+        parent_info = family.parent_info
+        if parent_info is None:
+            return
+        key = id(parent_info)
+        references,nbytes = self.parent_info_references.get(key,(0,None))
+        references += count
+        if references == 0:
+            del self.parent_info_references[key]
+            self.parent_info_bytes -= nbytes
+            return
+        if nbytes is None:
+            nbytes = parent_info.nbytes
+            self.parent_info_bytes += nbytes
+        self.parent_info_references[key] = (references,nbytes)
+
+    def strip_parent_info(self, parent_info):
+        ''' Strip the parent info of some pending families (see ParentInfo.strip) to save memory. '''
+        parent_info.strip()
+        key = id(parent_info)
+        if key in self.parent_info_references:
+            references,nbytes = self.parent_info_references[key]
+            self.parent_info_bytes -= nbytes
+            self.parent_info_references[key] = (references,0)
+
+    def push(self, family):
+        self.insert(family)
+        self.reference(family, 1)
+
+    def push_all(self, families):
+        for family in families:
+            self.push(family)
+
+    def pop(self):
+        family = self.remove()
+        self.reference(family, -1)
+        return family
+
+    def drain(self):
+        '''
+        Remove all families from the frontier.
+        :return a list of the removed families in the order they were pushed, i.e. pushing them back restores the
+            frontier
+        '''
+        families = self.remove_all()
+        self.parent_info_references = {}
+        self.parent_info_bytes = 0
+        return families
+
+
+class StackFrontier(Frontier):
+    ''' Depth-first exploration: the last pushed family is popped first. '''
+
+    def __init__(self):
+        super().__init__()
+        self.families = []
+
+    def __len__(self):
+        return len(self.families)
+
+    def insert(self, family):
+        self.families.append(family)
+
+    def remove(self):
+        return self.families.pop()
+
+    def remove_all(self):
+        families = self.families
+        self.families = []
+        return families
+
+
+class QueueFrontier(Frontier):
+    ''' Breadth-first exploration: the first pushed family is popped first. '''
+
+    def __init__(self):
+        super().__init__()
+        self.families = collections.deque()
+
+    def __len__(self):
+        return len(self.families)
+
+    def insert(self, family):
+        self.families.append(family)
+
+    def remove(self):
+        return self.families.popleft()
+
+    def remove_all(self):
+        families = list(self.families)
+        self.families.clear()
+        return families
+
+
+class PriorityFrontier(Frontier):
+    '''
+    Best-first exploration: the family with the lowest priority is popped first. Families having the same priority
+    are popped in the depth-first order.
+    '''
+
+    def __init__(self, priority):
+        '''
+        :param priority a function family -> priority (a number or a tuple of numbers), evaluated upon push
+        '''
+        super().__init__()
+        self.priority = priority
+        self.heap = []
+        self.num_pushed = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def insert(self, family):
+        self.num_pushed += 1
+        heapq.heappush(self.heap, (self.priority(family), -self.num_pushed, family))
+
+    def remove(self):
+        return heapq.heappop(self.heap)[-1]
+
+    def remove_all(self):
+        entries = sorted(self.heap, key=lambda entry: -entry[1])
+        self.heap = []
+        return [entry[-1] for entry in entries]
+
+
+class PackedFamily:
+    ''' A pending family whose hole options are stored in a row of a PackedFamilyStore. '''
+    __slots__ = ["slot", "size", "refinement_depth", "constraint_indices", "parent_info"]
+
+    def __init__(self, slot, family):
+        self.slot = slot
+        self.size = family.size
+        self.refinement_depth = family.refinement_depth
+        self.constraint_indices = family.constraint_indices
+        self.parent_info = family.parent_info
+
+
+class PackedFamilyStore:
+    '''
+    Hole options of families packed as bitmasks, one row of 64-bit words per family. Rows are kept in memory until
+    the memory budget is exhausted; further rows are stored in chunks of a memory-mapped temporary file. Rows of
+    removed families are reused, rows in memory first.
+    '''
+
+    # number of rows of a single chunk of the spill file
+    chunk_rows = 4096
+
+    def __init__(self, num_words, memory_budget):
+        '''
+        :param num_words number of words of a single row
+        :param memory_budget number of bytes that can be held in memory
+        '''
+        self.num_words = num_words
+        self.memory_rows = max(1, memory_budget // (num_words*8))
+        self.memory = numpy.zeros((min(self.memory_rows,PackedFamilyStore.chunk_rows),num_words), dtype=numpy.uint64)
+        self.spill_file = None
+        self.spill_chunks = []
+        self.num_rows = 0
+        self.free_rows = []
+
+    @property
+    def nbytes(self):
+        ''' :return the number of bytes held in memory '''
+        return self.memory.nbytes
+
+    def allocate(self):
+        if self.free_rows:
+            return heapq.heappop(self.free_rows)
+        slot = self.num_rows
+        self.num_rows += 1
+        if slot < self.memory_rows:
+            if slot == self.memory.shape[0]:
+                rows = min(2*self.memory.shape[0], self.memory_rows)
+                self.memory = numpy.resize(self.memory, (rows,self.num_words))
+            return slot
+        chunk = (slot - self.memory_rows) // PackedFamilyStore.chunk_rows
+        if chunk == len(self.spill_chunks):
+            self.add_spill_chunk()
+        return slot
+
+    def add_spill_chunk(self):
+        if self.spill_file is None:
+            logger.info("pending families exceeded the memory budget, spilling them to disk")
+            self.spill_file = tempfile.TemporaryFile(prefix="paynt-frontier-")
+        chunk_bytes = PackedFamilyStore.chunk_rows * self.num_words * 8
+        offset = len(self.spill_chunks) * chunk_bytes
+        self.spill_file.truncate(offset + chunk_bytes)
+        chunk = numpy.memmap(
+            self.spill_file, dtype=numpy.uint64, mode="r+", offset=offset,
+            shape=(PackedFamilyStore.chunk_rows,self.num_words)
+        )
+        self.spill_chunks.append(chunk)
+
+    def row(self, slot):
+        if slot < self.memory_rows:
+            return self.memory[slot]
+        chunk,row = divmod(slot - self.memory_rows, PackedFamilyStore.chunk_rows)
+        return self.spill_chunks[chunk][row]
+
+    def release(self, slot):
+        heapq.heappush(self.free_rows, slot)
+
+
+class CompactFrontier(Frontier):
+    '''
+    A frontier keeping pending families packed in a PackedFamilyStore. The order of exploration is given by the
+    underlying frontier that holds lightweight PackedFamily handles. Families are rehydrated when popped: options
+    of the holes are restored onto a copy of the first pushed family, with which unrestricted holes are shared.
+    Pending families also reference the parent info of their parent, which may hold large analysis hints. Once the
+    memory budget is exceeded, parent info is stripped (see ParentInfo.strip), the one referenced for the longest
+    time first.
+    '''
+
+    def __init__(self, frontier, memory_budget):
+        '''
+        :param frontier an empty frontier determining the exploration order
+        :param memory_budget number of bytes of packed families and their parent info that can be held in memory;
+            packed families exceeding half of the budget are spilled to disk
+        '''
+        super().__init__()
+        self.frontier = frontier
+        self.memory_budget = memory_budget
+        self.template = None
+        self.store = None
+        # parent info referenced by pending families that was not stripped yet, in the order of the first reference
+        self.unstripped_parent_infos = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.frontier)
+
+    @property
+    def nbytes(self):
+        store_bytes = 0 if self.store is None else self.store.nbytes
+        return self.frontier.nbytes + store_bytes
+
+    def pack(self, family):
+        if self.template is None:
+            self.template = family.copy()
+            self.store = PackedFamilyStore(family.packed_num_words, self.memory_budget // 2)
+        slot = self.store.allocate()
+        family.pack_options(self.store.row(slot))
+        return PackedFamily(slot, family)
+
+    def unpack(self, packed):
+        family = paynt.family.family.DesignSpace(self.template, packed.parent_info)
+        family.unpack_options(self.store.row(packed.slot))
+        family.refinement_depth = packed.refinement_depth
+        family.constraint_indices = packed.constraint_indices
+        self.store.release(packed.slot)
+        return family
+
+    def enforce_memory_budget(self):
+        while self.nbytes > self.memory_budget and self.unstripped_parent_infos:
+            _,parent_info = self.unstripped_parent_infos.popitem(last=False)
+            self.frontier.strip_parent_info(parent_info)
+
+    def push(self, family):
+        self.frontier.push(self.pack(family))
+        parent_info = family.parent_info
+        if parent_info is not None and parent_info.nbytes > 0:
+            self.unstripped_parent_infos.setdefault(id(parent_info), parent_info)
+            self.enforce_memory_budget()
+
+    def pop(self):
+        packed = self.frontier.pop()
+        parent_info = packed.parent_info
+        if parent_info is not None and id(parent_info) not in self.frontier.parent_info_references:
+            # no longer referenced
+            self.unstripped_parent_infos.pop(id(parent_info), None)
+        return self.unpack(packed)
+
+    def drain(self):
+        self.unstripped_parent_infos.clear()
+        return [self.unpack(packed) for packed in self.frontier.drain()]
+
+
+def bound_priority(specification):
+    '''
+    :return a priority function preferring families whose parent has the best primary value of the optimality
+        property, i.e. the most promising bound; families without such a bound (e.g. the root) are preferred
+    '''
+    if not specification.has_optimality:
+        return lambda family: 0
+    prop = specification.optimality
+    def priority(family):
+        parent_info = family.parent_info
+        if parent_info is None or parent_info.primary_results is None or prop not in parent_info.primary_results:
+            return -math.inf
+        value = parent_info.primary_results[prop][1]
+        return -value if prop.maximizing else value
+    return priority
+
+
+# available exploration orders
+exploration_orders = ["dfs", "bfs", "bound", "size", "depth", "bound-depth"]
+
+def create_frontier(order, specification):
+    '''
+    :param order one of the exploration orders:
+        - dfs: depth-first exploration (default)
+        - bfs: breadth-first exploration
+        - bound: families with the most promising bound (the primary value of their parent) first
+        - size: smallest families first
+        - depth: most refined families first
+        - bound-depth: by bound, ties broken by depth
+    '''
+    if order == "dfs":
+        return StackFrontier()
+    if order == "bfs":
+        return QueueFrontier()
+    if order == "bound":
+        return PriorityFrontier(bound_priority(specification))
+    if order == "size":
+        return PriorityFrontier(lambda family: family.size)
+    if order == "depth":
+        return PriorityFrontier(lambda family: -family.refinement_depth)
+    if order == "bound-depth":
+        bound = bound_priority(specification)
+        return PriorityFrontier(lambda family: (bound(family), -family.refinement_depth))
+    raise ValueError(f"unknown exploration order {order}")
@@ -97,13 +97,13 @@ def test_nodes(quotient, prop, node1, node2):
 
     # try policy1 for family2
     policy,mdp = quotient.fix_and_apply_policy_to_family(node2.family, policy12)
-    policy_result = mdp.model_check_property(prop, alt=True)
+    policy_result = mdp.model_check_property(prop, alt=True, extract_scheduler=False)
     if policy_result.sat:
         return policy
 
     # try policy2 for family1
     policy,mdp = quotient.fix_and_apply_policy_to_family(node1.family, policy21)
-    policy_result = mdp.model_check_property(prop, alt=True)
+    policy_result = mdp.model_check_property(prop, alt=True, extract_scheduler=False)
     if policy_result.sat:
         return policy
 
@@ -150,7 +150,7 @@ class PolicyTreeNode:
         assert self.policy is not None
         quotient.build(self.family)
         if self.policy == False:
-            result = self.family.mdp.model_check_property(prop)
+            result = self.family.mdp.model_check_property(prop, extract_scheduler=False)
             assert not result.sat
         else:
             SynthesizerPolicyTree.double_check_policy(quotient, self.family, prop, self.policy)
@@ -453,10 +453,11 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
         if family.size == 1:
             quotient.assert_mdp_is_deterministic(mdp, family)
         
-        DOUBLE_CHECK_PRECISION = 1e-6
         default_precision = Property.model_checking_precision
-        Property.set_model_checking_precision(DOUBLE_CHECK_PRECISION)
-        policy_result = mdp.model_check_property(prop, alt=True)
+        Property.set_model_checking_precision(Property.double_check_precision)
+        Property.set_double_checking(True)
+        policy_result = mdp.model_check_property(prop, alt=True, extract_scheduler=False)
+        Property.set_double_checking(False)
         Property.set_model_checking_precision(default_precision)
         if not policy_result.sat:
             logger.warning("policy should be SAT but (most likely due to model checking precision) has value {}".format(policy_result.value))
@@ -465,7 +466,7 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
     
     def verify_policy(self, family, prop, policy):
         _,mdp = self.quotient.fix_and_apply_policy_to_family(family, policy)
-        policy_result = mdp.model_check_property(prop, alt=True)
+        policy_result = mdp.model_check_property(prop, alt=True, extract_scheduler=False)
         self.stat.iteration(mdp)
         return policy_result.sat
 
@@ -586,10 +587,8 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
     
     def compute_scores(self, prop, scheduler_choices, state_values, inconsistent_assignments):
         mdp = self.quotient.quotient_mdp
-        choice_values = self.quotient.choice_values(mdp, prop, state_values)
-        expected_visits = None
-        if self.quotient.compute_expected_visits:
-            expected_visits = self.quotient.expected_visits(mdp, prop, scheduler_choices)
+        choice_values,expected_visits = self.quotient.choice_values_and_expected_visits(
+            mdp, prop, state_values, scheduler_choices)
         quotient_choice_map = [choice for choice in range(self.quotient.quotient_mdp.nr_choices)]
         scores = self.quotient.estimate_scheduler_difference(self.quotient.quotient_mdp, quotient_choice_map, inconsistent_assignments, choice_values, expected_visits)
         return scores
@@ -802,7 +801,7 @@ class SynthesizerPolicyTree(paynt.synthesizer.synthesizer.Synthesizer):
 
         for unsat_family in unsat_mdp_families:
             self.quotient.build(unsat_family)
-            result = unsat_family.mdp.model_check_property(prop)
+            result = unsat_family.mdp.model_check_property(prop, extract_scheduler=False)
             assert not result.sat, "double check fail"
             unsat_family.mdp = None
 
@@ -2,6 +2,7 @@ import stormpy.storage
 
 import paynt.utils.profiler
 import paynt.synthesizer.synthesizer
+import paynt.verification.property
 
 import math
 
@@ -56,6 +57,19 @@ class Statistic:
         self.num_policies_merged = None
         self.num_policies_yes = None
 
+        # coarse model checking calls (adaptive precision) counted before this synthesis started
+        prop_class = paynt.verification.property.Property
+        self.num_coarse_sufficient_start = prop_class.num_coarse_sufficient
+        self.num_coarse_refined_start = prop_class.num_coarse_refined
+        # expected visits computations counted before this synthesis started
+        self.num_visits_sampled_start = self.quotient.num_visits_sampled
+        self.num_visits_exact_start = self.quotient.num_visits_exact
+
+        # families waiting to be explored and the memory held by their parent info
+        self.pending_families = None
+        self.pending_bytes = 0
+        self.pending_bytes_peak = 0
+
         self.family_size = None
         self.synthesis_timer = paynt.utils.profiler.Timer()
         self.status_horizon = Statistic.status_period_seconds
@@ -69,6 +83,9 @@ class Statistic:
     
     def iteration(self, model):
         ''' Identify the type of the model and count corresponding iteration. '''
+        if isinstance(model, paynt.quotient.models.MaskedMDP):
+            self.iteration_mdp(model.states)
+            return
         if isinstance(model, paynt.quotient.models.MarkovChain):
             model = model.model
         if type(model) == stormpy.storage.SparseDtmc:
@@ -99,6 +116,12 @@ class Statistic:
         self.acc_size_game += size_game
         self.print_status()
 
+    def pending(self, frontier):
+        ''' Record the families waiting to be explored in the frontier (see paynt.synthesizer.frontier.Frontier). '''
+        self.pending_families = len(frontier)
+        self.pending_bytes = frontier.nbytes
+        self.pending_bytes_peak = max(self.pending_bytes_peak, self.pending_bytes)
+
     def new_fsc_found(self, value, assignment, size):
         time_elapsed = round(self.synthesis_timer_total.read(),1)
         # print(f'new opt: {value}')
@@ -140,6 +163,10 @@ class Statistic:
         if self.iterations_dtmc is not None:
             iters += [f"DTMC: {self.iterations_dtmc}"]
         ret_str += ", iters = {" + ", ".join(iters) + "}"
+
+        if self.pending_families is not None:
+            pending_mb = round(self.pending_bytes / 2**20, 1)
+            ret_str += f", pending = {self.pending_families} ({pending_mb} MB)"
         
         spec = self.quotient.specification
         if spec.has_optimality and spec.optimality.optimum is not None:
@@ -191,6 +218,26 @@ class Statistic:
             avg_size = round(safe_division(self.acc_size_dtmc, self.iterations_dtmc))
             type_stats = f"DTMC stats: avg DTMC size: {avg_size}, iterations: {self.iterations_dtmc}"
             iterations += f"{type_stats}\n"
+
+        if self.pending_families is not None:
+            peak_mb = round(self.pending_bytes_peak / 2**20, 1)
+            iterations += f"pending families: peak memory {peak_mb} MB\n"
+
+        prop_class = paynt.verification.property.Property
+        if prop_class.adaptive_precision:
+            sufficient = prop_class.num_coarse_sufficient - self.num_coarse_sufficient_start
+            refined = prop_class.num_coarse_refined - self.num_coarse_refined_start
+            iterations += f"adaptive precision: coarse results sufficient: {sufficient}, refined: {refined}\n"
+
+        if prop_class.solver_selector is not None:
+            iterations += prop_class.solver_selector.get_summary()
+        if prop_class.result_cache is not None:
+            iterations += prop_class.result_cache.get_summary()
+
+        if self.quotient.sample_expected_visits:
+            sampled = self.quotient.num_visits_sampled - self.num_visits_sampled_start
+            exact = self.quotient.num_visits_exact - self.num_visits_exact_start
+            iterations += f"expected visits: sampled: {sampled}, exact (fallback): {exact}\n"
         return iterations
 
     def get_summary_synthesis(self):
@@ -6,6 +6,7 @@
 #
 
 import paynt.synthesizer.statistic
+import paynt.synthesizer.frontier
 
 import logging
 logger = logging.getLogger(__name__)
@@ -24,6 +25,12 @@ class Synthesizer:
 
     # if True, some subfamilies can be discarded and some holes can be generalized
     incomplete_search = False
+    # order in which pending families are explored, see paynt.synthesizer.frontier.create_frontier
+    exploration_order = "dfs"
+    # if True, pending families are kept packed as hole option bitmasks, see paynt.synthesizer.frontier.CompactFrontier
+    compact_frontier = False
+    # memory budget (in MB) for packed pending families; further families are spilled to a memory-mapped file
+    compact_frontier_budget = 1024
 
     @staticmethod
     def choose_synthesizer(quotient, method, fsc_synthesis, storm_control):
@@ -76,6 +83,13 @@ class Synthesizer:
         ''' to be overridden '''
         pass
     
+    def create_frontier(self):
+        ''' :return an empty frontier of families to be explored in the selected exploration order '''
+        frontier = paynt.synthesizer.frontier.create_frontier(Synthesizer.exploration_order, self.quotient.specification)
+        if Synthesizer.compact_frontier:
+            frontier = paynt.synthesizer.frontier.CompactFrontier(frontier, Synthesizer.compact_frontier_budget * 2**20)
+        return frontier
+
     def explore(self, family):
         self.explored += family.size
 
@@ -1,4 +1,5 @@
 import paynt.synthesizer.synthesizer
+import paynt.synthesizer.frontier
 import paynt.quotient.pomdp
 
 import logging
@@ -34,11 +35,12 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
         # return self.synthesize_one_experimental(family)
 
         satisfying_assignment = None
-        families = [family]
+        families = self.create_frontier()
+        families.push(family)
 
         while families:
 
-            family = families.pop(-1)
+            family = families.pop()
 
             self.verify_family(family)
             self.update_optimum(family)
@@ -51,7 +53,8 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
 
             # undecided
             subfamilies = self.quotient.split(family, paynt.synthesizer.synthesizer.Synthesizer.incomplete_search)
-            families = families + subfamilies
+            families.push_all(subfamilies)
+            self.stat.pending(families)
 
         return satisfying_assignment
 
@@ -69,37 +72,37 @@ class SynthesizerAR(paynt.synthesizer.synthesizer.Synthesizer):
         self.quotient.discarded = 0
 
         satisfying_assignment = None
-        families = [family]
-        while families:
+        # undecided families, the one with the best value first
+        families = paynt.synthesizer.frontier.PriorityFrontier(lambda f: -self.family_value(f))
+        subfamilies = [family]
+        while True:
 
-            # analyze all families, keep optimal solution
-            for family in families:
-                if family.analysis_result is not None:
-                    continue
+            # analyze new families, keep optimal solution
+            for family in subfamilies:
                 self.verify_family(family)
                 self.update_optimum(family)
                 if family.analysis_result.improving_assignment is not None:
                     satisfying_assignment = family.analysis_result.improving_assignment
-            
-            # analyze families once more and keep undecided ones
-            undecided_families = []
-            for family in families:
-                family.analysis_result.evaluate()
                 if family.analysis_result.can_improve == False:
                     self.explore(family)
                 else:
-                    undecided_families.append(family)
-            if not undecided_families:
+                    families.push(family)
+
+            # pick the undecided family with the best value; the optimum might have improved since the family was
+            # analyzed, so analyze it once more
+            family = None
+            while families:
+                family = families.pop()
+                family.analysis_result.evaluate()
+                if family.analysis_result.can_improve != False:
+                    break
+                self.explore(family)
+                family = None
+            if family is None:
                 break
-            
-            # sort families
-            undecided_families = sorted(undecided_families, key=lambda f: self.family_value(f), reverse=True)
-            # print([self.family_value(f) for f in undecided_families])
 
             # split family with the best value
-            family = undecided_families[0]
             subfamilies = self.quotient.split(family, paynt.synthesizer.synthesizer.Synthesizer.incomplete_search)
-            families = subfamilies + undecided_families[1:]
-                
+            self.stat.pending(families)
 
         return satisfying_assignment
@@ -1,5 +1,6 @@
 from stormpy import pomdp
 from .synthesizer import Synthesizer
+import paynt.synthesizer.frontier
 from ..quotient.storm_pomdp_control import StormPOMDPControl
 from os import makedirs
 
@@ -115,7 +116,13 @@ class SynthesizerARStorm(Synthesizer):
         self.quotient.discarded = 0
 
         satisfying_assignment = None
-        families = [family]
+        if SynthesizerARStorm.exploration_order_dfs:
+            families = self.create_frontier()
+        else:
+            families = paynt.synthesizer.frontier.QueueFrontier()
+            if Synthesizer.compact_frontier:
+                families = paynt.synthesizer.frontier.CompactFrontier(families, Synthesizer.compact_frontier_budget * 2**20)
+        families.push(family)
 
         while families:
 
@@ -145,7 +152,8 @@ class SynthesizerARStorm(Synthesizer):
                                 return satisfying_assignment
                             else:
                                 logger.info("Applying family split according to Storm results")
-                                families, self.subfamilies_buffer = self.storm_split(families)
+                                main_families, self.subfamilies_buffer = self.storm_split(families.drain())
+                                families.push_all(main_families)
                         # if Storm's result is not better continue with the synthesis normally
                         else:
                             logger.info("PAYNT's value is better. Prioritizing synthesis results")
@@ -155,10 +163,7 @@ class SynthesizerARStorm(Synthesizer):
                         logger.info("Terminating controller synthesis")
                         return satisfying_assignment
 
-            if SynthesizerARStorm.exploration_order_dfs:
-                family = families.pop(-1)
-            else:
-                family = families.pop(0)
+            family = families.pop()
 
             # simulate sequential
             family.parent_info = None
@@ -173,13 +178,14 @@ class SynthesizerARStorm(Synthesizer):
                 if not families and self.subfamilies_buffer:
                     logger.info("Main family synthesis done")
                     logger.info(f"Subfamilies buffer contains: {len(self.subfamilies_buffer)} families")
-                    families = self.subfamilies_buffer
+                    families.push_all(self.subfamilies_buffer)
                     self.subfamilies_buffer = []
                 continue
 
             # undecided
             subfamilies = self.quotient.split(family, Synthesizer.incomplete_search)
-            families = families + subfamilies
+            families.push_all(subfamilies)
+            self.stat.pending(families)
 
         return satisfying_assignment
 
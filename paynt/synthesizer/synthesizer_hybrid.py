@@ -99,7 +99,10 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
 
         # AR-CEGIS loop
         satisfying_assignment = None
-        families = [family]
+        # the SMT solver keeps conflicts of ancestor families in scopes (see SmtSolver.level), which requires DFS
+        assert paynt.synthesizer.synthesizer.Synthesizer.exploration_order == "dfs"
+        families = self.create_frontier()
+        families.push(family)
         self.stage_control = StageControl(family.size)
         while families:
 
@@ -107,7 +110,7 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
             self.stage_control.start_ar()
             
             # choose family
-            family = families.pop(-1)
+            family = families.pop()
 
             # reset SMT solver level
             smt_solver.level(family.refinement_depth)
@@ -162,6 +165,7 @@ class SynthesizerHybrid(paynt.synthesizer.synthesizer_ar.SynthesizerAR, paynt.sy
                 continue
         
             subfamilies = self.quotient.split(family, paynt.synthesizer.synthesizer.Synthesizer.incomplete_search)
-            families = families + subfamilies
+            families.push_all(subfamilies)
+            self.stat.pending(families)
 
         return satisfying_assignment
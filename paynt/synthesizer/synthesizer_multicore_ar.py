@@ -1,7 +1,9 @@
 from paynt.synthesizer.synthesizer import Synthesizer
 from paynt.synthesizer.synthesizer_ar import SynthesizerAR
 
+import collections
 import os
+import math
 import time
 import multiprocessing
 
@@ -15,6 +17,36 @@ import cProfile, pstats
 # when a new process is spawned (forked), it will inherit these variables from the parent
 quotient = None
 profiler = None
+# the best optimum found so far, shared by all processes (NaN if no optimum has been found yet)
+shared_optimum = None
+# number of families the workers should export; a worker exporting a family claims it by decrementing this counter
+shared_hungry = None
+# queue of messages to the parent process: exported families and results of the workers
+messages = None
+
+def initialize_worker(optimum, hungry, parent_messages):
+    global shared_optimum, shared_hungry, messages
+    shared_optimum = optimum
+    shared_hungry = hungry
+    messages = parent_messages
+
+def synchronize_optimum(improving_value=None):
+    '''
+    Adopt the best optimum found by any process; if the given value improves it, publish the value as the new optimum.
+    :return True if the given value was published
+    '''
+    if not quotient.specification.has_optimality:
+        return False
+    optimality = quotient.specification.optimality
+    with shared_optimum.get_lock():
+        optimum = shared_optimum.value
+        if not math.isnan(optimum) and optimality.improves_optimum(optimum):
+            optimality.update_optimum(optimum)
+        if improving_value is not None and optimality.improves_optimum(improving_value):
+            optimality.update_optimum(improving_value)
+            shared_optimum.value = improving_value
+            return True
+    return False
 
 # helper functions for family serialization
 def family_to_hole_options(family):
@@ -27,9 +59,27 @@ def hole_options_to_family(hole_options):
     return family
 
 
+def export_work(families):
+    '''
+    If some worker is idle, send it the oldest family from the local DFS stack: this is the largest pending family and
+    the one this worker would explore last.
+    :return True if a family was exported
+    '''
+    if len(families) < 2 or shared_hungry.value <= 0:
+        return False
+    with shared_hungry.get_lock():
+        if shared_hungry.value <= 0:
+            return False
+        shared_hungry.value -= 1
+    family = families.popleft()
+    messages.put(("export", family_to_hole_options(family)))
+    return True
+
+
 def solve_family(args):
     '''
-    Build the quotient, analyze it and, if necessary, split into subfamilies.
+    Explore the family using DFS: build the quotient for each subfamily, analyze it and, if necessary, split it into
+    subfamilies that are kept on the local stack. Work is exported to the parent only when another worker is idle.
     '''
     try:
 
@@ -37,29 +87,43 @@ def solve_family(args):
             pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
             return
 
-        hole_options, optimum = args
+        hole_options = args
         # re-construct the family
-        family = hole_options_to_family(hole_options)
-
-        # synchronize optimum
-        if optimum is not None:
-            quotient.specification.optimality.optimum = optimum
-
-        quotient.build(family)
-
-        res = family.mdp.check_specification(quotient.specification, constraint_indices = family.constraint_indices, short_evaluation = True)
-        family.analysis_result = res
-        improving_value = res.improving_value
-        improving_assignment = res.improving_assignment
-        if improving_assignment is not None:
-            improving_assignment = family_to_hole_options(improving_assignment)
-        
-        subfamilies = []
-        if res.can_improve:
+        # local DFS stack; the oldest family is taken from the bottom when exporting work
+        families = collections.deque([hole_options_to_family(hole_options)])
+
+        mdp_states = []
+        explored = 0
+        num_exported = 0
+        improving_value = None
+        improving_assignment = None
+        while families:
+            family = families.pop()
+            quotient.build(family)
+
+            # prune using the newest optimum
+            synchronize_optimum()
+            res = family.mdp.check_specification(quotient.specification, constraint_indices = family.constraint_indices, short_evaluation = True)
+            family.analysis_result = res
+            mdp_states.append(family.mdp.states)
+            if res.improving_assignment == "any":
+                res.improving_assignment = family
+            if res.improving_assignment is not None:
+                # let other workers prune using this value right away
+                if res.improving_value is None or synchronize_optimum(res.improving_value):
+                    improving_value = res.improving_value
+                    improving_assignment = family_to_hole_options(res.improving_assignment)
+
+            if not res.can_improve:
+                explored += family.size
+                continue
             subfamilies = quotient.split(family, Synthesizer.incomplete_search)
-            subfamilies = [ family_to_hole_options(family) for family in subfamilies ]
+            explored += family.size - sum([subfamily.size for subfamily in subfamilies])
+            families += subfamilies
+            if export_work(families):
+                num_exported += 1
 
-        return (family.mdp.states, improving_value, improving_assignment, subfamilies)
+        return (mdp_states, explored, improving_value, improving_assignment, num_exported)
 
     except:
         logger.error("Worker sub-process encountered an error.")
@@ -76,10 +140,17 @@ class SynthesizerMultiCoreAR(SynthesizerAR):
     def synthesize_one(self, family):
 
         satisfying_assignment = None
-        families = [family]
+        families = self.create_frontier()
+        families.push(family)
 
         global quotient
         quotient = self.quotient
+        optimum = None
+        if self.quotient.specification.has_optimality:
+            optimum = self.quotient.specification.optimality.optimum
+        optimum = multiprocessing.Value("d", math.nan if optimum is None else optimum)
+        hungry = multiprocessing.Value("i", 0)
+        parent_messages = multiprocessing.Queue()
         profiling = False
         if profiling:
             global profiler
@@ -88,54 +159,53 @@ class SynthesizerMultiCoreAR(SynthesizerAR):
 
         # create a pool of processes
         # by default, os.cpu_count() processes will be spawned
+        num_workers = os.cpu_count()
         with multiprocessing.Pool(
-            # processes=1
+            processes=num_workers, initializer=initialize_worker, initargs=(optimum, hungry, parent_messages)
         ) as pool:
-            
-            while families:
-
-                # get current optimum
-                optimum = None
-                if self.quotient.specification.has_optimality:
-                    optimum = self.quotient.specification.optimality.optimum
-
-                # work with some number of families
-                # print("submitting ", len(families), " families")
-
-                split = os.cpu_count() * 1
-                input_families = families[-split:]
-                input_families_size = sum([family.size for family in input_families])
-                remaining_families = families[:-split]
-                input_families = [family_to_hole_options(family) for family in input_families]
-                
-                inputs = zip(input_families, [optimum] * len(input_families))
-
-                results = pool.map(solve_family, inputs)
-                # results = pool.imap_unordered(solve_family, inputs, chunksize=10)
-                # results = pool.map(solve_batch, inputs)
-
-                # process the results
-                new_families = []
-                for r in results:
-                    if r is None:
-                        logger.error("Worker sub-process encountered an error.")
-                        exit()
-                    mdp_states, improving_value, improving_assignment, subfamilies_hole_options = r
-                    self.stat.iteration_mdp(mdp_states)
-
-                    if improving_value is not None:
-                        if self.quotient.specification.optimality.improves_optimum(improving_value):
-                            self.quotient.specification.optimality.update_optimum(improving_value)
-                            improving_assignment = hole_options_to_family(improving_assignment)
-                            satisfying_assignment = improving_assignment
-
-                    subfamilies = [hole_options_to_family(hole_options) for hole_options in subfamilies_hole_options]
-                    new_families += subfamilies
 
-                new_families_size = sum([family.size for family in new_families])
-                self.explored += input_families_size-new_families_size
-
-                families = remaining_families + new_families
+            tasks_running = 0
+            # exports requested from the workers (claimed or not), exports announced in the results of finished
+            # tasks and exports received; an export may arrive after the result of the task that made it
+            exports_requested = 0
+            exports_announced = 0
+            exports_received = 0
+            while families or tasks_running > 0 or exports_received < exports_announced:
+
+                # keep all workers busy
+                while families and tasks_running < num_workers:
+                    self.submit(pool, families.pop(), parent_messages)
+                    tasks_running += 1
+
+                # ask busy workers to export work for the idle ones that will not be fed by exports in flight
+                with hungry.get_lock():
+                    exports_in_flight = exports_requested - hungry.value - exports_received
+                    requests = max(0, num_workers - tasks_running - exports_in_flight)
+                    exports_requested += requests - hungry.value
+                    hungry.value = requests
+
+                kind, message = parent_messages.get()
+                if kind == "export":
+                    exports_received += 1
+                    families.push(hole_options_to_family(message))
+                    self.stat.pending(families)
+                    continue
+
+                tasks_running -= 1
+                if message is None:
+                    logger.error("Worker sub-process encountered an error.")
+                    exit()
+                mdp_states, explored, improving_value, improving_assignment, num_exported = message
+                exports_announced += num_exported
+                for states in mdp_states:
+                    self.stat.iteration_mdp(states)
+                self.explored += explored
+
+                if improving_assignment is not None:
+                    if improving_value is None or self.quotient.specification.optimality.improves_optimum(improving_value):
+                        if improving_value is not None:
+                            self.quotient.specification.optimality.update_optimum(improving_value)
+                        satisfying_assignment = hole_options_to_family(improving_assignment)
 
             if profiling:
                 pool.apply(solve_family, (None,))
@@ -143,3 +213,11 @@ class SynthesizerMultiCoreAR(SynthesizerAR):
         if profiling:
             pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
         return satisfying_assignment
+
+    def submit(self, pool, family, parent_messages):
+        ''' Submit the family to the pool; ("result", result) will be put to the queue once it is explored. '''
+        pool.apply_async(
+            solve_family, (family_to_hole_options(family),),
+            callback=lambda r: parent_messages.put(("result", r)),
+            error_callback=lambda e: parent_messages.put(("result", None))
+        )
@@ -37,7 +37,7 @@ class SynthesizerOneByOne(paynt.synthesizer.synthesizer.Synthesizer):
             assignment = family.construct_assignment(hole_combination)
             model = self.quotient.build_assignment(assignment)
             self.stat.iteration(model)
-            result = model.model_check_property(prop)
+            result = model.model_check_property(prop, extract_scheduler=not keep_value_only)
             if keep_value_only:
                 evaluation = result.value
             else:
@@ -0,0 +1,48 @@
+import payntbind
+
+import numpy
+
+
+def csr_gather(indptr, indices, rows):
+    '''
+    Gather entries of the selected rows of a CSR structure.
+    :param indptr entries of row r are indices[indptr[r]:indptr[r+1]]
+    :param rows an array of row indices
+    :return a concatenation of entries of the selected rows
+    '''
+    rows = numpy.asarray(rows, dtype=numpy.int64)
+    starts = indptr[rows].astype(numpy.int64)
+    counts = indptr[rows+1].astype(numpy.int64) - starts
+    offsets = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts)
+    return indices[offsets + numpy.arange(counts.sum(), dtype=numpy.int64)]
+
+
+class SparseArrays:
+    '''
+    Read-only NumPy arrays describing the transition matrix of a sparse model. Row group indices, column indices and
+    values share the storage of the model, which is kept alive by the arrays.
+    '''
+
+    def __init__(self, model):
+        self.model = model
+        self.row_groups, self.row_starts, self.columns, self.values, self.row_to_group = \
+            payntbind.synthesis.sparse_matrix_arrays(model)
+
+    @property
+    def num_states(self):
+        return len(self.row_groups)-1
+
+    @property
+    def num_rows(self):
+        return len(self.row_starts)-1
+
+    def entry_to_row(self):
+        return numpy.repeat(numpy.arange(self.num_rows, dtype=numpy.uint64), numpy.diff(self.row_starts))
+
+    def absorbing_states(self):
+        ''' :return a boolean array marking states having no transition to another state '''
+        entry_state = self.row_to_group[self.entry_to_row()]
+        leaving = entry_state[self.columns != entry_state]
+        state_is_absorbing = numpy.ones(self.num_states, dtype=bool)
+        state_is_absorbing[leaving] = False
+        return state_is_absorbing
@@ -1,6 +1,9 @@
 import stormpy
 import payntbind
 
+import paynt.verification.solver_selector
+import paynt.verification.result_cache
+
 import math
 import operator
 
@@ -21,37 +24,126 @@ class Property:
     
     # model checking environment (method & precision)
     environment = None
+    # model checking environment using a sound method, used to establish upper bounds on values
+    environment_sound = None
     # model checking precision
     model_checking_precision = 1e-4
+    # precision currently used by the numerical solvers
+    solver_precision = model_checking_precision
+    # True if models are being double-checked
+    double_checking = False
+
+    # if True, MDPs will be model checked with a coarse precision first and re-checked with the model checking
+    # precision only if the value is close to the threshold (or to the optimum); the coarse pass uses the sound
+    # environment, such that the error of the coarse value is bounded (see close_to_threshold)
+    adaptive_precision = False
+    # precision of the first (coarse) model checking
+    coarse_precision = 1e-2
+    # precision used to double-check assignments
+    double_check_precision = 1e-6
+    # number of coarse model checking calls that were sufficient/had to be refined
+    num_coarse_sufficient = 0
+    num_coarse_refined = 0
+
+    # (optional) selection of the solution method for each model, see SolverSelector
+    solver_selector = None
+    # (optional) cache of model checking results, see ResultCache
+    result_cache = None
     
     @classmethod
     def set_model_checking_precision(cls, precision):
         cls.model_checking_precision = precision
-        payntbind.synthesis.set_precision_native(cls.environment.solver_environment.native_solver_environment, precision)
-        payntbind.synthesis.set_precision_minmax(cls.environment.solver_environment.minmax_solver_environment, precision)
+        cls.set_solver_precision(precision)
+
+    @classmethod
+    def set_solver_precision(cls, precision):
+        ''' Set precision of the numerical solvers without changing the precision used to compare values. '''
+        cls.solver_precision = precision
+        for environment in [cls.environment, cls.environment_sound]:
+            payntbind.synthesis.set_precision_native(environment.solver_environment.native_solver_environment, precision)
+            payntbind.synthesis.set_precision_minmax(environment.solver_environment.minmax_solver_environment, precision)
+        if cls.solver_selector is not None:
+            cls.solver_selector.set_precision(precision)
+
+    @classmethod
+    def enable_solver_selection(cls):
+        cls.solver_selector = paynt.verification.solver_selector.SolverSelector()
+
+    @classmethod
+    def enable_result_cache(cls):
+        cls.result_cache = paynt.verification.result_cache.ResultCache()
+
+    @classmethod
+    def solver_configuration(cls):
+        ''' :return a tuple identifying the configuration of the solvers (affecting the model checking results) '''
+        # double-checking affects the solution method only if it is selected by the solver selector
+        return cls.solver_precision, cls.double_checking and cls.solver_selector is not None
+
+    @classmethod
+    def set_double_checking(cls, double_checking):
+        ''' Notify the solver selector that models are being double-checked. '''
+        cls.double_checking = double_checking
+        if cls.solver_selector is not None:
+            cls.solver_selector.double_checking = double_checking
+
+    @staticmethod
+    def close_to_threshold(value, threshold):
+        '''
+        :return True if the value obtained with the coarse precision does not reliably compare to the threshold
+        :note the coarse value is computed by a sound method (interval iteration) terminating once the lower and the
+            upper approximation differ by at most the precision e, either absolutely or relatively to the value. The
+            error of the coarse value is thus at most e*max(1,|actual value|) <= e*max(1,|value|)/(1-e), i.e. at most
+            2*e*max(1,|value|) for e <= 1/2, hence values outside of this band compare reliably.
+        '''
+        if value == math.inf or threshold == math.inf:
+            return value == threshold
+        return abs(value-threshold) <= 2 * Property.coarse_precision * max(1, abs(value), abs(threshold))
+
+    @classmethod
+    def create_environment(cls, minmax_method, equation_solver_type=stormpy.EquationSolverType.native):
+        ''' Create a model checking environment using the given methods and the current solver precision. '''
+        environment = stormpy.Environment()
+        se = environment.solver_environment
+        se.set_linear_equation_solver_type(equation_solver_type)
+        se.minmax_solver_environment.method = minmax_method
+        payntbind.synthesis.set_precision_native(se.native_solver_environment, cls.solver_precision)
+        payntbind.synthesis.set_precision_minmax(se.minmax_solver_environment, cls.solver_precision)
+        return environment
 
     @classmethod
     def initialize(cls):
-        cls.environment = stormpy.Environment()
-        cls.set_model_checking_precision(cls.model_checking_precision)
+        cls.solver_precision = cls.model_checking_precision
 
-        se = cls.environment.solver_environment
-        se.set_linear_equation_solver_type(stormpy.EquationSolverType.native)
-        # se.set_linear_equation_solver_type(stormpy.EquationSolverType.gmmxx)
-        # se.set_linear_equation_solver_type(stormpy.EquationSolverType.eigen)
+        # equation solver: native, gmmxx or eigen
+        # min-max method: value_iteration, policy_iteration, sound_value_iteration, interval_iteration,
+        #   optimistic_value_iteration or topological
+        cls.environment = cls.create_environment(stormpy.MinMaxMethod.value_iteration)
+        cls.environment_sound = cls.create_environment(stormpy.MinMaxMethod.interval_iteration)
 
-        # se.minmax_solver_environment.method = stormpy.MinMaxMethod.policy_iteration
-        se.minmax_solver_environment.method = stormpy.MinMaxMethod.value_iteration
-        # se.minmax_solver_environment.method = stormpy.MinMaxMethod.sound_value_iteration
-        # se.minmax_solver_environment.method = stormpy.MinMaxMethod.interval_iteration
-        # se.minmax_solver_environment.method = stormpy.MinMaxMethod.optimistic_value_iteration
-        # se.minmax_solver_environment.method = stormpy.MinMaxMethod.topological
+    @classmethod
+    def bound_environment(cls, comparison_type):
+        '''
+        :return environment for model checking with respect to a bound: value iteration approximates values from
+            below and thus establishes lower bounds only, upper bounds require a sound method
+        '''
+        if comparison_type in [stormpy.ComparisonType.GREATER, stormpy.ComparisonType.GEQ]:
+            return cls.environment
+        return cls.environment_sound
 
     @staticmethod
     def above_model_checking_precision(a, b):
         return abs(a-b) > Property.model_checking_precision
 
     
+    @staticmethod
+    def negate_comparison_type(comparison_type):
+        return {
+            stormpy.ComparisonType.LESS:    stormpy.ComparisonType.GEQ,
+            stormpy.ComparisonType.LEQ:     stormpy.ComparisonType.GREATER,
+            stormpy.ComparisonType.GREATER: stormpy.ComparisonType.LEQ,
+            stormpy.ComparisonType.GEQ:     stormpy.ComparisonType.LESS
+        }[comparison_type]
+
     def __init__(self, prop, discount_factor=1):
         self.property = prop
         self.discount_factor = discount_factor
@@ -131,18 +223,24 @@ class Property:
     def satisfies_threshold(self, value):
         return self.result_valid(value) and self.op(value, self.threshold)
 
+    def decision_threshold(self):
+        ''' :return the value against which model checking results of this property are compared '''
+        return self.threshold
+
+    def violation_bound(self):
+        '''
+        :return a bound (comparison type, threshold) on the value in the primary direction that implies the property
+            is violated
+        '''
+        return Property.negate_comparison_type(self.property.raw_formula.comparison_type), self.threshold
+
     @property
     def can_be_improved(self):
         return False
 
     def negate(self):
         negated_formula = self.property.raw_formula.clone()
-        negated_formula.comparison_type = {
-            stormpy.ComparisonType.LESS:    stormpy.ComparisonType.GEQ,
-            stormpy.ComparisonType.LEQ:     stormpy.ComparisonType.GREATER,
-            stormpy.ComparisonType.GREATER: stormpy.ComparisonType.LEQ,
-            stormpy.ComparisonType.GEQ:     stormpy.ComparisonType.LESS
-        }[negated_formula.comparison_type]
+        negated_formula.comparison_type = Property.negate_comparison_type(negated_formula.comparison_type)
         stormpy_property_negated = stormpy.core.Property(self.property.name, negated_formula)
         property_negated = Property(stormpy_property_negated,self.discount_factor)
         return property_negated
@@ -211,6 +309,20 @@ class OptimalityProperty(Property):
     def improves_optimum(self, value):
         return self.result_valid(value) and self.meets_op(value, self.optimum)
 
+    def decision_threshold(self):
+        return self.optimum
+
+    def violation_bound(self):
+        '''
+        :return a bound (comparison type, threshold) on the value in the primary direction that implies the optimum
+            cannot be improved, or None if no optimum has been found yet
+        '''
+        if self.optimum is None:
+            return None
+        if self.minimizing:
+            return stormpy.ComparisonType.GEQ, self.optimum
+        return stormpy.ComparisonType.LEQ, self.optimum
+
     def update_optimum(self, optimum):
         # assert self.improves_optimum(optimum)
         #logger.debug(f"New opt = {optimum}.")
@@ -9,6 +9,8 @@ class PropertyResult:
         self.value = value
         self.sat = prop.satisfies_threshold(value)
         self.improves_optimum = None if not isinstance(prop,OptimalityProperty) else prop.improves_optimum(value)
+        # if True, the value was computed with the coarse precision of adaptive model checking and was not refined
+        self.coarse = False
 
     def __str__(self):
         return str(self.value)
@@ -0,0 +1,60 @@
+import payntbind
+
+import collections
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    '''
+    LRU cache of model checking results. A result is identified by the checked sub-model (a fingerprint of the
+    choices of the quotient it consists of), by the formula, by the bound terminating the model checking and by the
+    configuration of the solver. Since the decision whether a result satisfies a property depends on the current
+    optimum, only the check result and the value in the initial state are cached.
+    '''
+
+    # maximum number of cached results
+    capacity = 1000
+
+    def __init__(self):
+        self.results = collections.OrderedDict()
+        # quotient MDP the cached results refer to
+        self.quotient_mdp = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(choices):
+        ''' :param choices a BitVector or a list of choices of the quotient '''
+        return payntbind.synthesis.choices_fingerprint(choices)
+
+    def validate(self, quotient_mdp):
+        ''' Drop all cached results if the quotient has changed (e.g. after memory unfolding). '''
+        if self.quotient_mdp is not quotient_mdp:
+            self.results.clear()
+            self.quotient_mdp = quotient_mdp
+
+    def lookup(self, key, extract_scheduler=True):
+        '''
+        :param extract_scheduler if True, only a result containing a scheduler can be used
+        :return the cached pair (check result, value) or None
+        '''
+        entry = self.results.get(key)
+        if entry is None or (extract_scheduler and not entry[2]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return entry[0],entry[1]
+
+    def store(self, key, result, value, has_scheduler=True):
+        self.results[key] = (result,value,has_scheduler)
+        self.results.move_to_end(key)
+        if len(self.results) > ResultCache.capacity:
+            self.results.popitem(last=False)
+
+    def get_summary(self):
+        lookups = self.hits + self.misses
+        hit_rate = round(self.hits / lookups * 100, 1) if lookups > 0 else 0
+        return f"result cache: hits: {self.hits}, misses: {self.misses} ({hit_rate}% hit rate)\n"
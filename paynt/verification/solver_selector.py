@@ -0,0 +1,124 @@
+import stormpy
+import payntbind
+
+import paynt.utils.profiler
+import paynt.verification.property
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class SolverSelector:
+    '''
+    Selection of the solution method for each model to be model checked, based on its structure:
+    - acyclic models are solved using the topological solver,
+    - small models for which a value hint (values of the parent family) is available are solved using policy
+      iteration, its initial policy is derived by the solver from the hint values (no scheduler hint is passed),
+    - double-checks are done using optimistic value iteration,
+    - all other models are solved using value iteration.
+    For each class of models and each method, the number of calls and the solution time are recorded. Optionally,
+    all candidate methods of a class are tried alternately for a couple of calls and the fastest one is then used
+    for the remaining models of this class.
+    '''
+
+    # models having at most this number of states are considered small
+    small_model_states = 10000
+    # for each model class, candidate methods; the first one is used by default
+    class_to_methods = {
+        "acyclic":      [stormpy.MinMaxMethod.topological, stormpy.MinMaxMethod.value_iteration],
+        "small-hinted": [stormpy.MinMaxMethod.policy_iteration, stormpy.MinMaxMethod.value_iteration],
+        "double-check": [stormpy.MinMaxMethod.optimistic_value_iteration, stormpy.MinMaxMethod.sound_value_iteration],
+        "default":      [stormpy.MinMaxMethod.value_iteration, stormpy.MinMaxMethod.topological],
+    }
+    # if True, candidate methods will be tried alternately and the fastest one will be selected
+    explore_methods = False
+    # number of calls of each candidate method before the fastest one is selected
+    exploration_calls = 5
+
+    def __init__(self):
+        self.method_to_environment = {}
+        # if True, models are being double-checked
+        self.double_checking = False
+        # for each (model class, method), the number of calls and the accumulated solution time per state
+        self.calls = {}
+        self.time_per_state = {}
+        # for each model class, the method selected after the exploration
+        self.class_to_winner = {}
+
+    def set_precision(self, precision):
+        for environment in self.method_to_environment.values():
+            payntbind.synthesis.set_precision_native(environment.solver_environment.native_solver_environment, precision)
+            payntbind.synthesis.set_precision_minmax(environment.solver_environment.minmax_solver_environment, precision)
+
+    def environment(self, method):
+        if method in self.method_to_environment:
+            return self.method_to_environment[method]
+        # same settings as the default environment (see Property.initialize), except for the method
+        equation_solver_type = stormpy.EquationSolverType.native
+        if method == stormpy.MinMaxMethod.topological:
+            equation_solver_type = stormpy.EquationSolverType.topological
+        environment = paynt.verification.property.Property.create_environment(method, equation_solver_type)
+        if method == stormpy.MinMaxMethod.optimistic_value_iteration:
+            se = environment.solver_environment
+            se.native_solver_environment.method = stormpy.NativeLinearEquationSolverMethod.optimistic_value_iteration
+        self.method_to_environment[method] = environment
+        return environment
+
+    def model_class(self, markov_chain, has_hint):
+        if self.double_checking:
+            return "double-check"
+        if markov_chain.is_acyclic:
+            return "acyclic"
+        if has_hint and markov_chain.states <= SolverSelector.small_model_states:
+            return "small-hinted"
+        return "default"
+
+    def select_method(self, model_class):
+        methods = SolverSelector.class_to_methods[model_class]
+        if not SolverSelector.explore_methods:
+            return methods[0]
+        if model_class in self.class_to_winner:
+            return self.class_to_winner[model_class]
+        for method in methods:
+            if self.calls.get((model_class,method),0) < SolverSelector.exploration_calls:
+                return method
+        winner = min(methods, key=lambda method: self.time_per_state[(model_class,method)] / self.calls[(model_class,method)])
+        self.class_to_winner[model_class] = winner
+        logger.debug(f"selected {winner} for {model_class} models")
+        return winner
+
+    def select(self, markov_chain, has_hint):
+        '''
+        :param markov_chain MarkovChain to be model checked
+        :param has_hint whether a value hint is available
+        :return (1) model class, (2) the selected method, (3) the corresponding environment
+        '''
+        model_class = self.model_class(markov_chain, has_hint)
+        method = self.select_method(model_class)
+        return model_class, method, self.environment(method)
+
+    def record(self, model_class, method, num_states, time):
+        key = (model_class,method)
+        self.calls[key] = self.calls.get(key,0) + 1
+        self.time_per_state[key] = self.time_per_state.get(key,0) + time / max(num_states,1)
+
+    def model_check(self, markov_chain, formula, hint, check):
+        '''
+        Model check the formula using the method selected for this Markov chain.
+        :param check a function (environment, formula, hint) -> result performing the model checking
+        '''
+        model_class,method,environment = self.select(markov_chain, hint is not None)
+        timer = paynt.utils.profiler.Timer()
+        timer.start()
+        result = check(environment, formula, hint)
+        timer.stop()
+        self.record(model_class, method, markov_chain.states, timer.time)
+        return result
+
+    def get_summary(self):
+        lines = []
+        for (model_class,method),calls in sorted(self.calls.items(), key=lambda item: str(item[0])):
+            time_per_state = self.time_per_state[(model_class,method)] / calls
+            winner = " (selected)" if self.class_to_winner.get(model_class) == method else ""
+            lines.append(f"solver selection: {model_class} models, {method}: {calls} calls, {time_per_state:.2e} s/state{winner}")
+        return "\n".join(lines) + "\n" if lines else ""
@@ -12,9 +12,208 @@
 #include <storm/environment/solver/NativeSolverEnvironment.h>
 #include <storm/environment/solver/MinMaxSolverEnvironment.h>
 #include <storm/storage/SparseMatrix.h>
+#include <storm/storage/BitVector.h>
+#include <storm/models/sparse/Model.h>
+#include <storm/models/sparse/Mdp.h>
+#include <storm/storage/sparse/ModelComponents.h>
+
+#include "src/synthesis/translation/componentTranslations.h"
+
+#include <pybind11/numpy.h>
+
+#include <queue>
 
 namespace synthesis {
 
+/**
+ * Create a read-only NumPy array over memory owned by another Python object. The owner is kept alive as long as
+ * the array exists.
+ */
+template<typename T>
+py::array_t<T> readOnlyArray(T const* data, uint64_t size, uint64_t stride, py::handle owner) {
+    if(size == 0) {
+        return py::array_t<T>(0);
+    }
+    py::array_t<T> array({size}, {stride}, data, owner);
+    py::detail::array_proxy(array.ptr())->flags &= ~py::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+    return array;
+}
+
+/**
+ * Expose the transition matrix of a sparse model as NumPy arrays. Row group indices, column indices and values are
+ * views of the storage of the model, row starts and row-to-group map are computed.
+ * @return (1) row group indices, (2) row starts, (3) column indices, (4) values, (5) for each row, its row group
+ */
+py::tuple sparseMatrixArrays(py::object model_object) {
+    auto const& model = model_object.cast<storm::models::sparse::Model<double> const&>();
+    auto const& matrix = model.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_rows = matrix.getRowCount();
+    uint64_t num_entries = matrix.getEntryCount();
+
+    std::vector<uint64_t> row_starts(num_rows+1,num_entries);
+    std::vector<uint64_t> row_to_group(num_rows);
+    for(uint64_t group = 0; group+1 < row_groups.size(); ++group) {
+        for(uint64_t row = row_groups[group]; row < row_groups[group+1]; ++row) {
+            row_starts[row] = matrix.begin(row) - matrix.begin();
+            row_to_group[row] = group;
+        }
+    }
+
+    using MatrixEntry = storm::storage::MatrixEntry<uint64_t,double>;
+    MatrixEntry const* first_entry = num_entries > 0 ? &*matrix.begin() : nullptr;
+    uint64_t const* columns = first_entry != nullptr ? &first_entry->getColumn() : nullptr;
+    double const* values = first_entry != nullptr ? &first_entry->getValue() : nullptr;
+    return py::make_tuple(
+        readOnlyArray<uint64_t>(row_groups.data(), row_groups.size(), sizeof(uint64_t), model_object),
+        py::array_t<uint64_t>(row_starts.size(), row_starts.data()),
+        readOnlyArray<uint64_t>(columns, num_entries, sizeof(MatrixEntry), model_object),
+        readOnlyArray<double>(values, num_entries, sizeof(MatrixEntry), model_object),
+        py::array_t<uint64_t>(row_to_group.size(), row_to_group.data())
+    );
+}
+
+/**
+ * Restrict the MDP to the selected choices and to the states reachable via these choices, without metadata that
+ * is not needed for model checking: state and observation valuations, choice origins and the label of states with
+ * overlapping guards. Transition matrix, state and choice labeling and reward models are restricted. States and
+ * choices preserve the order of the MDP.
+ * @return (1) the restricted MDP
+ * @return (2) for each state of the restricted MDP, the corresponding state of the MDP
+ * @return (3) for each choice of the restricted MDP, the corresponding choice of the MDP
+ */
+std::tuple<std::shared_ptr<storm::models::sparse::Mdp<double>>,std::vector<uint64_t>,std::vector<uint64_t>> restrictMdpLean(
+    storm::models::sparse::Mdp<double> const& mdp, storm::storage::BitVector const& choices
+) {
+    auto const& matrix = mdp.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_states = mdp.getNumberOfStates();
+    uint64_t initial_state = *(mdp.getInitialStates().begin());
+
+    // explore states reachable via the selected choices
+    storm::storage::BitVector state_reachable(num_states,false);
+    state_reachable.set(initial_state,true);
+    std::queue<uint64_t> state_queue;
+    state_queue.push(initial_state);
+    uint64_t num_entries = 0;
+    while(not state_queue.empty()) {
+        auto state = state_queue.front();
+        state_queue.pop();
+        for(auto choice = choices.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = choices.getNextSetIndex(choice+1)) {
+            for(auto const& entry: matrix.getRow(choice)) {
+                num_entries++;
+                auto dst = entry.getColumn();
+                if(not state_reachable[dst]) {
+                    state_reachable.set(dst,true);
+                    state_queue.push(dst);
+                }
+            }
+        }
+    }
+
+    uint64_t sub_num_states = state_reachable.getNumberOfSetBits();
+    std::vector<uint64_t> state_to_sub_state(num_states,sub_num_states);
+    std::vector<uint64_t> sub_state_to_state;
+    sub_state_to_state.reserve(sub_num_states);
+    std::vector<uint64_t> sub_choice_to_choice;
+    for(auto state: state_reachable) {
+        state_to_sub_state[state] = sub_state_to_state.size();
+        sub_state_to_state.push_back(state);
+        for(auto choice = choices.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = choices.getNextSetIndex(choice+1)) {
+            sub_choice_to_choice.push_back(choice);
+        }
+    }
+    uint64_t sub_num_choices = sub_choice_to_choice.size();
+
+    storm::storage::SparseMatrixBuilder<double> builder(sub_num_choices,sub_num_states,num_entries,true,true,sub_num_states);
+    uint64_t sub_choice = 0;
+    for(uint64_t sub_state = 0; sub_state < sub_num_states; ++sub_state) {
+        builder.newRowGroup(sub_choice);
+        uint64_t state = sub_state_to_state[sub_state];
+        for(; sub_choice < sub_num_choices and sub_choice_to_choice[sub_choice] < row_groups[state+1]; ++sub_choice) {
+            for(auto const& entry: matrix.getRow(sub_choice_to_choice[sub_choice])) {
+                builder.addNextValue(sub_choice,state_to_sub_state[entry.getColumn()],entry.getValue());
+            }
+        }
+    }
+
+    storm::storage::sparse::ModelComponents<double> components;
+    components.transitionMatrix = builder.build();
+    components.stateLabeling = synthesis::translateStateLabeling(mdp,sub_state_to_state,state_to_sub_state[initial_state]);
+    if(components.stateLabeling.containsLabel("overlap_guards")) {
+        components.stateLabeling.removeLabel("overlap_guards");
+    }
+    storm::storage::BitVector sub_choice_mask(sub_num_choices,true);
+    if(mdp.hasChoiceLabeling()) {
+        components.choiceLabeling = synthesis::translateChoiceLabeling(mdp,sub_choice_to_choice,sub_choice_mask);
+    }
+    for(auto const& reward_model : mdp.getRewardModels()) {
+        auto sub_reward_model = synthesis::translateRewardModel(reward_model.second,sub_choice_to_choice,sub_choice_mask);
+        components.rewardModels.emplace(reward_model.first, sub_reward_model);
+    }
+    auto sub_mdp = std::make_shared<storm::models::sparse::Mdp<double>>(std::move(components));
+    return std::make_tuple(sub_mdp,sub_state_to_state,sub_choice_to_choice);
+}
+
+/**
+ * Compute a 128-bit fingerprint of a sequence of choice indices.
+ */
+template<typename Choices>
+std::pair<uint64_t,uint64_t> choicesFingerprint(Choices const& choices) {
+    uint64_t fnv = 14695981039346656037ull;
+    uint64_t mix = 0;
+    for(uint64_t choice: choices) {
+        fnv = (fnv ^ choice) * 1099511628211ull;
+        // splitmix64 step
+        uint64_t z = (mix += 0x9e3779b97f4a7c15ull + choice);
+        z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ull;
+        z = (z ^ (z >> 27)) * 0x94d049bb133111ebull;
+        mix = z ^ (z >> 31);
+    }
+    return std::make_pair(fnv,mix);
+}
+
+/**
+ * Check whether the underlying graph of the model is acyclic, disregarding self-loops.
+ */
+bool isAcyclic(storm::models::sparse::Model<double> const& model) {
+    auto const& matrix = model.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_states = model.getNumberOfStates();
+
+    // Kahn's algorithm: repeatedly remove states without incoming transitions
+    std::vector<uint64_t> num_predecessors(num_states,0);
+    for(uint64_t state = 0; state < num_states; ++state) {
+        for(uint64_t row = row_groups[state]; row < row_groups[state+1]; ++row) {
+            for(auto const& entry: matrix.getRow(row)) {
+                if(entry.getColumn() != state) {
+                    num_predecessors[entry.getColumn()]++;
+                }
+            }
+        }
+    }
+    std::vector<uint64_t> state_stack;
+    for(uint64_t state = 0; state < num_states; ++state) {
+        if(num_predecessors[state] == 0) {
+            state_stack.push_back(state);
+        }
+    }
+    uint64_t num_removed = 0;
+    while(not state_stack.empty()) {
+        uint64_t state = state_stack.back();
+        state_stack.pop_back();
+        num_removed++;
+        for(uint64_t row = row_groups[state]; row < row_groups[state+1]; ++row) {
+            for(auto const& entry: matrix.getRow(row)) {
+                if(entry.getColumn() != state and --num_predecessors[entry.getColumn()] == 0) {
+                    state_stack.push_back(entry.getColumn());
+                }
+            }
+        }
+    }
+    return num_removed == num_states;
+}
+
 template<typename ValueType>
 std::shared_ptr<storm::logic::Formula> transformUntilToEventually(
     storm::logic::Formula const& formula
@@ -52,6 +251,12 @@ void define_helpers(py::module& m) {
 
     m.def("transform_until_to_eventually", &synthesis::transformUntilToEventually<double>, py::arg("formula"));
 
+    m.def("sparse_matrix_arrays", &synthesis::sparseMatrixArrays, py::arg("model"));
+    m.def("is_acyclic", &synthesis::isAcyclic, py::arg("model"));
+    m.def("restrict_mdp_lean", &synthesis::restrictMdpLean, py::arg("mdp"), py::arg("choices"));
+    m.def("choices_fingerprint", &synthesis::choicesFingerprint<storm::storage::BitVector>, py::arg("choices"));
+    m.def("choices_fingerprint", &synthesis::choicesFingerprint<std::vector<uint64_t>>, py::arg("choices"));
+
     m.def("multiply_with_vector", [] (storm::storage::SparseMatrix<double> matrix,std::vector<double> vector) {
         std::vector<double> result(matrix.getRowCount());
         matrix.multiplyWithVector(vector, result);
@@ -0,0 +1,315 @@
+#include "ChoiceValues.h"
+
+#include <storm/exceptions/InvalidArgumentException.h>
+#include <storm/utility/macros.h>
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <random>
+
+namespace synthesis {
+
+    std::vector<double> computeChoiceValues(
+        storm::models::sparse::Mdp<double> const& mdp,
+        std::vector<double> const& state_values,
+        std::string const& reward_name
+    ) {
+        auto const& matrix = mdp.getTransitionMatrix();
+        uint64_t num_choices = matrix.getRowCount();
+        std::vector<double> choice_values(num_choices);
+        matrix.multiplyWithVector(state_values, choice_values);
+
+        double finite_sum = 0;
+        for(auto value: choice_values) {
+            if(not std::isinf(value)) {
+                finite_sum += value;
+            }
+        }
+        double default_value = num_choices > 0 ? finite_sum / num_choices : 0;
+        for(auto & value: choice_values) {
+            if(std::isinf(value)) {
+                value = default_value;
+            }
+        }
+
+        if(not reward_name.empty()) {
+            auto const& reward_model = mdp.getRewardModel(reward_name);
+            STORM_LOG_THROW(reward_model.hasStateActionRewards(), storm::exceptions::InvalidArgumentException,
+                "reward model " << reward_name << " has no state-action rewards");
+            auto const& choice_rewards = reward_model.getStateActionRewardVector();
+            for(uint64_t choice = 0; choice < num_choices; ++choice) {
+                choice_values[choice] += choice_rewards[choice];
+            }
+        }
+        return choice_values;
+    }
+
+    /**
+     * Replace infinite visits by the average number of visits of reachable states (infinite visits counting as 0)
+     * or by 0.
+     */
+    void replaceInfiniteVisits(
+        std::vector<double> & visits, storm::storage::BitVector const& reachable, bool infinity_to_average
+    ) {
+        double default_value = 0;
+        if(infinity_to_average) {
+            double finite_sum = 0;
+            for(auto state: reachable) {
+                if(not std::isinf(visits[state])) {
+                    finite_sum += visits[state];
+                }
+            }
+            default_value = finite_sum / reachable.getNumberOfSetBits();
+        }
+        for(auto & value: visits) {
+            if(std::isinf(value)) {
+                value = default_value;
+            }
+        }
+    }
+
+    std::vector<double> computeExpectedVisits(
+        storm::models::sparse::Mdp<double> const& mdp,
+        storm::storage::BitVector const& choices,
+        double precision,
+        uint64_t max_iterations,
+        bool infinity_to_average
+    ) {
+        auto const& matrix = mdp.getTransitionMatrix();
+        auto const& row_groups = matrix.getRowGroupIndices();
+        uint64_t num_states = mdp.getNumberOfStates();
+        uint64_t initial_state = *(mdp.getInitialStates().begin());
+        uint64_t undefined = std::numeric_limits<uint64_t>::max();
+
+        auto selected_choice = [&](uint64_t state) {
+            auto choice = choices.getNextSetIndex(row_groups[state]);
+            STORM_LOG_THROW(
+                choice < row_groups[state+1] and choices.getNextSetIndex(choice+1) >= row_groups[state+1],
+                storm::exceptions::InvalidArgumentException, "expected exactly one choice selected in state " << state
+            );
+            return choice;
+        };
+
+        // Tarjan's algorithm over the states reachable in the induced DTMC; SCCs are discovered in the reverse
+        // topological order
+        std::vector<uint64_t> state_to_choice(num_states,undefined);
+        std::vector<uint64_t> state_index(num_states,undefined);
+        std::vector<uint64_t> state_lowlink(num_states);
+        std::vector<uint64_t> state_to_scc(num_states,undefined);
+        std::vector<std::vector<uint64_t>> sccs;
+        std::vector<uint64_t> scc_stack;
+        std::vector<std::pair<uint64_t,uint64_t>> call_stack;
+        uint64_t next_index = 0;
+
+        auto discover = [&](uint64_t state) {
+            state_to_choice[state] = selected_choice(state);
+            state_index[state] = state_lowlink[state] = next_index++;
+            scc_stack.push_back(state);
+            call_stack.emplace_back(state,0);
+        };
+        discover(initial_state);
+        while(not call_stack.empty()) {
+            uint64_t state = call_stack.back().first;
+            uint64_t entry_index = call_stack.back().second;
+            auto row = matrix.getRow(state_to_choice[state]);
+            if(entry_index < row.getNumberOfEntries()) {
+                call_stack.back().second++;
+                auto const& entry = *(row.begin()+entry_index);
+                uint64_t dst = entry.getColumn();
+                if(entry.getValue() == 0) {
+                    continue;
+                }
+                if(state_index[dst] == undefined) {
+                    discover(dst);
+                } else if(state_to_scc[dst] == undefined) {
+                    // dst is on the SCC stack
+                    state_lowlink[state] = std::min(state_lowlink[state], state_index[dst]);
+                }
+                continue;
+            }
+            call_stack.pop_back();
+            if(not call_stack.empty()) {
+                uint64_t parent = call_stack.back().first;
+                state_lowlink[parent] = std::min(state_lowlink[parent], state_lowlink[state]);
+            }
+            if(state_lowlink[state] != state_index[state]) {
+                continue;
+            }
+            std::vector<uint64_t> scc;
+            uint64_t member;
+            do {
+                member = scc_stack.back();
+                scc_stack.pop_back();
+                state_to_scc[member] = sccs.size();
+                scc.push_back(member);
+            } while(member != state);
+            sccs.push_back(std::move(scc));
+        }
+
+        // process SCCs in the topological order, accumulating the inflow of visits from the preceding SCCs
+        double infinity = std::numeric_limits<double>::infinity();
+        std::vector<double> visits(num_states,0);
+        std::vector<double> inflow(num_states,0);
+        inflow[initial_state] = 1;
+        std::vector<uint64_t> state_to_member(num_states);
+        for(uint64_t scc_index = sccs.size(); scc_index-- > 0; ) {
+            auto const& scc = sccs[scc_index];
+
+            // predecessors within the SCC and self-loop probabilities
+            bool bottom = true;
+            std::vector<double> self_loop(scc.size(),0);
+            for(uint64_t index = 0; index < scc.size(); ++index) {
+                state_to_member[scc[index]] = index;
+            }
+            std::vector<std::vector<std::pair<uint64_t,double>>> member_predecessors(scc.size());
+            for(uint64_t index = 0; index < scc.size(); ++index) {
+                for(auto const& entry: matrix.getRow(state_to_choice[scc[index]])) {
+                    if(entry.getValue() == 0) {
+                        continue;
+                    }
+                    uint64_t dst = entry.getColumn();
+                    if(state_to_scc[dst] != scc_index) {
+                        bottom = false;
+                    } else if(dst == scc[index]) {
+                        self_loop[index] += entry.getValue();
+                    } else {
+                        member_predecessors[state_to_member[dst]].emplace_back(index,entry.getValue());
+                    }
+                }
+            }
+
+            if(bottom) {
+                // reachable bottom SCCs are visited infinitely often
+                for(auto state: scc) {
+                    visits[state] = infinity;
+                }
+                continue;
+            }
+
+            // Gauss-Seidel iteration, exact for trivial SCCs
+            std::vector<double> member_visits(scc.size(),0);
+            bool converged = false;
+            uint64_t iterations = 0;
+            while(not converged and iterations < max_iterations) {
+                iterations++;
+                converged = true;
+                for(uint64_t index = 0; index < scc.size(); ++index) {
+                    double value = inflow[scc[index]];
+                    for(auto const& [predecessor,probability]: member_predecessors[index]) {
+                        value += member_visits[predecessor] * probability;
+                    }
+                    value /= 1-self_loop[index];
+                    if(std::abs(value-member_visits[index]) > precision * std::abs(value)) {
+                        converged = false;
+                    }
+                    member_visits[index] = value;
+                }
+                if(scc.size() == 1) {
+                    converged = true;
+                    break;
+                }
+            }
+            if(not converged) {
+                STORM_LOG_WARN(
+                    "expected visits within an SCC of " << scc.size() << " states did not converge in " <<
+                    max_iterations << " iterations"
+                );
+            }
+
+            for(uint64_t index = 0; index < scc.size(); ++index) {
+                uint64_t state = scc[index];
+                visits[state] = member_visits[index];
+                for(auto const& entry: matrix.getRow(state_to_choice[state])) {
+                    uint64_t dst = entry.getColumn();
+                    if(state_to_scc[dst] != scc_index) {
+                        inflow[dst] += visits[state] * entry.getValue();
+                    }
+                }
+            }
+        }
+
+        storm::storage::BitVector reachable(num_states,false);
+        for(uint64_t state = 0; state < num_states; ++state) {
+            if(state_index[state] != undefined) {
+                reachable.set(state);
+            }
+        }
+        replaceInfiniteVisits(visits, reachable, infinity_to_average);
+        return visits;
+    }
+
+    std::optional<std::vector<double>> sampleExpectedVisits(
+        storm::models::sparse::Mdp<double> const& mdp,
+        storm::storage::BitVector const& choices,
+        uint64_t num_paths,
+        uint64_t max_path_length,
+        double max_relative_error,
+        uint64_t seed,
+        bool infinity_to_average
+    ) {
+        auto const& matrix = mdp.getTransitionMatrix();
+        auto const& row_groups = matrix.getRowGroupIndices();
+        uint64_t num_states = mdp.getNumberOfStates();
+        uint64_t initial_state = *(mdp.getInitialStates().begin());
+
+        std::mt19937_64 generator(seed);
+        std::uniform_real_distribution<double> distribution(0,1);
+        std::vector<uint64_t> state_visits(num_states,0);
+        storm::storage::BitVector reachable(num_states,false);
+        storm::storage::BitVector absorbing(num_states,false);
+        double length_sum = 0;
+        double length_square_sum = 0;
+
+        for(uint64_t path = 0; path < num_paths; ++path) {
+            uint64_t state = initial_state;
+            uint64_t length = 0;
+            while(true) {
+                reachable.set(state);
+                state_visits[state]++;
+                auto choice = choices.getNextSetIndex(row_groups[state]);
+                STORM_LOG_THROW(choice < row_groups[state+1], storm::exceptions::InvalidArgumentException,
+                    "expected a choice selected in state " << state);
+                auto row = matrix.getRow(choice);
+                if(row.getNumberOfEntries() == 1 and row.begin()->getColumn() == state) {
+                    absorbing.set(state);
+                    break;
+                }
+                if(++length == max_path_length) {
+                    // the path might be stuck in a non-trivial bottom SCC
+                    return std::nullopt;
+                }
+                double sample = distribution(generator);
+                uint64_t next_state = state;
+                for(auto const& entry: row) {
+                    next_state = entry.getColumn();
+                    sample -= entry.getValue();
+                    if(sample <= 0) {
+                        break;
+                    }
+                }
+                state = next_state;
+            }
+            length_sum += length;
+            length_square_sum += length*length;
+        }
+
+        double mean_length = length_sum / num_paths;
+        if(num_paths > 1 and mean_length > 0) {
+            double variance = (length_square_sum - num_paths*mean_length*mean_length) / (num_paths-1);
+            double relative_error = std::sqrt(std::max(variance,0.0) / num_paths) / mean_length;
+            if(relative_error > max_relative_error) {
+                return std::nullopt;
+            }
+        }
+
+        double infinity = std::numeric_limits<double>::infinity();
+        std::vector<double> visits(num_states,0);
+        for(auto state: reachable) {
+            visits[state] = absorbing[state] ? infinity : (double)state_visits[state] / num_paths;
+        }
+        replaceInfiniteVisits(visits, reachable, infinity_to_average);
+        return visits;
+    }
+
+}
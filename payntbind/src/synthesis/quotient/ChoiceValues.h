@@ -0,0 +1,67 @@
+#pragma once
+
+#include <storm/models/sparse/Mdp.h>
+#include <storm/storage/BitVector.h>
+
+#include <cstdint>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace synthesis {
+
+    /**
+     * Compute values of choices of the MDP from the values of its states. Value of a choice c in state s is
+     * rew(c) + sum_s' P(s,c,s') * value(s'). Infinite values are replaced by the average of finite choice values
+     * (infinite values counting as 0).
+     * @param reward_name If non-empty, state-action rewards of this reward model are added to the choice values.
+     */
+    std::vector<double> computeChoiceValues(
+        storm::models::sparse::Mdp<double> const& mdp,
+        std::vector<double> const& state_values,
+        std::string const& reward_name
+    );
+
+    /**
+     * Compute the expected number of visits of each state in the DTMC induced by the selected choices, without
+     * constructing the DTMC. States in bottom SCCs of the induced DTMC are visited infinitely often: their visits are
+     * replaced by the average number of visits of states reachable under the selected choices (infinite visits
+     * counting as 0) or by 0. Other states of the MDP do not affect the result, i.e. the visits computed on a
+     * quotient coincide with the visits computed on its sub-MDP containing the selected choices.
+     * @param choices Choices selected in the MDP, exactly one in each state reachable under this selection.
+     * @param precision Relative precision of the iterative computation within non-trivial SCCs.
+     * @param max_iterations Maximum number of iterations within a non-trivial SCC; the computation of the SCC is
+     *  stopped with a warning once exceeded.
+     * @param infinity_to_average If true, infinite visits are replaced by the average, otherwise by 0.
+     * @return For each state of the MDP, the expected number of visits (0 for unreachable states).
+     */
+    std::vector<double> computeExpectedVisits(
+        storm::models::sparse::Mdp<double> const& mdp,
+        storm::storage::BitVector const& choices,
+        double precision,
+        uint64_t max_iterations,
+        bool infinity_to_average
+    );
+
+    /**
+     * Estimate the expected number of visits of each state in the DTMC induced by the selected choices by simulating
+     * paths from the initial state. A path terminates in an absorbing state, whose visits are considered infinite
+     * and are handled as in computeExpectedVisits.
+     * @param num_paths Number of simulated paths.
+     * @param max_path_length Maximum length of a path.
+     * @param max_relative_error Maximum relative standard error of the estimated expected path length.
+     * @param seed Seed of the random number generator.
+     * @return For each state of the MDP, the estimated number of visits, or nothing if the estimate is not reliable:
+     *  some path did not reach an absorbing state or the relative standard error is too large.
+     */
+    std::optional<std::vector<double>> sampleExpectedVisits(
+        storm::models::sparse::Mdp<double> const& mdp,
+        storm::storage::BitVector const& choices,
+        uint64_t num_paths,
+        uint64_t max_path_length,
+        double max_relative_error,
+        uint64_t seed,
+        bool infinity_to_average
+    );
+
+}
@@ -32,6 +32,17 @@ Coloring::Coloring(
     }
 
 
+    hole_option_to_choices.resize(num_holes);
+    for(uint64_t hole = 0; hole < num_holes; ++hole) {
+        hole_option_to_choices[hole].resize(family.holeNumOptionsTotal(hole));
+    }
+    for(uint64_t choice = 0; choice<num_choices; ++choice) {
+        for(auto const& [hole,option]: choice_to_assignment[choice]) {
+            hole_option_to_choices[hole][option].push_back(choice);
+        }
+    }
+
+
     auto num_states = row_groups.size()-1;
     state_to_holes.resize(num_states);
     is_simple = true;
@@ -62,13 +73,40 @@ BitVector const& Coloring::getUncoloredChoices() const {
     return uncolored_choices;
 }
 
-BitVector Coloring::selectCompatibleChoices(Family const& subfamily) const {
-    auto selection = BitVector(uncolored_choices);
-    for(auto choice: colored_choices) {
-        if(subfamily.includesAssignment(choice_to_assignment[choice])) {
-            selection.set(choice,true);
+std::vector<std::vector<std::vector<uint64_t>>> const& Coloring::getHoleOptionToChoices() const {
+    return hole_option_to_choices;
+}
+
+void Coloring::removeIncompatibleChoices(Family const& subfamily, uint64_t hole, BitVector & selection) const {
+    auto num_options_total = family.holeNumOptionsTotal(hole);
+    if(subfamily.holeNumOptions(hole) == num_options_total) {
+        return;
+    }
+    for(uint64_t option = 0; option < num_options_total; ++option) {
+        if(subfamily.holeContains(hole,option)) {
+            continue;
         }
+        for(auto choice: hole_option_to_choices[hole][option]) {
+            selection.set(choice,false);
+        }
+    }
+}
+
+void Coloring::removeIncompatibleChoices(Family const& subfamily, BitVector & selection) const {
+    for(uint64_t hole = 0; hole < family.numHoles(); ++hole) {
+        removeIncompatibleChoices(subfamily,hole,selection);
     }
+}
+
+BitVector Coloring::selectCompatibleChoices(Family const& subfamily) const {
+    BitVector selection(numChoices(),true);
+    removeIncompatibleChoices(subfamily,selection);
+    return selection;
+}
+
+BitVector Coloring::selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices, uint64_t hole) const {
+    BitVector selection(base_choices);
+    removeIncompatibleChoices(subfamily,hole,selection);
     return selection;
 }
 
@@ -27,9 +27,17 @@ public:
     std::vector<BitVector> const& getStateToHoles() const;
     /** Get mask of uncolored choices. */
     BitVector const& getUncoloredChoices() const;
+    /** Get a mapping from hole-option pairs to choices labeled by this pair. */
+    std::vector<std::vector<std::vector<uint64_t>>> const& getHoleOptionToChoices() const;
     
     /** Get a mask of choices compatible with the family. */
     BitVector selectCompatibleChoices(Family const& subfamily) const;
+    /**
+     * Get a mask of choices compatible with the family that differs from the family of the base choices only in the
+     * options of the given hole (e.g. a subfamily and its parent split wrt. this hole). Only choices of this hole are
+     * inspected.
+     */
+    BitVector selectCompatibleChoices(Family const& subfamily, BitVector const& base_choices, uint64_t hole) const;
     /** For each hole, collect options (colors) involved in any of the given choices. */
     std::vector<std::vector<uint64_t>> collectHoleOptions(BitVector const& choices) const;
     
@@ -50,6 +58,9 @@ protected:
     /** Whether all states have at most one hole associated with its choices. */
     bool is_simple;
 
+    /** For each hole and for each of its options, a list of choices labeled by this hole-option pair. */
+    std::vector<std::vector<std::vector<uint64_t>>> hole_option_to_choices;
+
     /** Choices not labeled by any hole. */
     BitVector uncolored_choices;
     /** Choices labeled by some hole. */
@@ -57,6 +68,10 @@ protected:
 
     /** For each hole, collect options (colors) involved in any of the given choices. */
     std::vector<BitVector> collectHoleOptionsMask(BitVector const& choices) const;
+    /** Unset choices labeled by any hole-option pair excluded from the subfamily. */
+    void removeIncompatibleChoices(Family const& subfamily, BitVector & selection) const;
+    /** Unset choices labeled by options of the hole excluded from the subfamily. */
+    void removeIncompatibleChoices(Family const& subfamily, uint64_t hole, BitVector & selection) const;
 };
 
 }
\ No newline at end of file
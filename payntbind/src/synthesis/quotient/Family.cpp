@@ -9,13 +9,8 @@ Family::Family() {
     // left intentionally blank
 }
 
-Family::Family(Family const& other) {
-    hole_options = std::vector<std::vector<uint64_t>>(other.numHoles());
-    hole_options_mask = std::vector<BitVector>(other.numHoles());
-    for(uint64_t hole = 0; hole < numHoles(); ++hole) {
-        hole_options[hole] = other.holeOptions(hole);
-        hole_options_mask[hole] = other.holeOptionsMask(hole);
-    }
+Family::Family(Family const& other) : hole_options(other.hole_options) {
+    // options of the holes are shared with the other family
 }
 
 
@@ -24,36 +19,48 @@ uint64_t Family::numHoles() const {
 }
 
 void Family::addHole(uint64_t num_options) {
-    hole_options_mask.push_back(BitVector(num_options,true));
-    std::vector<uint64_t> options(num_options);
+    auto hole = std::make_shared<HoleOptions>();
+    hole->options.resize(num_options);
     for(uint64_t option=0; option<num_options; ++option) {
-        options[option]=option;
+        hole->options[option]=option;
     }
-    hole_options.push_back(options);
+    hole->mask = BitVector(num_options,true);
+    hole_options.push_back(hole);
 }
 
 std::vector<uint64_t> const& Family::holeOptions(uint64_t hole) const {
-    return hole_options[hole];
+    return hole_options[hole]->options;
 }
 
 BitVector const& Family::holeOptionsMask(uint64_t hole) const {
-    return hole_options_mask[hole];
+    return hole_options[hole]->mask;
 }
 
 
 void Family::holeSetOptions(uint64_t hole, std::vector<uint64_t> const& options) {
-    hole_options[hole] = options;
-    hole_options_mask[hole].clear();
+    if(options == hole_options[hole]->options) {
+        // keep sharing the options
+        return;
+    }
+    auto new_hole = std::make_shared<HoleOptions>();
+    new_hole->options = options;
+    new_hole->mask = BitVector(holeNumOptionsTotal(hole),false);
     for(auto option: options) {
-        hole_options_mask[hole].set(option);
+        new_hole->mask.set(option);
     }
+    hole_options[hole] = new_hole;
 }
 void Family::holeSetOptions(uint64_t hole, BitVector const& options) {
-    hole_options[hole].clear();
+    if(options == hole_options[hole]->mask) {
+        // keep sharing the options
+        return;
+    }
+    auto new_hole = std::make_shared<HoleOptions>();
     for(auto option: options) {
-        hole_options[hole].push_back(option);
+        new_hole->options.push_back(option);
     }
-    hole_options_mask[hole] = options;
+    new_hole->mask = options;
+    hole_options[hole] = new_hole;
 }
 
 
@@ -61,21 +68,21 @@ void Family::holeSetOptions(uint64_t hole, BitVector const& options) {
 
 
 uint64_t Family::holeNumOptions(uint64_t hole) const {
-    return hole_options[hole].size();
+    return hole_options[hole]->options.size();
 }
 
 uint64_t Family::holeNumOptionsTotal(uint64_t hole) const {
-    return hole_options_mask[hole].size();
+    return hole_options[hole]->mask.size();
 }
 
 bool Family::holeContains(uint64_t hole, uint64_t option) const {
-    return hole_options_mask[hole][option];
+    return holeOptionsMask(hole)[option];
 }
 
 
 bool Family::isSubsetOf(Family const& other) const {
     for(uint64_t hole = 0; hole < numHoles(); ++hole) {
-        if(not hole_options_mask[hole].isSubsetOf(other.holeOptionsMask(hole))) {
+        if(not holeOptionsMask(hole).isSubsetOf(other.holeOptionsMask(hole))) {
             return false;
         }
     }
@@ -84,7 +91,7 @@ bool Family::isSubsetOf(Family const& other) const {
 
 bool Family::includesAssignment(std::vector<uint64_t> const& hole_to_option) const {
     for(uint64_t hole = 0; hole < numHoles(); ++hole) {
-        if(not hole_options_mask[hole][hole_to_option[hole]]) {
+        if(not holeOptionsMask(hole)[hole_to_option[hole]]) {
             return false;
         }
     }
@@ -93,7 +100,7 @@ bool Family::includesAssignment(std::vector<uint64_t> const& hole_to_option) con
 
 bool Family::includesAssignment(std::map<uint64_t,uint64_t> const& hole_to_option) const {
     for(auto const& [hole,option]: hole_to_option) {
-        if(not hole_options_mask[hole][option]) {
+        if(not holeOptionsMask(hole)[option]) {
             return false;
         }
     }
@@ -102,21 +109,47 @@ bool Family::includesAssignment(std::map<uint64_t,uint64_t> const& hole_to_optio
 
 bool Family::includesAssignment(std::vector<std::pair<uint64_t,uint64_t>> const& hole_to_option) const {
     for(auto const& [hole,option]: hole_to_option) {
-    if(not hole_options_mask[hole][option]) {
+    if(not holeOptionsMask(hole)[option]) {
             return false;
         }
     }
     return true;   
 }
 
-std::vector<BitVector>::iterator Family::begin() {
-    return hole_options_mask.begin();
+uint64_t Family::packedNumWords() const {
+    uint64_t num_bits = 0;
+    for(auto const& hole: hole_options) {
+        num_bits += hole->mask.size();
+    }
+    return (num_bits+63)/64;
 }
 
-std::vector<BitVector>::iterator Family::end() {
-    return hole_options_mask.end();
+void Family::packOptions(uint64_t* words) const {
+    uint64_t offset = 0;
+    for(auto const& hole: hole_options) {
+        for(auto option: hole->options) {
+            uint64_t bit = offset+option;
+            words[bit/64] |= ((uint64_t)1) << (bit%64);
+        }
+        offset += hole->mask.size();
+    }
 }
 
+void Family::unpackOptions(uint64_t const* words) {
+    uint64_t offset = 0;
+    for(uint64_t hole = 0; hole < numHoles(); ++hole) {
+        uint64_t num_options = holeNumOptionsTotal(hole);
+        BitVector mask(num_options,false);
+        for(uint64_t option = 0; option < num_options; ++option) {
+            uint64_t bit = offset+option;
+            if((words[bit/64] >> (bit%64)) & 1) {
+                mask.set(option);
+            }
+        }
+        holeSetOptions(hole,mask);
+        offset += num_options;
+    }
+}
 
 void Family::setChoices(BitVector const& choices) {
     this->choices = BitVector(choices);
@@ -5,11 +5,24 @@
 #include <cstdint>
 #include <vector>
 #include <map>
+#include <memory>
 
 namespace synthesis {
 
 using BitVector = storm::storage::BitVector;
 
+/** Options available for a single hole. */
+struct HoleOptions {
+    /** A list of available options. */
+    std::vector<uint64_t> options;
+    /** A mask of available options. */
+    BitVector mask;
+};
+
+/**
+ * A family of hole assignments. Options of individual holes are immutable and shared between a family and its copies:
+ * copying a family only copies pointers, and setting options of a hole replaces its options in this family only.
+ */
 class Family {
 public:
     
@@ -37,9 +50,15 @@ public:
     bool isSubsetOf(Family const& other) const;
     // uint64_t size();
 
-    // iterator over hole options
-    std::vector<BitVector>::iterator begin();
-    std::vector<BitVector>::iterator end();
+    /** Number of 64-bit words needed to store the option masks of all holes packed one after another. */
+    uint64_t packedNumWords() const;
+    /** Store the option masks of all holes to the given (zeroed) array of packedNumWords() words. */
+    void packOptions(uint64_t* words) const;
+    /**
+     * Restore the options of all holes from an array produced by packOptions of a family with the same holes. Holes
+     * whose options do not change keep sharing them.
+     */
+    void unpackOptions(uint64_t const* words);
 
     // choice operations
     void setChoices(BitVector const& choices);
@@ -48,10 +67,8 @@ public:
     
     
 protected:
-    /** For each hole, a list of available options. */
-    std::vector<std::vector<uint64_t>> hole_options;
-    /** For each hole, a mastk of available options. */
-    std::vector<BitVector> hole_options_mask;
+    /** For each hole, its available options; options of holes that were not modified are shared with the original. */
+    std::vector<std::shared_ptr<HoleOptions const>> hole_options;
     
     
     /** Whether choices have been set for this family. */
@@ -8,6 +8,7 @@
 #include "JaniChoices.h"
 #include "Family.h"
 #include "Coloring.h"
+#include "ChoiceValues.h"
 
 #include <storm/models/sparse/Mdp.h>
 #include <storm/storage/BitVector.h>
@@ -15,6 +16,17 @@
 #include <storm/storage/sparse/JaniChoiceOrigins.h>
 
 #include <storm/storage/Scheduler.h>
+#include <pybind11/numpy.h>
+#include <storm/models/sparse/Dtmc.h>
+#include <storm/storage/sparse/ModelComponents.h>
+#include <storm/exceptions/InvalidArgumentException.h>
+
+#include "src/synthesis/translation/componentTranslations.h"
+
+#include <storm/utility/macros.h>
+
+#include <algorithm>
+#include <queue>
 
 namespace synthesis {
 
@@ -93,11 +105,84 @@ std::vector<uint64_t> schedulerToStateToGlobalChoice(
     return state_to_choice;
 }
 
+/**
+ * Construct the DTMC induced by the choices of the MDP in one pass: exactly one choice must be selected in each
+ * reachable state. States of the DTMC preserve the order of the states of the MDP.
+ * @return (1) the induced DTMC
+ * @return (2) for each state of the DTMC, the corresponding state of the MDP
+ * @return (3) for each state (choice) of the DTMC, the corresponding choice of the MDP
+ */
+template<typename ValueType>
+std::tuple<std::shared_ptr<storm::models::sparse::Dtmc<ValueType>>,std::vector<uint64_t>,std::vector<uint64_t>> constructInducedDtmc(
+    storm::models::sparse::Mdp<ValueType> const& mdp, storm::storage::BitVector const& choices
+) {
+    auto const& matrix = mdp.getTransitionMatrix();
+    auto const& row_groups = matrix.getRowGroupIndices();
+    uint64_t num_states = mdp.getNumberOfStates();
+    uint64_t initial_state = *(mdp.getInitialStates().begin());
+
+    // explore reachable states, identify the choice selected in each of them
+    std::vector<uint64_t> state_to_choice(num_states,mdp.getNumberOfChoices());
+    storm::storage::BitVector state_reachable(num_states,false);
+    state_reachable.set(initial_state,true);
+    std::queue<uint64_t> state_queue;
+    state_queue.push(initial_state);
+    uint64_t num_entries = 0;
+    while(not state_queue.empty()) {
+        auto state = state_queue.front();
+        state_queue.pop();
+        auto choice = choices.getNextSetIndex(row_groups[state]);
+        STORM_LOG_THROW(
+            choice < row_groups[state+1] and choices.getNextSetIndex(choice+1) >= row_groups[state+1],
+            storm::exceptions::InvalidArgumentException, "expected exactly one choice selected in state " << state
+        );
+        state_to_choice[state] = choice;
+        for(auto const& entry: matrix.getRow(choice)) {
+            num_entries++;
+            auto dst = entry.getColumn();
+            if(not state_reachable[dst]) {
+                state_reachable.set(dst,true);
+                state_queue.push(dst);
+            }
+        }
+    }
+
+    uint64_t dtmc_num_states = state_reachable.getNumberOfSetBits();
+    std::vector<uint64_t> state_to_dtmc_state(num_states,dtmc_num_states);
+    std::vector<uint64_t> dtmc_state_to_state;
+    std::vector<uint64_t> dtmc_state_to_choice;
+    dtmc_state_to_state.reserve(dtmc_num_states);
+    dtmc_state_to_choice.reserve(dtmc_num_states);
+    for(auto state: state_reachable) {
+        state_to_dtmc_state[state] = dtmc_state_to_state.size();
+        dtmc_state_to_state.push_back(state);
+        dtmc_state_to_choice.push_back(state_to_choice[state]);
+    }
+
+    storm::storage::SparseMatrixBuilder<ValueType> builder(dtmc_num_states,dtmc_num_states,num_entries);
+    for(uint64_t dtmc_state = 0; dtmc_state < dtmc_num_states; ++dtmc_state) {
+        for(auto const& entry: matrix.getRow(dtmc_state_to_choice[dtmc_state])) {
+            builder.addNextValue(dtmc_state,state_to_dtmc_state[entry.getColumn()],entry.getValue());
+        }
+    }
+
+    storm::storage::sparse::ModelComponents<ValueType> components;
+    components.transitionMatrix = builder.build();
+    components.stateLabeling = synthesis::translateStateLabeling(mdp,dtmc_state_to_state,state_to_dtmc_state[initial_state]);
+    storm::storage::BitVector dtmc_choice_mask(dtmc_num_states,true);
+    for(auto const& reward_model : mdp.getRewardModels()) {
+        auto dtmc_reward_model = synthesis::translateRewardModel(reward_model.second,dtmc_state_to_choice,dtmc_choice_mask);
+        components.rewardModels.emplace(reward_model.first, dtmc_reward_model);
+    }
+    auto dtmc = std::make_shared<storm::models::sparse::Dtmc<ValueType>>(std::move(components));
+    return std::make_tuple(dtmc,dtmc_state_to_state,dtmc_state_to_choice);
+}
+
 std::map<uint64_t,double> computeInconsistentHoleVariance(
     Family const& family,
     std::vector<uint64_t> const& row_groups, std::vector<uint64_t> const& choice_to_global_choice, std::vector<double> const& choice_to_value,
     Coloring const& coloring, std::map<uint64_t,std::vector<uint64_t>> const& hole_to_inconsistent_options,
-    std::vector<double> const& state_to_expected_visits
+    std::vector<double> const& state_to_expected_visits, BitVector const& choice_mask
 ) {
 
     auto num_holes = family.numHoles();
@@ -133,6 +218,9 @@ std::map<uint64_t,double> computeInconsistentHoleVariance(
     for(uint64_t state=0; state<num_states; ++state) {
 
         for(uint64_t choice=row_groups[state]; choice<row_groups[state+1]; ++choice) {
+            if(not choice_mask[choice]) {
+                continue;
+            }
             auto value = choice_to_value[choice];
             auto choice_global = choice_to_global_choice[choice];
             // std::cout << "choice " << choice << std::endl;
@@ -176,6 +264,84 @@ std::map<uint64_t,double> computeInconsistentHoleVariance(
     return inconsistent_hole_variance;
 }
 
+/**
+ * For each inconsistent hole, estimate the difference between its inconsistent options as the average (over
+ * states where the hole is relevant) of the difference between the values of choices colored by these options,
+ * weighted by the expected number of visits of the state. Choices colored by the options of the hole are matched
+ * via their position in the lists of choices colored by each option, which is valid for posterior-unaware
+ * unfolding of POMDPs.
+ * @param choice_to_global_choice For each choice of the MDP, the corresponding choice of the quotient.
+ * @param state_to_expected_visits If empty, each state is assumed to be visited once.
+ * @param choice_mask Only these choices of the MDP will be considered.
+ */
+std::map<uint64_t,double> estimateSchedulerDifference(
+    Coloring const& coloring,
+    std::vector<uint64_t> const& row_groups,
+    py::array_t<uint64_t, py::array::c_style | py::array::forcecast> const& choice_to_global_choice,
+    py::array_t<double, py::array::c_style | py::array::forcecast> const& choice_to_value,
+    std::map<uint64_t,std::vector<uint64_t>> const& hole_to_inconsistent_options,
+    py::array_t<double, py::array::c_style | py::array::forcecast> const& state_to_expected_visits,
+    BitVector const& choice_mask
+) {
+    auto global_choice = choice_to_global_choice.unchecked<1>();
+    auto value = choice_to_value.unchecked<1>();
+    auto expected_visits = state_to_expected_visits.unchecked<1>();
+    bool has_expected_visits = state_to_expected_visits.size() > 0;
+
+    // inverse of the choice map and the map of choices to their states
+    uint64_t num_global_choices = coloring.getChoiceToAssignment().size();
+    uint64_t num_choices = row_groups.back();
+    std::vector<uint64_t> global_choice_to_choice(num_global_choices, num_choices);
+    std::vector<uint64_t> choice_to_state(num_choices);
+    for(uint64_t state = 0; state+1 < row_groups.size(); ++state) {
+        for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
+            choice_to_state[choice] = state;
+            if(choice_mask[choice]) {
+                global_choice_to_choice[global_choice(choice)] = choice;
+            }
+        }
+    }
+
+    auto const& hole_option_to_choices = coloring.getHoleOptionToChoices();
+    std::map<uint64_t,double> hole_difference;
+    for(auto const& [hole,options]: hole_to_inconsistent_options) {
+        auto const& option_to_choices = hole_option_to_choices[hole];
+        auto const& choices_0 = option_to_choices[options[0]];
+        double difference_sum = 0;
+        uint64_t states_affected = 0;
+        for(uint64_t index = 0; index < choices_0.size(); ++index) {
+            uint64_t choice_0 = global_choice_to_choice[choices_0[index]];
+            if(choice_0 == num_choices) {
+                continue;
+            }
+            double visits = has_expected_visits ? expected_visits(choice_to_state[choice_0]) : 1;
+            if(visits == 0) {
+                continue;
+            }
+            double min_value = value(choice_0);
+            double max_value = min_value;
+            for(auto option: options) {
+                auto const& option_choices = option_to_choices[option];
+                STORM_LOG_THROW(
+                    index < option_choices.size(), storm::exceptions::InvalidArgumentException,
+                    "options of hole " << hole << " color different numbers of choices"
+                );
+                uint64_t choice = global_choice_to_choice[option_choices[index]];
+                STORM_LOG_THROW(
+                    choice != num_choices, storm::exceptions::InvalidArgumentException,
+                    "choice of option " << option << " of hole " << hole << " is not enabled by the choice mask"
+                );
+                min_value = std::min(min_value, value(choice));
+                max_value = std::max(max_value, value(choice));
+            }
+            difference_sum += (max_value-min_value)*visits;
+            states_affected++;
+        }
+        hole_difference[hole] = states_affected == 0 ? 0 : difference_sum / states_affected;
+    }
+    return hole_difference;
+}
+
 std::map<uint64_t,double> alternativeComputeInconsistentHoleVariance(
     Family const& family,
     std::vector<uint64_t> const& row_groups, std::vector<uint64_t> const& choice_to_global_choice, std::vector<double> const& choice_to_value,
@@ -384,7 +550,6 @@ storm::storage::BitVector policyToChoicesForFamily(
     return choices & family_choices;
 }
 
-
 /*std::pair<std::vector<uint64_t>,storm::storage::BitVector> fixPolicyForFamily(
     std::vector<uint64_t> const& policy, uint64_t invalid_action,
     storm::storage::BitVector const& family_choices,
@@ -441,7 +606,36 @@ void bindings_coloring(py::module& m) {
     m.def("computeChoiceDestinations", &synthesis::computeChoiceDestinations<double>);
 
     m.def("schedulerToStateToGlobalChoice", &synthesis::schedulerToStateToGlobalChoice<double>);
+    m.def("constructInducedDtmc", &synthesis::constructInducedDtmc<double>, py::arg("mdp"), py::arg("choices"));
+    // returns (1) choice values, (2) expected visits or None, (3) whether expected visits were estimated by sampling
+    m.def("choiceValuesAndExpectedVisits", [](
+            storm::models::sparse::Mdp<double> const& mdp, std::vector<double> const& state_values,
+            std::string const& reward_name, BitVector const& choices, bool compute_visits, bool minimizing, double precision,
+            uint64_t max_iterations, uint64_t num_samples, uint64_t max_path_length, double max_relative_error, uint64_t seed
+        ) {
+            auto choice_values = synthesis::computeChoiceValues(mdp, state_values, reward_name);
+            py::object expected_visits = py::none();
+            bool sampled = false;
+            if(compute_visits) {
+                std::optional<std::vector<double>> visits;
+                if(num_samples > 0) {
+                    visits = synthesis::sampleExpectedVisits(
+                        mdp, choices, num_samples, max_path_length, max_relative_error, seed, minimizing);
+                    sampled = visits.has_value();
+                }
+                if(not visits) {
+                    visits = synthesis::computeExpectedVisits(mdp, choices, precision, max_iterations, minimizing);
+                }
+                expected_visits = py::array_t<double>(visits->size(), visits->data());
+            }
+            return py::make_tuple(py::array_t<double>(choice_values.size(), choice_values.data()), expected_visits, sampled);
+        }, py::arg("mdp"), py::arg("state_values"), py::arg("reward_name"), py::arg("choices"), py::arg("compute_visits"),
+        py::arg("minimizing"), py::arg("precision"), py::arg("max_iterations"), py::arg("num_samples") = 0, py::arg("max_path_length") = 0,
+        py::arg("max_relative_error") = 0, py::arg("seed") = 0);
     m.def("computeInconsistentHoleVariance", &synthesis::computeInconsistentHoleVariance);
+    m.def("estimateSchedulerDifference", &synthesis::estimateSchedulerDifference,
+        py::arg("coloring"), py::arg("row_groups"), py::arg("choice_to_global_choice"), py::arg("choice_to_value"),
+        py::arg("hole_to_inconsistent_options"), py::arg("state_to_expected_visits"), py::arg("choice_mask"));
     m.def("alternativeComputeInconsistentHoleVariance", &synthesis::alternativeComputeInconsistentHoleVariance);
     
     m.def("policyToChoicesForFamily", &synthesis::policyToChoicesForFamily);
@@ -460,14 +654,49 @@ void bindings_coloring(py::module& m) {
         .def("holeNumOptions", &synthesis::Family::holeNumOptions)
         .def("holeNumOptionsTotal", &synthesis::Family::holeNumOptionsTotal)
         .def("holeContains", &synthesis::Family::holeContains)
+        .def("includesAssignment", py::overload_cast<std::vector<std::pair<uint64_t,uint64_t>> const&>(&synthesis::Family::includesAssignment, py::const_))
+        .def("packedNumWords", &synthesis::Family::packedNumWords)
+        .def("packOptions", [](synthesis::Family const& family, py::array_t<uint64_t, py::array::c_style> words) {
+            // the options are written directly to the given array, e.g. a row of a memory-mapped store
+            STORM_LOG_THROW(
+                (uint64_t)words.size() == family.packedNumWords(), storm::exceptions::InvalidArgumentException,
+                "packOptions: unexpected number of words"
+            );
+            uint64_t* data = words.mutable_data();
+            std::fill(data, data+words.size(), 0);
+            family.packOptions(data);
+        }, py::arg("words"))
+        .def("unpackOptions", [](synthesis::Family& family, py::array_t<uint64_t, py::array::c_style | py::array::forcecast> words) {
+            STORM_LOG_THROW(
+                (uint64_t)words.size() == family.packedNumWords(), storm::exceptions::InvalidArgumentException,
+                "unpackOptions: unexpected number of words"
+            );
+            family.unpackOptions(words.data());
+        }, py::arg("words"))
         ;
 
     py::class_<synthesis::Coloring>(m, "Coloring")
         .def(py::init<synthesis::Family const&, std::vector<uint64_t> const&, std::vector<std::vector<std::pair<uint64_t,uint64_t>>> >(), "Constructor.")
         .def("getChoiceToAssignment", &synthesis::Coloring::getChoiceToAssignment)
         .def("getStateToHoles", &synthesis::Coloring::getStateToHoles)
+        .def("getStateToHolesArrays", [](synthesis::Coloring const& coloring) {
+            // CSR representation: holes of state s are indices[indptr[s]:indptr[s+1]]
+            std::vector<uint64_t> indptr(1,0);
+            std::vector<uint64_t> indices;
+            for(auto const& holes: coloring.getStateToHoles()) {
+                for(auto hole: holes) {
+                    indices.push_back(hole);
+                }
+                indptr.push_back(indices.size());
+            }
+            return std::make_pair(
+                py::array_t<uint64_t>(indptr.size(),indptr.data()), py::array_t<uint64_t>(indices.size(),indices.data())
+            );
+        })
         .def("getUncoloredChoices", &synthesis::Coloring::getUncoloredChoices)
-        .def("selectCompatibleChoices", &synthesis::Coloring::selectCompatibleChoices)
+        .def("getHoleOptionToChoices", &synthesis::Coloring::getHoleOptionToChoices)
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
+        .def("selectCompatibleChoices", py::overload_cast<synthesis::Family const&, storm::storage::BitVector const&, uint64_t>(&synthesis::Coloring::selectCompatibleChoices, py::const_))
         .def("collectHoleOptions", &synthesis::Coloring::collectHoleOptions)
         ;
 
@@ -9,5 +9,6 @@ void bindings_pomdp(py::module &m);
 void bindings_decpomdp(py::module &m);
 void bindings_counterexamples(py::module &m);
 void bindings_pomdp_family(py::module &m);
+void bindings_verification(py::module &m);
 
 void bindings_coloring(py::module &m);
@@ -1,7 +1,22 @@
 #include "MdpModelChecker.h"
 
 #include "storm/modelchecker/prctl/SparseMdpPrctlModelChecker.h"
+#include "storm/modelchecker/prctl/SparseDtmcPrctlModelChecker.h"
+#include "storm/models/sparse/Dtmc.h"
+#include "storm/logic/CloneVisitor.h"
+#include "storm/logic/Bound.h"
+#include "storm/storage/expressions/ExpressionManager.h"
+#include "storm/modelchecker/results/ExplicitQualitativeCheckResult.h"
+#include "storm/environment/solver/MinMaxSolverEnvironment.h"
+#include "storm/solver/OptimizationDirection.h"
+#include "storm/utility/constants.h"
+#include "storm/utility/macros.h"
 #include "storm/exceptions/NotSupportedException.h"
+#include "storm/modelchecker/hints/ExplicitModelCheckerHint.h"
+#include "storm/api/verification.h"
+#include "storm/storage/MaximalEndComponentDecomposition.h"
+
+#include <queue>
 
 namespace synthesis {
 
@@ -24,4 +39,514 @@ namespace synthesis {
         storm::logic::Formula const& formula,
         bool produce_schedulers
     );
+
+
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> verifyWithHint(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Model<ValueType>> const& model,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<ValueType> const& result_hint
+    ) {
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> task(formula);
+        task.setProduceSchedulers(produce_schedulers);
+        storm::modelchecker::ExplicitModelCheckerHint<ValueType> hint;
+        hint.setComputeOnlyMaybeStates(false);
+        hint.setResultHint(result_hint);
+        task.setHint(std::make_shared<storm::modelchecker::ExplicitModelCheckerHint<ValueType>>(hint));
+        return storm::api::verifyWithSparseEngine<ValueType>(env, model, task);
+    }
+
+    template std::shared_ptr<storm::modelchecker::CheckResult> verifyWithHint<double>(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Model<double>> const& model,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<double> const& result_hint
+    );
+
+
+    template<typename ModelChecker, typename ValueType>
+    std::unique_ptr<storm::modelchecker::CheckResult> computeOperatorValues(
+        ModelChecker & checker,
+        storm::Environment const& env,
+        storm::logic::OperatorFormula const& formula,
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> const& task
+    ) {
+        if(formula.isRewardOperatorFormula()) {
+            return checker.computeRewards(env, formula.asRewardOperatorFormula().getMeasureType(), task);
+        }
+        return checker.computeProbabilities(env, task);
+    }
+
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> verifyWithBound(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Model<ValueType>> const& model,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<ValueType> const& result_hint,
+        storm::logic::ComparisonType comparison_type,
+        ValueType threshold
+    ) {
+        STORM_LOG_THROW(formula.isProbabilityOperatorFormula() or formula.isRewardOperatorFormula(),
+            storm::exceptions::NotSupportedException, "bounded model checking supports only P=? and R=? formulae"
+        );
+        // attach the bound to a copy of the formula: the check task picks it up together with the optimization
+        // direction and the reward model; the bound is then used by the solver as a termination condition
+        storm::expressions::ExpressionManager expression_manager;
+        std::shared_ptr<storm::logic::Formula> bounded_formula = storm::logic::CloneVisitor().clone(formula);
+        bounded_formula->asOperatorFormula().setBound(
+            storm::logic::Bound(comparison_type, expression_manager.rational(storm::utility::convertNumber<double>(threshold)))
+        );
+        bool only_initial_states_relevant = true;
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> bounded_task(*bounded_formula, only_initial_states_relevant);
+        // compute the values of the path formula directly, otherwise the values would be compared against the bound
+        auto task = bounded_task.substituteFormula(formula.asOperatorFormula().getSubformula());
+        task.setProduceSchedulers(produce_schedulers);
+        if(not result_hint.empty()) {
+            storm::modelchecker::ExplicitModelCheckerHint<ValueType> hint;
+            hint.setComputeOnlyMaybeStates(false);
+            hint.setResultHint(result_hint);
+            task.setHint(std::make_shared<storm::modelchecker::ExplicitModelCheckerHint<ValueType>>(hint));
+        }
+
+        std::unique_ptr<storm::modelchecker::CheckResult> result;
+        auto const& operator_formula = formula.asOperatorFormula();
+        if(model->isOfType(storm::models::ModelType::Mdp)) {
+            storm::modelchecker::SparseMdpPrctlModelChecker<storm::models::sparse::Mdp<ValueType>> checker(*model->template as<storm::models::sparse::Mdp<ValueType>>());
+            result = computeOperatorValues(checker, env, operator_formula, task);
+        } else if(model->isOfType(storm::models::ModelType::Dtmc)) {
+            storm::modelchecker::SparseDtmcPrctlModelChecker<storm::models::sparse::Dtmc<ValueType>> checker(*model->template as<storm::models::sparse::Dtmc<ValueType>>());
+            result = computeOperatorValues(checker, env, operator_formula, task);
+        } else {
+            STORM_LOG_THROW(false, storm::exceptions::NotSupportedException, "bounded model checking supports only DTMCs and MDPs");
+        }
+        return std::shared_ptr<storm::modelchecker::CheckResult>(std::move(result));
+    }
+
+    template std::shared_ptr<storm::modelchecker::CheckResult> verifyWithBound<double>(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Model<double>> const& model,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<double> const& result_hint,
+        storm::logic::ComparisonType comparison_type,
+        double threshold
+    );
+
+
+    template<typename ValueType>
+    MdpModelChecker<ValueType>::MdpModelChecker(storm::models::sparse::Mdp<ValueType> const& quotient)
+        : quotient(quotient) {
+        
+        this->initial_state = *(quotient.getInitialStates().begin());
+        auto num_states = quotient.getNumberOfStates();
+        auto const& row_groups = quotient.getTransitionMatrix().getRowGroupIndices();
+        this->choice_to_state.resize(quotient.getNumberOfChoices());
+        this->state_to_predecessor_choices.resize(num_states);
+        for(uint64_t state = 0; state < num_states; ++state) {
+            for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
+                this->choice_to_state[choice] = state;
+                for(auto const& entry: quotient.getTransitionMatrix().getRow(choice)) {
+                    auto& predecessors = this->state_to_predecessor_choices[entry.getColumn()];
+                    if(predecessors.empty() or predecessors.back() != choice) {
+                        predecessors.push_back(choice);
+                    }
+                }
+            }
+        }
+        this->backward_transitions = quotient.getBackwardTransitions();
+    }
+
+
+    template<typename ValueType>
+    std::pair<storm::storage::BitVector,storm::storage::BitVector> MdpModelChecker<ValueType>::exploreReachable(
+        storm::storage::BitVector const& choice_mask
+    ) const {
+        auto const& row_groups = this->quotient.getTransitionMatrix().getRowGroupIndices();
+        storm::storage::BitVector reachable_states(this->quotient.getNumberOfStates(),false);
+        storm::storage::BitVector reachable_choices(this->quotient.getNumberOfChoices(),false);
+        reachable_states.set(this->initial_state,true);
+        std::queue<uint64_t> state_queue;
+        state_queue.push(this->initial_state);
+        while(not state_queue.empty()) {
+            auto state = state_queue.front();
+            state_queue.pop();
+            for(auto choice = choice_mask.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = choice_mask.getNextSetIndex(choice+1)) {
+                reachable_choices.set(choice,true);
+                for(auto const& entry: this->quotient.getTransitionMatrix().getRow(choice)) {
+                    auto dst = entry.getColumn();
+                    if(not reachable_states[dst]) {
+                        reachable_states.set(dst,true);
+                        state_queue.push(dst);
+                    }
+                }
+            }
+        }
+        return std::make_pair(reachable_states,reachable_choices);
+    }
+
+
+    template<typename ValueType>
+    storm::storage::BitVector MdpModelChecker<ValueType>::computeCanReach(
+        storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& reachable_states,
+        storm::storage::BitVector const& target_states, storm::storage::BitVector const& avoid_states
+    ) const {
+        storm::storage::BitVector can_reach = target_states & reachable_states;
+        std::vector<uint64_t> state_stack(can_reach.begin(),can_reach.end());
+        while(not state_stack.empty()) {
+            auto state = state_stack.back();
+            state_stack.pop_back();
+            for(auto choice: this->state_to_predecessor_choices[state]) {
+                auto src = this->choice_to_state[choice];
+                if(not choice_mask[choice] or not reachable_states[src] or can_reach[src] or avoid_states[src]) {
+                    continue;
+                }
+                can_reach.set(src,true);
+                state_stack.push_back(src);
+            }
+        }
+        return can_reach;
+    }
+
+
+    template<typename ValueType>
+    storm::storage::BitVector MdpModelChecker<ValueType>::computeMustReach(
+        storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& reachable_states,
+        storm::storage::BitVector const& target_states
+    ) const {
+        // a state is added once each of its choices has a destination in the set
+        auto const& row_groups = this->quotient.getTransitionMatrix().getRowGroupIndices();
+        std::vector<uint64_t> state_num_choices_left(this->quotient.getNumberOfStates(),0);
+        for(auto state: reachable_states) {
+            for(uint64_t choice = row_groups[state]; choice < row_groups[state+1]; ++choice) {
+                state_num_choices_left[state] += choice_mask[choice];
+            }
+        }
+        storm::storage::BitVector choice_hit(this->quotient.getNumberOfChoices(),false);
+        storm::storage::BitVector must_reach = target_states & reachable_states;
+        std::vector<uint64_t> state_stack(must_reach.begin(),must_reach.end());
+        while(not state_stack.empty()) {
+            auto state = state_stack.back();
+            state_stack.pop_back();
+            for(auto choice: this->state_to_predecessor_choices[state]) {
+                auto src = this->choice_to_state[choice];
+                if(not choice_mask[choice] or choice_hit[choice] or not reachable_states[src] or must_reach[src]) {
+                    continue;
+                }
+                choice_hit.set(choice,true);
+                if(--state_num_choices_left[src] == 0) {
+                    must_reach.set(src,true);
+                    state_stack.push_back(src);
+                }
+            }
+        }
+        return must_reach;
+    }
+
+
+    template<typename ValueType>
+    storm::storage::BitVector MdpModelChecker<ValueType>::computeProb1E(
+        storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& reachable_states,
+        storm::storage::BitVector const& target_states
+    ) const {
+        auto const& row_groups = this->quotient.getTransitionMatrix().getRowGroupIndices();
+        storm::storage::BitVector current = reachable_states;
+        storm::storage::BitVector choice_stays(this->quotient.getNumberOfChoices(),false);
+        while(true) {
+            // identify choices that do not leave the current set of states
+            choice_stays.clear();
+            for(auto state: current) {
+                for(auto choice = choice_mask.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = choice_mask.getNextSetIndex(choice+1)) {
+                    bool stays = true;
+                    for(auto const& entry: this->quotient.getTransitionMatrix().getRow(choice)) {
+                        if(not current[entry.getColumn()]) {
+                            stays = false;
+                            break;
+                        }
+                    }
+                    choice_stays.set(choice,stays);
+                }
+            }
+            // states that can reach the target using such choices
+            storm::storage::BitVector next = target_states & current;
+            std::vector<uint64_t> state_stack(next.begin(),next.end());
+            while(not state_stack.empty()) {
+                auto state = state_stack.back();
+                state_stack.pop_back();
+                for(auto choice: this->state_to_predecessor_choices[state]) {
+                    auto src = this->choice_to_state[choice];
+                    if(not choice_stays[choice] or not current[src] or next[src]) {
+                        continue;
+                    }
+                    next.set(src,true);
+                    state_stack.push_back(src);
+                }
+            }
+            if(next == current) {
+                return current;
+            }
+            current = std::move(next);
+        }
+    }
+
+
+    template<typename ValueType>
+    std::tuple<std::vector<uint64_t>,std::vector<std::vector<uint64_t>>,std::vector<std::vector<uint64_t>>> MdpModelChecker<ValueType>::computeZeroRewardComponents(
+        storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& maybe_states,
+        std::vector<ValueType> const& choice_rewards
+    ) const {
+        auto const& matrix = this->quotient.getTransitionMatrix();
+        auto const& row_groups = matrix.getRowGroupIndices();
+        // zero-reward choices that do not leave the maybe states
+        storm::storage::BitVector zero_choices(this->quotient.getNumberOfChoices(),false);
+        for(auto state: maybe_states) {
+            for(auto choice = choice_mask.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = choice_mask.getNextSetIndex(choice+1)) {
+                if(not storm::utility::isZero(choice_rewards[choice])) {
+                    continue;
+                }
+                bool stays = true;
+                for(auto const& entry: matrix.getRow(choice)) {
+                    if(not maybe_states[entry.getColumn()]) {
+                        stays = false;
+                        break;
+                    }
+                }
+                zero_choices.set(choice,stays);
+            }
+        }
+        storm::storage::MaximalEndComponentDecomposition<ValueType> decomposition(
+            matrix, this->backward_transitions, maybe_states, zero_choices
+        );
+
+        std::vector<uint64_t> state_to_component(this->quotient.getNumberOfStates(),decomposition.size());
+        std::vector<std::vector<uint64_t>> component_states;
+        std::vector<std::vector<uint64_t>> component_exits;
+        for(auto const& mec: decomposition) {
+            uint64_t component = component_states.size();
+            component_states.emplace_back();
+            component_exits.emplace_back();
+            for(auto const& [state,internal_choices]: mec) {
+                state_to_component[state] = component;
+                component_states.back().push_back(state);
+                for(auto choice = choice_mask.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = choice_mask.getNextSetIndex(choice+1)) {
+                    if(internal_choices.find(choice) == internal_choices.end()) {
+                        component_exits.back().push_back(choice);
+                    }
+                }
+            }
+        }
+        return std::make_tuple(state_to_component,component_states,component_exits);
+    }
+
+
+    template<typename ValueType>
+    ValueType MdpModelChecker<ValueType>::choiceValue(
+        uint64_t choice, std::vector<ValueType> const& state_values, std::vector<ValueType> const& choice_rewards
+    ) const {
+        ValueType value = choice_rewards.empty() ? storm::utility::zero<ValueType>() : choice_rewards[choice];
+        for(auto const& entry: this->quotient.getTransitionMatrix().getRow(choice)) {
+            value += entry.getValue() * state_values[entry.getColumn()];
+        }
+        return value;
+    }
+
+
+    template<typename ValueType>
+    void MdpModelChecker<ValueType>::check(
+        storm::Environment const& env,
+        storm::logic::Formula const& formula,
+        storm::storage::BitVector const& choice_mask,
+        std::vector<ValueType> const& initial_values,
+        ValueType termination_threshold,
+        bool termination_strict
+    ) {
+        STORM_LOG_THROW(
+            (formula.isProbabilityOperatorFormula() or formula.isRewardOperatorFormula()) and
+            formula.asOperatorFormula().hasOptimalityType() and formula.asOperatorFormula().getSubformula().isEventuallyFormula(),
+            storm::exceptions::NotSupportedException, "masked model checking supports only P=? [F phi] and R=? [F phi]"
+        );
+        bool maximizing = storm::solver::maximize(formula.asOperatorFormula().getOptimalityType());
+        bool reward = formula.isRewardOperatorFormula();
+        auto const& matrix = this->quotient.getTransitionMatrix();
+        auto const& row_groups = matrix.getRowGroupIndices();
+        auto num_states = this->quotient.getNumberOfStates();
+        auto num_choices = this->quotient.getNumberOfChoices();
+
+        // identify target states
+        storm::modelchecker::SparseMdpPrctlModelChecker<storm::models::sparse::Mdp<ValueType>> propositional_checker(this->quotient);
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> target_task(
+            formula.asOperatorFormula().getSubformula().asEventuallyFormula().getSubformula()
+        );
+        storm::storage::BitVector target_states = propositional_checker.check(env, target_task)->asExplicitQualitativeCheckResult().getTruthValuesVector();
+
+        storm::storage::BitVector reachable_states, reachable_choices;
+        std::tie(reachable_states,reachable_choices) = this->exploreReachable(choice_mask);
+
+        // qualitative analysis: fix values of states where the result does not need to be approximated
+        this->solution_state_values.assign(num_states,storm::utility::zero<ValueType>());
+        std::vector<ValueType> choice_rewards;
+        storm::storage::BitVector maybe_states;
+        if(not reward) {
+            for(auto state: target_states & reachable_states) {
+                this->solution_state_values[state] = storm::utility::one<ValueType>();
+            }
+            storm::storage::BitVector positive_states = maximizing ?
+                this->computeCanReach(reachable_choices, reachable_states, target_states, target_states) :
+                this->computeMustReach(reachable_choices, reachable_states, target_states);
+            maybe_states = positive_states & ~target_states;
+        } else {
+            auto const& reward_model = formula.asRewardOperatorFormula().hasRewardModelName() ?
+                this->quotient.getRewardModel(formula.asRewardOperatorFormula().getRewardModelName()) :
+                this->quotient.getUniqueRewardModel();
+            choice_rewards = reward_model.getTotalRewardVector(matrix);
+            storm::storage::BitVector finite_states;
+            if(maximizing) {
+                // states that can avoid the target with positive probability have infinite reward
+                storm::storage::BitVector must_reach = this->computeMustReach(reachable_choices, reachable_states, target_states);
+                storm::storage::BitVector may_avoid = reachable_states & ~must_reach;
+                finite_states = reachable_states & ~this->computeCanReach(reachable_choices, reachable_states, may_avoid, target_states);
+            } else {
+                finite_states = this->computeProb1E(reachable_choices, reachable_states, target_states);
+            }
+            for(auto state: reachable_states & ~finite_states) {
+                this->solution_state_values[state] = storm::utility::infinity<ValueType>();
+            }
+            maybe_states = finite_states & ~target_states;
+        }
+
+        // for expected reward minimization, zero-reward end components must be collapsed: otherwise, value iteration
+        // converges to the least fixpoint, where states of such a component may not leave it and obtain value 0
+        std::vector<uint64_t> state_to_component;
+        std::vector<std::vector<uint64_t>> component_states, component_exits;
+        if(reward and not maximizing) {
+            std::tie(state_to_component,component_states,component_exits) = this->computeZeroRewardComponents(
+                reachable_choices, maybe_states, choice_rewards
+            );
+        }
+        auto in_component = [&](uint64_t state) {
+            return not state_to_component.empty() and state_to_component[state] < component_states.size();
+        };
+
+        // value iteration from below using Gauss-Seidel updates, possibly warm-started from the lower bounds
+        if(not initial_values.empty()) {
+            for(auto state: maybe_states) {
+                if(initial_values[state] != storm::utility::infinity<ValueType>()) {
+                    this->solution_state_values[state] = initial_values[state];
+                }
+            }
+        }
+        auto const& solver_env = env.solver().minMax();
+        ValueType precision = storm::utility::convertNumber<ValueType>(solver_env.getPrecision());
+        bool relative = solver_env.getRelativeTerminationCriterion();
+        uint64_t max_iterations = solver_env.getMaximalNumberOfIterations();
+        auto& values = this->solution_state_values;
+        bool converged = false;
+        this->solution_num_iterations = 0;
+        // values are lower bounds: once the value of the initial state exceeds the threshold, so does the actual value
+        auto exceeds_threshold = [&]() {
+            ValueType initial_value = values[this->initial_state];
+            return termination_strict ? initial_value > termination_threshold : initial_value >= termination_threshold;
+        };
+        this->solution_terminated_early = exceeds_threshold();
+        while(not converged and not this->solution_terminated_early and this->solution_num_iterations < max_iterations) {
+            converged = true;
+            for(auto state: maybe_states) {
+                bool value_set = false;
+                ValueType best_value = storm::utility::zero<ValueType>();
+                auto update_best_value = [&](uint64_t choice) {
+                    ValueType value = this->choiceValue(choice,values,choice_rewards);
+                    if(not value_set or (maximizing ? value > best_value : value < best_value)) {
+                        best_value = value;
+                        value_set = true;
+                    }
+                };
+                if(in_component(state)) {
+                    // the component is updated as a whole when its first state is encountered
+                    auto const& states = component_states[state_to_component[state]];
+                    if(states.front() != state) {
+                        continue;
+                    }
+                    for(auto choice: component_exits[state_to_component[state]]) {
+                        update_best_value(choice);
+                    }
+                } else {
+                    for(auto choice = reachable_choices.getNextSetIndex(row_groups[state]); choice < row_groups[state+1]; choice = reachable_choices.getNextSetIndex(choice+1)) {
+                        update_best_value(choice);
+                    }
+                }
+                ValueType difference = std::abs(best_value - values[state]);
+                if(relative and not storm::utility::isZero(best_value)) {
+                    difference /= std::abs(best_value);
+                }
+                if(difference > precision) {
+                    converged = false;
+                }
+                if(in_component(state)) {
+                    for(auto component_state: component_states[state_to_component[state]]) {
+                        values[component_state] = best_value;
+                    }
+                } else {
+                    values[state] = best_value;
+                }
+            }
+            this->solution_num_iterations++;
+            this->solution_terminated_early = exceeds_threshold();
+        }
+        this->solution_value = values[this->initial_state];
+
+        // scheduler extraction: among optimal choices, prefer those that make progress towards the target to avoid
+        // selecting choices that only stay in end components
+        this->solution_state_to_choice.assign(num_states,num_choices);
+        auto is_optimal = [&](uint64_t choice) {
+            ValueType state_value = values[this->choice_to_state[choice]];
+            ValueType difference = std::abs(this->choiceValue(choice,values,choice_rewards) - state_value);
+            if(relative and not storm::utility::isZero(state_value)) {
+                difference /= std::abs(state_value);
+            }
+            return difference <= precision;
+        };
+        storm::storage::BitVector state_resolved = reachable_states & ~maybe_states;
+        std::vector<uint64_t> state_stack;
+        for(auto state: target_states & reachable_states) {
+            state_stack.push_back(state);
+        }
+        while(not state_stack.empty()) {
+            auto state = state_stack.back();
+            state_stack.pop_back();
+            for(auto choice: this->state_to_predecessor_choices[state]) {
+                auto src = this->choice_to_state[choice];
+                if(not reachable_choices[choice] or state_resolved[src] or not is_optimal(choice)) {
+                    continue;
+                }
+                this->solution_state_to_choice[src] = choice;
+                state_resolved.set(src,true);
+                state_stack.push_back(src);
+            }
+        }
+        for(auto state: reachable_states) {
+            if(this->solution_state_to_choice[state] != num_choices) {
+                continue;
+            }
+            // states that do not reach the target or states that have their value fixed: pick any (optimal) choice
+            uint64_t selected_choice = reachable_choices.getNextSetIndex(row_groups[state]);
+            if(selected_choice >= row_groups[state+1]) {
+                continue;
+            }
+            if(maybe_states[state]) {
+                for(auto choice = selected_choice; choice < row_groups[state+1]; choice = reachable_choices.getNextSetIndex(choice+1)) {
+                    if(is_optimal(choice)) {
+                        selected_choice = choice;
+                        break;
+                    }
+                }
+            }
+            this->solution_state_to_choice[state] = selected_choice;
+        }
+        this->solution_reachable_states = std::move(reachable_states);
+    }
+
+    template class MdpModelChecker<double>;
 }
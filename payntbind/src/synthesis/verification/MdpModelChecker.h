@@ -3,7 +3,9 @@
 #include "storm/environment/Environment.h"
 #include "storm/models/sparse/Mdp.h"
 #include "storm/modelchecker/CheckTask.h"
+#include "storm/logic/ComparisonType.h"
 #include "storm/modelchecker/results/CheckResult.h"
+#include "storm/storage/BitVector.h"
 
 namespace synthesis {
 
@@ -15,4 +17,141 @@ namespace synthesis {
         bool produce_schedulers
     );
 
+    /**
+     * Model check the model using the given values as the starting point of the numerical solver.
+     * @param result_hint For each state, its initial value. To keep the result sound, the values must be lower bounds
+     *  on the actual state values (e.g. values of a super-model in the minimizing direction).
+     */
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> verifyWithHint(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Model<ValueType>> const& model,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<ValueType> const& result_hint
+    );
+
+    /**
+     * Compute the values of the (unbounded) operator formula with respect to a bound on the value in the initial
+     * state: the numerical solver terminates as soon as it can soundly establish that the bound holds. The returned
+     * values are thus only guaranteed to satisfy the bound, not to approximate the actual values. Whether the solver
+     * can establish the bound depends on the solution method: value iteration approximates the values from below and
+     * can therefore establish lower bounds (comparison > or >=) only, whereas sound methods (e.g. interval iteration)
+     * can establish both lower and upper bounds.
+     * @param result_hint If non-empty, for each state, a lower bound on its value (see verifyWithHint).
+     */
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> verifyWithBound(
+        storm::Environment const& env,
+        std::shared_ptr<storm::models::sparse::Model<ValueType>> const& model,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<ValueType> const& result_hint,
+        storm::logic::ComparisonType comparison_type,
+        ValueType threshold
+    );
+
+    /**
+     * Model checker for sub-MDPs of the quotient. A sub-MDP is given by a mask of quotient choices and is analysed
+     * directly on the quotient, i.e. no sub-model is constructed. Supported are reachability probability and
+     * expected reachability reward operators, i.e. formulae of the form P{min,max}=? [F phi] and
+     * R{min,max}=? [F phi]. All results are indexed by states and choices of the quotient.
+     */
+    template<typename ValueType>
+    class MdpModelChecker {
+    public:
+
+        /**
+         * Create masked model checker.
+         * @param quotient The quotient MDP. The model checker keeps a reference to it.
+         */
+        MdpModelChecker(storm::models::sparse::Mdp<ValueType> const& quotient);
+
+        /**
+         * Identify states and choices of the sub-MDP reachable from the initial state of the quotient.
+         * @param choice_mask Choices of the quotient that remained in the sub-MDP.
+         * @return a pair (reachable states, selected choices of the reachable states)
+         */
+        std::pair<storm::storage::BitVector,storm::storage::BitVector> exploreReachable(
+            storm::storage::BitVector const& choice_mask
+        ) const;
+
+        /**
+         * Model check the sub-MDP against the formula using value iteration. Precision, termination criterion and
+         * the maximum number of iterations are taken from the min-max solver environment.
+         * @param choice_mask Choices of the quotient that remained in the sub-MDP.
+         * @param initial_values If non-empty, for each state of the quotient, a lower bound on its value used to
+         *  warm-start value iteration.
+         * @param termination_threshold Value iteration approximates the values from below: it terminates as soon as
+         *  the value in the initial state exceeds this threshold, i.e. when the value is known to be above it.
+         * @param termination_strict If false, value iteration terminates already when the value in the initial state
+         *  reaches the threshold.
+         */
+        void check(
+            storm::Environment const& env,
+            storm::logic::Formula const& formula,
+            storm::storage::BitVector const& choice_mask,
+            std::vector<ValueType> const& initial_values,
+            ValueType termination_threshold,
+            bool termination_strict
+        );
+
+        /** State values for the solution, unreachable states have value 0. */
+        std::vector<ValueType> solution_state_values;
+        /** Solution value in the initial state. */
+        ValueType solution_value;
+        /**
+         * For each state, a quotient choice selected by the optimal scheduler. State s contains quotient_num_choices
+         * if the state is not reachable in the sub-MDP.
+         */
+        std::vector<uint64_t> solution_state_to_choice;
+        /** States of the quotient reachable in the sub-MDP. */
+        storm::storage::BitVector solution_reachable_states;
+        /** Number of value iteration sweeps performed. */
+        uint64_t solution_num_iterations;
+        /** Whether value iteration terminated because the termination threshold was exceeded. */
+        bool solution_terminated_early;
+
+    private:
+
+        storm::models::sparse::Mdp<ValueType> const& quotient;
+        uint64_t initial_state;
+        /** For each choice of the quotient, its source state. */
+        std::vector<uint64_t> choice_to_state;
+        /** For each state of the quotient, a list of choices having this state as a destination. */
+        std::vector<std::vector<uint64_t>> state_to_predecessor_choices;
+        /** Backward transitions of the quotient, used for end component decomposition. */
+        storm::storage::SparseMatrix<ValueType> backward_transitions;
+
+        /** States of the sub-MDP that can reach the target states (existentially). */
+        storm::storage::BitVector computeCanReach(
+            storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& reachable_states,
+            storm::storage::BitVector const& target_states, storm::storage::BitVector const& avoid_states
+        ) const;
+        /** States of the sub-MDP reaching the target states with positive probability under all schedulers. */
+        storm::storage::BitVector computeMustReach(
+            storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& reachable_states,
+            storm::storage::BitVector const& target_states
+        ) const;
+        /** States of the sub-MDP reaching the target states almost surely under some scheduler. */
+        storm::storage::BitVector computeProb1E(
+            storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& reachable_states,
+            storm::storage::BitVector const& target_states
+        ) const;
+
+        /**
+         * Decompose the maybe states into maximal end components formed by zero-reward choices. Within such a
+         * component, any state can be reached from any other at no cost, so all states of a component share the
+         * minimum expected reward, attained by the best choice leaving the component.
+         * @return (1) for each state, the index of its component or the number of components if the state is not
+         *  contained in any, (2) for each component, its states, (3) for each component, choices leaving it
+         */
+        std::tuple<std::vector<uint64_t>,std::vector<std::vector<uint64_t>>,std::vector<std::vector<uint64_t>>> computeZeroRewardComponents(
+            storm::storage::BitVector const& choice_mask, storm::storage::BitVector const& maybe_states,
+            std::vector<ValueType> const& choice_rewards
+        ) const;
+
+        ValueType choiceValue(uint64_t choice, std::vector<ValueType> const& state_values, std::vector<ValueType> const& choice_rewards) const;
+    };
+
 }
@@ -0,0 +1,167 @@
+#include "QualitativeAnalysis.h"
+
+#include "storm/modelchecker/prctl/SparseMdpPrctlModelChecker.h"
+#include "storm/modelchecker/results/ExplicitQualitativeCheckResult.h"
+#include "storm/modelchecker/hints/ExplicitModelCheckerHint.h"
+#include "storm/solver/OptimizationDirection.h"
+#include "storm/utility/graph.h"
+#include "storm/utility/constants.h"
+#include "storm/utility/macros.h"
+#include "storm/exceptions/NotSupportedException.h"
+#include "storm/api/verification.h"
+#include "storm/logic/FragmentSpecification.h"
+
+namespace synthesis {
+
+    template<typename ValueType>
+    QualitativeAnalysis<ValueType>::QualitativeAnalysis(std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp)
+        : mdp(mdp) {
+        this->backward_transitions = mdp->getBackwardTransitions();
+    }
+
+    template<typename ValueType>
+    QualitativeAnalysis<ValueType>::QualitativeAnalysis(
+        std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp,
+        std::shared_ptr<QualitativeAnalysis<ValueType>> const& quotient_analysis,
+        std::vector<uint64_t> const& state_to_quotient_state
+    ) : QualitativeAnalysis(mdp) {
+        this->quotient_analysis = quotient_analysis;
+        this->state_to_quotient_state = state_to_quotient_state;
+    }
+
+    template<typename ValueType>
+    std::pair<storm::storage::BitVector,storm::storage::BitVector> const& QualitativeAnalysis<ValueType>::schedulerIndependentStates(
+        storm::Environment const& env, storm::logic::Formula const& target
+    ) {
+        auto key = target.toString();
+        auto it = this->target_to_independent_states.find(key);
+        if(it != this->target_to_independent_states.end()) {
+            return it->second;
+        }
+        auto const& target_states = this->targetStates(env, target);
+        auto const& matrix = this->mdp->getTransitionMatrix();
+        storm::storage::BitVector all_states(this->mdp->getNumberOfStates(),true);
+        auto never = storm::utility::graph::performProb0A(this->backward_transitions, all_states, target_states);
+        auto always = storm::utility::graph::performProb1A(
+            matrix, matrix.getRowGroupIndices(), this->backward_transitions, all_states, target_states
+        );
+        return this->target_to_independent_states.emplace(key, std::make_pair(std::move(never), std::move(always))).first->second;
+    }
+
+    template<typename ValueType>
+    bool QualitativeAnalysis<ValueType>::supports(storm::logic::Formula const& formula) {
+        if(not (formula.isProbabilityOperatorFormula() or formula.isRewardOperatorFormula())) {
+            return false;
+        }
+        auto const& operator_formula = formula.asOperatorFormula();
+        return operator_formula.hasOptimalityType() and operator_formula.getSubformula().isEventuallyFormula() and
+            operator_formula.getSubformula().asEventuallyFormula().getSubformula().isInFragment(storm::logic::propositional());
+    }
+
+    template<typename ValueType>
+    storm::storage::BitVector const& QualitativeAnalysis<ValueType>::targetStates(
+        storm::Environment const& env, storm::logic::Formula const& target
+    ) {
+        auto key = target.toString();
+        auto it = this->target_to_states.find(key);
+        if(it != this->target_to_states.end()) {
+            return it->second;
+        }
+        storm::modelchecker::SparseMdpPrctlModelChecker<storm::models::sparse::Mdp<ValueType>> propositional_checker(*this->mdp);
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> target_task(target);
+        auto target_states = propositional_checker.check(env, target_task)->asExplicitQualitativeCheckResult().getTruthValuesVector();
+        return this->target_to_states.emplace(key, std::move(target_states)).first->second;
+    }
+
+    template<typename ValueType>
+    std::pair<storm::storage::BitVector,std::vector<ValueType>> const& QualitativeAnalysis<ValueType>::qualitativeAnalysis(
+        storm::Environment const& env, storm::logic::Formula const& formula
+    ) {
+        auto const& target = formula.asOperatorFormula().getSubformula().asEventuallyFormula().getSubformula();
+        bool reward = formula.isRewardOperatorFormula();
+        bool maximizing = storm::solver::maximize(formula.asOperatorFormula().getOptimalityType());
+        auto key = std::make_tuple(target.toString(), reward, maximizing);
+        auto it = this->analysis.find(key);
+        if(it != this->analysis.end()) {
+            this->num_reused++;
+            return it->second;
+        }
+        this->num_computed++;
+
+        auto const& target_states = this->targetStates(env, target);
+        auto const& matrix = this->mdp->getTransitionMatrix();
+        auto const& row_groups = matrix.getRowGroupIndices();
+        uint64_t num_states = this->mdp->getNumberOfStates();
+        std::vector<ValueType> values(num_states,storm::utility::zero<ValueType>());
+        storm::storage::BitVector maybe_states;
+
+        // graph analysis is restricted to states whose qualitative value is not known from the quotient: states
+        // that never reach the target are excluded, states that always reach the target are treated as targets
+        storm::storage::BitVector phi_states(num_states,true);
+        storm::storage::BitVector psi_states(target_states);
+        if(this->quotient_analysis) {
+            auto const& [never,always] = this->quotient_analysis->schedulerIndependentStates(env, target);
+            for(uint64_t state = 0; state < num_states; ++state) {
+                uint64_t quotient_state = this->state_to_quotient_state[state];
+                if(never[quotient_state]) {
+                    phi_states.set(state,false);
+                } else if(always[quotient_state]) {
+                    psi_states.set(state,true);
+                }
+            }
+        }
+
+        if(not reward) {
+            auto prob01 = maximizing ?
+                storm::utility::graph::performProb01Max(matrix, row_groups, this->backward_transitions, phi_states, psi_states) :
+                storm::utility::graph::performProb01Min(matrix, row_groups, this->backward_transitions, phi_states, psi_states);
+            for(auto state: prob01.second) {
+                values[state] = storm::utility::one<ValueType>();
+            }
+            maybe_states = ~(prob01.first | prob01.second);
+        } else {
+            // reward is infinite if the target is not reached almost surely (by all or by some scheduler)
+            auto finite_states = maximizing ?
+                storm::utility::graph::performProb1A(matrix, row_groups, this->backward_transitions, phi_states, psi_states) :
+                storm::utility::graph::performProb1E(matrix, row_groups, this->backward_transitions, phi_states, psi_states);
+            for(auto state: ~finite_states) {
+                values[state] = storm::utility::infinity<ValueType>();
+            }
+            maybe_states = finite_states & ~target_states;
+        }
+        return this->analysis.emplace(key, std::make_pair(std::move(maybe_states), std::move(values))).first->second;
+    }
+
+    template<typename ValueType>
+    std::shared_ptr<storm::modelchecker::CheckResult> QualitativeAnalysis<ValueType>::check(
+        storm::Environment const& env,
+        storm::logic::Formula const& formula,
+        bool produce_schedulers,
+        std::vector<ValueType> const& result_hint
+    ) {
+        STORM_LOG_THROW(QualitativeAnalysis<ValueType>::supports(formula),
+            storm::exceptions::NotSupportedException, "fused model checking supports only P=? [F phi] and R=? [F phi]"
+        );
+        auto const& [maybe_states,values] = this->qualitativeAnalysis(env, formula);
+
+        // values of maybe states are used as a starting point of the solver and must be lower bounds
+        std::vector<ValueType> hint_values(values);
+        if(not result_hint.empty()) {
+            for(auto state: maybe_states) {
+                if(result_hint[state] != storm::utility::infinity<ValueType>()) {
+                    hint_values[state] = result_hint[state];
+                }
+            }
+        }
+        storm::modelchecker::CheckTask<storm::logic::Formula, ValueType> task(formula);
+        task.setProduceSchedulers(produce_schedulers);
+        storm::modelchecker::ExplicitModelCheckerHint<ValueType> hint;
+        hint.setComputeOnlyMaybeStates(true);
+        hint.setMaybeStates(maybe_states);
+        hint.setResultHint(std::move(hint_values));
+        task.setHint(std::make_shared<storm::modelchecker::ExplicitModelCheckerHint<ValueType>>(hint));
+        return storm::api::verifyWithSparseEngine<ValueType>(env, this->mdp, task);
+    }
+
+    template class QualitativeAnalysis<double>;
+}
@@ -0,0 +1,89 @@
+#pragma once
+
+#include "storm/environment/Environment.h"
+#include "storm/models/sparse/Mdp.h"
+#include "storm/modelchecker/results/CheckResult.h"
+#include "storm/storage/BitVector.h"
+#include "storm/storage/SparseMatrix.h"
+
+#include <map>
+#include <string>
+#include <tuple>
+
+namespace synthesis {
+
+    /**
+     * Model checker of an MDP that shares qualitative analysis between all properties and both optimization
+     * directions. Backward transitions are computed once, target states and states with probability 0/1 (or
+     * with infinite reward) are computed once per target and direction. Model checking of a formula then only
+     * approximates values of the remaining (maybe) states. Supported are reachability probability and expected
+     * reachability reward operators, i.e. formulae of the form P{min,max}=? [F phi] and R{min,max}=? [F phi].
+     * If the MDP is a sub-MDP of a quotient, the qualitative analysis of the quotient is used to skip states
+     * whose qualitative value is the same in all sub-MDPs.
+     */
+    template<typename ValueType>
+    class QualitativeAnalysis {
+    public:
+
+        QualitativeAnalysis(std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp);
+
+        /**
+         * @param quotient_analysis Qualitative analysis of the quotient this MDP is a sub-MDP of.
+         * @param state_to_quotient_state For each state of this MDP, the corresponding state of the quotient.
+         */
+        QualitativeAnalysis(
+            std::shared_ptr<storm::models::sparse::Mdp<ValueType>> const& mdp,
+            std::shared_ptr<QualitativeAnalysis<ValueType>> const& quotient_analysis,
+            std::vector<uint64_t> const& state_to_quotient_state
+        );
+
+        /**
+         * For the given target, compute (1) states that reach the target with probability 0 under all schedulers,
+         * (2) states that reach the target with probability 1 under all schedulers. Since any sub-MDP of this MDP
+         * only restricts schedulers, the same holds in the sub-MDP.
+         */
+        std::pair<storm::storage::BitVector,storm::storage::BitVector> const& schedulerIndependentStates(
+            storm::Environment const& env, storm::logic::Formula const& target
+        );
+
+        /**
+         * Model check the formula using the precomputed qualitative analysis.
+         * @param result_hint If non-empty, for each state, a lower bound on its value (see verifyWithHint).
+         */
+        std::shared_ptr<storm::modelchecker::CheckResult> check(
+            storm::Environment const& env,
+            storm::logic::Formula const& formula,
+            bool produce_schedulers,
+            std::vector<ValueType> const& result_hint
+        );
+
+        /** Check whether the formula can be model checked using the shared qualitative analysis. */
+        static bool supports(storm::logic::Formula const& formula);
+
+        /** Number of qualitative analyses computed and reused. */
+        uint64_t num_computed = 0;
+        uint64_t num_reused = 0;
+
+    private:
+
+        std::shared_ptr<storm::models::sparse::Mdp<ValueType>> mdp;
+        storm::storage::SparseMatrix<ValueType> backward_transitions;
+        std::shared_ptr<QualitativeAnalysis<ValueType>> quotient_analysis;
+        std::vector<uint64_t> state_to_quotient_state;
+        /** For each target, states reaching it with probability 0 and 1 under all schedulers. */
+        std::map<std::string,std::pair<storm::storage::BitVector,storm::storage::BitVector>> target_to_independent_states;
+        /** For each target (given by the string representation of the target formula), target states. */
+        std::map<std::string,storm::storage::BitVector> target_to_states;
+        /**
+         * For each (target, reward, maximizing), maybe states and values of the remaining states: 0/1 for
+         * probabilities, 0/infinity for rewards.
+         */
+        std::map<std::tuple<std::string,bool,bool>,std::pair<storm::storage::BitVector,std::vector<ValueType>>> analysis;
+
+        storm::storage::BitVector const& targetStates(storm::Environment const& env, storm::logic::Formula const& target);
+        std::pair<storm::storage::BitVector,std::vector<ValueType>> const& qualitativeAnalysis(
+            storm::Environment const& env, storm::logic::Formula const& formula
+        );
+    };
+
+}
@@ -0,0 +1,40 @@
+#include "../synthesis.h"
+
+#include "MdpModelChecker.h"
+#include "QualitativeAnalysis.h"
+
+#include <limits>
+
+void bindings_verification(py::module& m) {
+
+    m.def("verify_with_hint", &synthesis::verifyWithHint<double>,
+        py::arg("env"), py::arg("model"), py::arg("formula"), py::arg("produce_schedulers"), py::arg("result_hint"));
+    m.def("verify_with_bound", &synthesis::verifyWithBound<double>,
+        py::arg("env"), py::arg("model"), py::arg("formula"), py::arg("produce_schedulers"), py::arg("result_hint"),
+        py::arg("comparison_type"), py::arg("threshold"));
+
+    py::class_<synthesis::MdpModelChecker<double>>(m, "MdpModelChecker")
+        .def(py::init<storm::models::sparse::Mdp<double> const&>(), py::arg("quotient"), py::keep_alive<1,2>())
+        .def("explore_reachable", &synthesis::MdpModelChecker<double>::exploreReachable, py::arg("choice_mask"))
+        .def("check", &synthesis::MdpModelChecker<double>::check,
+            py::arg("env"), py::arg("formula"), py::arg("choice_mask"), py::arg("initial_values") = std::vector<double>(),
+            py::arg("termination_threshold") = std::numeric_limits<double>::infinity(), py::arg("termination_strict") = true)
+        .def_property_readonly("solution_state_values", [](synthesis::MdpModelChecker<double>& checker) {return checker.solution_state_values;})
+        .def_property_readonly("solution_value", [](synthesis::MdpModelChecker<double>& checker) {return checker.solution_value;})
+        .def_property_readonly("solution_state_to_choice", [](synthesis::MdpModelChecker<double>& checker) {return checker.solution_state_to_choice;})
+        .def_property_readonly("solution_reachable_states", [](synthesis::MdpModelChecker<double>& checker) {return checker.solution_reachable_states;})
+        .def_property_readonly("solution_num_iterations", [](synthesis::MdpModelChecker<double>& checker) {return checker.solution_num_iterations;})
+        .def_property_readonly("solution_terminated_early", [](synthesis::MdpModelChecker<double>& checker) {return checker.solution_terminated_early;})
+        ;
+
+    py::class_<synthesis::QualitativeAnalysis<double>, std::shared_ptr<synthesis::QualitativeAnalysis<double>>>(m, "QualitativeAnalysis")
+        .def(py::init<std::shared_ptr<storm::models::sparse::Mdp<double>> const&>(), py::arg("mdp"))
+        .def(py::init<std::shared_ptr<storm::models::sparse::Mdp<double>> const&, std::shared_ptr<synthesis::QualitativeAnalysis<double>> const&, std::vector<uint64_t> const&>(),
+            py::arg("mdp"), py::arg("quotient_analysis"), py::arg("state_to_quotient_state"))
+        .def_static("supports", &synthesis::QualitativeAnalysis<double>::supports, py::arg("formula"))
+        .def("check", &synthesis::QualitativeAnalysis<double>::check,
+            py::arg("env"), py::arg("formula"), py::arg("produce_schedulers"), py::arg("result_hint") = std::vector<double>())
+        .def_readonly("num_computed", &synthesis::QualitativeAnalysis<double>::num_computed)
+        .def_readonly("num_reused", &synthesis::QualitativeAnalysis<double>::num_reused)
+        ;
+}
@@ -0,0 +1,139 @@
+import math
+
+import pytest
+
+import payntbind
+import stormpy
+
+from test_utils import PayntTestUtils
+
+# states 0, 1 and 2 form a transient SCC, state 3 is absorbing; actions a and b of state 0 keep the SCC non-trivial,
+# while absorbing state 4 is reachable only via action c
+PRISM_MDP = """
+mdp
+
+module m
+    s : [0..4] init 0;
+
+    [a] s=0 -> 0.5:(s'=1) + 0.5:(s'=2);
+    [b] s=0 -> 0.9:(s'=1) + 0.1:(s'=3);
+    [c] s=0 -> 1:(s'=4);
+    [] s=1 -> 0.3:(s'=0) + 0.6:(s'=2) + 0.1:(s'=3);
+    [] s=2 -> 0.5:(s'=1) + 0.5:(s'=3);
+    [] s=3 -> true;
+    [] s=4 -> true;
+endmodule
+"""
+
+PRECISION = 1e-10
+
+
+def build_mdp(tmp_path):
+    return PayntTestUtils.build_prism_model(tmp_path, PRISM_MDP)
+
+def select_choices(mdp, initial_choice):
+    ''' :return a bit vector selecting the given choice in the initial state and the first choice elsewhere '''
+    choices = stormpy.BitVector(mdp.nr_choices, False)
+    initial_state = mdp.initial_states[0]
+    for state in range(mdp.nr_states):
+        first_choice = mdp.transition_matrix.get_row_group_start(state)
+        choices.set(first_choice + (initial_choice if state == initial_state else 0), True)
+    return choices
+
+def expected_visits(mdp, choices, minimizing, max_iterations=100000):
+    state_values = [0] * mdp.nr_states
+    _,visits,sampled = payntbind.synthesis.choiceValuesAndExpectedVisits(
+        mdp, state_values, "", choices, True, minimizing, PRECISION, max_iterations
+    )
+    assert not sampled
+    return list(visits)
+
+def storm_expected_visits(mdp, choices, minimizing):
+    dtmc,state_map,_ = payntbind.synthesis.constructInducedDtmc(mdp, choices)
+    env = stormpy.Environment()
+    payntbind.synthesis.set_precision_native(env.solver_environment.native_solver_environment, PRECISION)
+    dtmc_visits = list(stormpy.compute_expected_number_of_visits(env, dtmc).get_values())
+    # infinite visits are handled as in the exact computation
+    finite_sum = sum(value for value in dtmc_visits if value != math.inf)
+    default_value = finite_sum / len(dtmc_visits) if minimizing else 0
+    visits = [0] * mdp.nr_states
+    for state,value in enumerate(dtmc_visits):
+        visits[state_map[state]] = value if value != math.inf else default_value
+    return visits
+
+
+@pytest.mark.parametrize("initial_choice", [0, 1])
+@pytest.mark.parametrize("minimizing", [False, True])
+def test_expected_visits_match_storm(tmp_path, initial_choice, minimizing):
+    mdp = build_mdp(tmp_path)
+    choices = select_choices(mdp, initial_choice)
+    visits = expected_visits(mdp, choices, minimizing)
+    assert visits == pytest.approx(storm_expected_visits(mdp, choices, minimizing), rel=1e-6)
+
+
+@pytest.mark.parametrize("initial_choice", [0, 1])
+@pytest.mark.parametrize("minimizing", [False, True])
+def test_expected_visits_on_quotient_and_sub_mdp_coincide(tmp_path, initial_choice, minimizing):
+    # masked model checking computes expected visits over the whole quotient, explicit model checking over the
+    # sub-MDP of the family; states unreachable under the selected choices must not affect the result
+    quotient = build_mdp(tmp_path)
+    choices = select_choices(quotient, initial_choice)
+    quotient_visits = expected_visits(quotient, choices, minimizing)
+
+    # the family excludes the last action of the initial state
+    family_choices = stormpy.BitVector(quotient.nr_choices, True)
+    family_choices.set(quotient.transition_matrix.get_row_group_end(quotient.initial_states[0])-1, False)
+    options = stormpy.SubsystemBuilderOptions()
+    options.build_state_mapping = True
+    options.build_action_mapping = True
+    submodel = stormpy.construct_submodel(
+        quotient, stormpy.BitVector(quotient.nr_states, True), family_choices, False, options
+    )
+    sub_mdp = submodel.model
+    state_map = submodel.new_to_old_state_mapping
+    choice_map = submodel.new_to_old_action_mapping
+    sub_choices = stormpy.BitVector(sub_mdp.nr_choices, False)
+    for choice in range(sub_mdp.nr_choices):
+        if choices.get(choice_map[choice]):
+            sub_choices.set(choice, True)
+    sub_visits = expected_visits(sub_mdp, sub_choices, minimizing)
+
+    visits = [0] * quotient.nr_states
+    for state,value in enumerate(sub_visits):
+        visits[state_map[state]] = value
+    assert visits == pytest.approx(quotient_visits, rel=1e-9)
+
+
+def sampled_expected_visits(mdp, choices, minimizing, max_relative_error):
+    state_values = [0] * mdp.nr_states
+    _,visits,sampled = payntbind.synthesis.choiceValuesAndExpectedVisits(
+        mdp, state_values, "", choices, True, minimizing, PRECISION, 100000,
+        num_samples=20000, max_path_length=10000, max_relative_error=max_relative_error, seed=0
+    )
+    return list(visits),sampled
+
+
+def test_sampled_expected_visits_are_close_to_storm(tmp_path):
+    mdp = build_mdp(tmp_path)
+    choices = select_choices(mdp, 0)
+    visits,sampled = sampled_expected_visits(mdp, choices, False, max_relative_error=0.1)
+    assert sampled is True
+    assert visits == pytest.approx(storm_expected_visits(mdp, choices, False), rel=0.05, abs=1e-3)
+
+
+def test_unreliable_sampled_expected_visits_fall_back_to_exact_computation(tmp_path):
+    mdp = build_mdp(tmp_path)
+    choices = select_choices(mdp, 0)
+    visits,sampled = sampled_expected_visits(mdp, choices, False, max_relative_error=1e-9)
+    assert sampled is False
+    assert visits == pytest.approx(expected_visits(mdp, choices, False), rel=1e-9)
+
+
+def test_expected_visits_stop_at_iteration_limit(tmp_path):
+    mdp = build_mdp(tmp_path)
+    choices = select_choices(mdp, 0)
+    # a single sweep over the SCC underestimates the visits but terminates
+    visits = expected_visits(mdp, choices, False, max_iterations=1)
+    exact = expected_visits(mdp, choices, False)
+    initial_state = mdp.initial_states[0]
+    assert 0 < visits[initial_state] < exact[initial_state]
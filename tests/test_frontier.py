@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+import paynt.family.family
+import paynt.synthesizer.frontier
+from test_utils import PayntTestUtils
+
+
+def random_subfamily(design_space, generator):
+    subfamily = design_space.copy()
+    for hole in range(subfamily.num_holes):
+        options = design_space.hole_options(hole)
+        subfamily.hole_set_options(hole, sorted(generator.sample(options, generator.randint(1,len(options)))))
+    return subfamily
+
+def hole_options(family):
+    return [family.hole_options(hole) for hole in range(family.num_holes)]
+
+
+@pytest.mark.parametrize("order", ["dfs", "bfs", "size", "depth"])
+def test_compact_frontier_spills_and_restores_families(order, monkeypatch):
+    # small chunks such that spilled families span multiple chunks of the spill file
+    monkeypatch.setattr(paynt.synthesizer.frontier.PackedFamilyStore, "chunk_rows", 4)
+    generator = random.Random(42)
+    design_space = PayntTestUtils.create_design_space(num_holes=70, num_options=5)
+    families = [random_subfamily(design_space, generator) for _ in range(60)]
+
+    expected = paynt.synthesizer.frontier.create_frontier(order, None)
+    # room for three packed families in memory
+    memory_budget = 2 * 3 * design_space.packed_num_words * 8
+    compact = paynt.synthesizer.frontier.CompactFrontier(
+        paynt.synthesizer.frontier.create_frontier(order, None), memory_budget
+    )
+
+    def pop_and_compare(num_pops):
+        for _ in range(num_pops):
+            assert hole_options(compact.pop()) == hole_options(expected.pop())
+
+    for family in families[:40]:
+        expected.push(family)
+        compact.push(family)
+    assert compact.store.spill_chunks
+    pop_and_compare(15)
+    for family in families[40:]:
+        expected.push(family)
+        compact.push(family)
+    assert len(compact) == len(expected)
+    pop_and_compare(len(expected))
+    assert not compact
+
+
+def test_compact_frontier_strips_parent_info_beyond_budget():
+    design_space = PayntTestUtils.create_design_space(num_holes=10, num_options=3)
+    parent_infos = []
+    compact = paynt.synthesizer.frontier.CompactFrontier(paynt.synthesizer.frontier.StackFrontier(), 2048)
+    for _ in range(4):
+        parent_info = paynt.family.family.ParentInfo()
+        parent_info.refinement_depth = 0
+        # 800 bytes
+        parent_info.selected_choices = [True] * 6400
+        parent_infos.append(parent_info)
+        compact.push(paynt.family.family.DesignSpace(design_space, parent_info))
+    assert compact.nbytes <= 2048
+    # parent info of the oldest families is stripped first
+    assert parent_infos[0].selected_choices is None
+    assert parent_infos[-1].selected_choices is not None
+    family = compact.pop()
+    assert family.parent_info is parent_infos[-1]
+    assert hole_options(family) == hole_options(design_space)
@@ -0,0 +1,95 @@
+import stormpy
+
+import paynt.family.family
+import paynt.quotient.models
+import paynt.verification.property
+import paynt.verification.property_result
+from test_utils import PayntTestUtils
+
+
+def create_optimality_property():
+    prop = stormpy.parse_properties_without_context('Pmax=? [F "goal"]')[0]
+    return paynt.verification.property.OptimalityProperty(prop)
+
+def create_parent_info(prop, selection, value):
+    parent_info = paynt.family.family.ParentInfo()
+    parent_info.refinement_depth = 0
+    parent_info.primary_results = {prop: (selection, value)}
+    return parent_info
+
+
+def test_subfamily_containing_parent_scheduler_inherits_primary_value():
+    prop = create_optimality_property()
+    design_space = PayntTestUtils.create_design_space(num_holes=3, num_options=2)
+    parent_info = create_parent_info(prop, [(0,1),(1,0)], 0.5)
+
+    containing = paynt.family.family.DesignSpace(design_space, parent_info)
+    containing.hole_set_options(2, [0])
+    assert containing.inherited_primary_value(prop) == 0.5
+
+    excluding = paynt.family.family.DesignSpace(design_space, parent_info)
+    excluding.hole_set_options(0, [0])
+    assert excluding.inherited_primary_value(prop) is None
+
+
+def test_inherited_primary_value_prunes_family_without_model_checking():
+    prop = create_optimality_property()
+    design_space = PayntTestUtils.create_design_space(num_holes=3, num_options=2)
+    parent_info = create_parent_info(prop, [(0,1),(1,0)], 0.5)
+    family = paynt.family.family.DesignSpace(design_space, parent_info)
+    family.hole_set_options(2, [1])
+    # the optimum improved after the parent family was analyzed
+    prop.update_optimum(0.7)
+
+    # no model is needed: the family must be decided using the inherited value only
+    mdp = paynt.quotient.models.MDP.__new__(paynt.quotient.models.MDP)
+    mdp.design_space = family
+    result = mdp.check_optimality(prop)
+    assert result.can_improve == False
+    assert result.primary.value == 0.5
+    assert result.primary.result is None
+
+
+def analyzed_family(prop, design_space, value, coarse):
+    ''' :return a family whose optimality result has the given primary value and a primary scheduler selecting (0,1) '''
+    family = paynt.family.family.DesignSpace(design_space)
+    primary = paynt.verification.property_result.PropertyResult(prop, None, value)
+    primary.coarse = coarse
+    optimality_result = paynt.verification.property_result.MdpOptimalityResult(prop)
+    optimality_result.primary = primary
+    optimality_result.primary_selection = [[1]] + [[] for _ in range(family.num_holes-1)]
+    family.analysis_result = paynt.verification.property_result.SpecificationResult(None, optimality_result)
+    return family
+
+
+def test_coarse_primary_value_is_not_inherited():
+    prop = create_optimality_property()
+    specification = paynt.verification.property.Specification([prop])
+    design_space = PayntTestUtils.create_design_space(num_holes=3, num_options=2)
+
+    fine = analyzed_family(prop, design_space, 0.5, coarse=False)
+    assert fine.collect_primary_results(specification) == {prop: ([(0,1)], 0.5)}
+
+    # a coarse value far from the optimum at the time of the analysis
+    parent = analyzed_family(prop, design_space, 0.5, coarse=True)
+    parent_info = create_parent_info(prop, [], 0)
+    parent_info.primary_results = parent.collect_primary_results(specification)
+    assert parent_info.primary_results == {}
+
+    # the optimum has moved close to the coarse value, which therefore cannot be used to prune the child
+    prop.update_optimum(0.505)
+    child = paynt.family.family.DesignSpace(design_space, parent_info)
+    child.hole_set_options(2, [1])
+    assert child.inherited_primary_value(prop) is None
+
+
+def test_coarse_values_are_not_exported_as_hints():
+    prop = create_optimality_property()
+    specification = paynt.verification.property.Specification([prop])
+    design_space = PayntTestUtils.create_design_space(num_holes=3, num_options=2)
+    # maximizing property: the hint is taken from the secondary (minimizing) direction
+    family = analyzed_family(prop, design_space, 0.5, coarse=False)
+    secondary = paynt.verification.property_result.PropertyResult(prop, None, 0.4)
+    secondary.coarse = True
+    family.analysis_result.optimality_result.secondary = secondary
+    assert family.generalize_hints(prop, family.analysis_result.optimality_result) is None
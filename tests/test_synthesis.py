@@ -1,6 +1,7 @@
 import unittest
 import subprocess
 import logging
+import re
 
 from test_utils import PayntTestUtils
 
@@ -93,6 +94,42 @@ class SynthesisTestSuite(unittest.TestCase):
 
         self.run_grid_optimal_for_oracle('CEGAR')
 
+    def run_paynt(self, project, *options):
+        ''' Run PAYNT on the project (relative to the models directory) and return its standard output. '''
+        process = subprocess.Popen([
+            'python3',
+            PayntTestUtils.get_path_to_paynt_script(),
+            '--project', PayntTestUtils.get_path_to_models() + '/' + project,
+            *options
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr.decode())
+        return stdout.decode()
+
+    def synthesized_optimum(self, stdout):
+        optimum = re.findall(r"optimum: \S+", stdout)
+        self.assertEqual(len(optimum), 1, stdout)
+        return optimum[0]
+
+    def test_maze_masked_model_checking(self):
+        # expected reward minimization: sub-MDPs are model checked on the quotient
+        expected = self.synthesized_optimum(self.run_paynt('dtmc/maze/concise', '--method', 'ar'))
+        masked = self.synthesized_optimum(self.run_paynt('dtmc/maze/concise', '--method', 'ar', '--masked-model-checking'))
+        self.assertEqual(expected, masked)
+
+    def test_maze_exploration_orders(self):
+        # the order in which families are explored does not affect the optimum
+        expected = self.synthesized_optimum(self.run_paynt('dtmc/maze/concise', '--method', 'ar'))
+        for order in ['bfs', 'bound', 'size', 'depth', 'bound-depth']:
+            stdout = self.run_paynt('dtmc/maze/concise', '--method', 'ar', '--exploration-order', order)
+            self.assertEqual(expected, self.synthesized_optimum(stdout), order)
+
+    def test_maze_multicore_ar(self):
+        # exporting families between the workers does not affect the optimum
+        expected = self.synthesized_optimum(self.run_paynt('dtmc/maze/concise', '--method', 'ar'))
+        multicore = self.synthesized_optimum(self.run_paynt('dtmc/maze/concise', '--method', 'ar_multicore'))
+        self.assertEqual(expected, multicore)
+
     # def test_grid_optimal_cegis(self):
     #     self.run_grid_optimal_for_oracle('CEGIS')
     #
@@ -17,6 +17,36 @@ class PayntTestUtils:
         assert "paynt.py" in os.listdir(PayntTestUtils.ROOT_DIR + "/paynt/")
         return PayntTestUtils.ROOT_DIR + "/paynt/paynt.py"
 
+    @staticmethod
+    def get_path_to_repository():
+        return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    @staticmethod
+    def get_path_to_paynt_script():
+        return os.path.join(PayntTestUtils.get_path_to_repository(), "paynt.py")
+
+    @staticmethod
+    def get_path_to_models():
+        return os.path.join(PayntTestUtils.get_path_to_repository(), "models")
+
+    @staticmethod
+    def create_design_space(num_holes, num_options):
+        ''' Create a design space with the given number of holes, each having the given number of options. '''
+        import paynt.family.family
+        family = paynt.family.family.Family()
+        for hole in range(num_holes):
+            family.add_hole(f"h{hole}", [str(option) for option in range(num_options)])
+        return paynt.family.family.DesignSpace(family)
+
+    @staticmethod
+    def build_prism_model(directory, program):
+        ''' Build the model given by the PRISM program, stored in a file within the directory. '''
+        import stormpy
+        path = os.path.join(directory, "model.prism")
+        with open(path, "w") as file:
+            file.write(program)
+        return stormpy.build_model(stormpy.parse_prism_program(path))
+
     @staticmethod
     def get_path_to_workspace_examples():
         assert "workspace" in os.listdir(PayntTestUtils.ROOT_DIR)